@@ -1,18 +1,26 @@
+import os
+import copy
+import time
+import uuid
+import inspect
+import contextlib
 import numpy as np
-import pandas as pd
-from src.parameter_config.ParamConfig import ParamConfig
-from src.suggestors.SuggestorBase import ParamLog
-from src.suggestors import RandomSearch, ZoomRandomSearch
-from src.utils import cd
+from src.parameter_config.SearchSpace import SearchSpace
+from src.suggestors.SuggestorBase import ParamLog, SearchSpaceExhausted
+from src.suggestors import RandomSearch, ZoomRandomSearch, QuasiRandomSearch, BayesianSearch, TPESearch, \
+    ParEGOSearch, SuggestorPortfolio
+from src.storage import Journal
+from src.schedulers import Hyperband
+from src.pruners import Reporter, TrialPruned
+from src.callbacks import CallbackProviderBase, NoCallbackProvider, callback_providers
 import datetime
 
-import keras.callbacks as cb
-#from src.utils import cd as cb
-
 
 class Tuner:
 
-    def __init__(self, name, sam, param_config, suggestors, save_path, evaluators=None, param_log=None):
+    def __init__(self, name, sam, param_config, suggestors, save_path, evaluators=None, param_log=None, pruner=None,
+                 pruned_score=None, callback_provider="keras", portfolio=False, hooks=None, cache=None,
+                 constraints=None, trial_timeout=None, timeout_score=None, n_objectives=1):
         """
         Tuner class, the main component of SameShitDifferentHyperparameter. It does automatic hyperparameter
         tuning
@@ -20,33 +28,113 @@ class Tuner:
         :param sam: Useless param name. Anyway, it is the class instance that has hyperparameters to tune.
         It should have the following functions:
         sam.run: Given a hyperparameter suggestion, do its thing and return a score indicating the performance of that
-                 hyperparameter suggestion.
+                 hyperparameter suggestion, or an array of n_objectives scores.
         sam.save: A function for saving the model if needed. Only necessary if save_model is set to True in
-                        function tune.
-        sam.set_callbacks: A function for injecting callbacks, such as EarlyStopping, into the model.
+                        function tune. It is given the absolute path of the model without an extension,
+                        {save_path}/{name}_param_{trial} or {save_path}/{name}_param_{trial}_budget_{budget} in
+                        tune_hyperband. Earlier versions gave it the bare trial name with the working directory
+                        changed to save_path, which no longer happens.
+        sam.set_callbacks: A function for injecting callbacks, such as EarlyStopping, into the model. Not needed with
+                           callback_provider "none".
 
         :param param_config: configuration of the parameters. Type: list of SingleParam
         :param suggestors: suggestor names of the suggestors used for parameter suggestion. Type: list of strings
-        :param save_path: storage path for saving trials. Type: string
+        :param save_path: storage path for saving trials. Each finished trial is appended to the journal
+               {name}_journal.jsonl, the npy and csv files are written at the end of tuning. A new study moves the
+               journal of an earlier study with the same name to {name}_journal.jsonl.1 (or .2 and so on) when
+               its first trial is logged, use Tuner.resume to continue a study instead. The time each trial
+               finished is in the "time" field of its journal record, Time_logger.txt is no longer written.
+               Type: string
         :param evaluators: skip for now
-        :param param_log: log of tried parameters, default is None in which case a new param log i started.
-               Type: ParamLog
+        :param param_log: log of tried parameters, default is None in which case a new param log i started. Tuners
+               in several processes or on several machines can tune the same study by each attaching a
+               SharedParamLog to the same database. Type: ParamLog
+        :param pruner: if given, sam.run is given a function report(step, value) for reporting intermediate
+               results, e.g. the validation score after each epoch. It raises TrialPruned when the pruner decides
+               that the trial should be stopped, and sam.run should let it propagate. Type: PrunerBase
+        :param pruned_score: score logged for pruned trials, default is the timeout score. The last reported value
+               is kept in the intermediate log only, so it is not taken for a final score. Type: float
+        :param callback_provider: makes the callbacks given to sam.set_callbacks. "keras", "lightning", "none" or a
+               CallbackProviderBase. The framework is imported when the first callbacks are made.
+               Type: string or CallbackProviderBase
+        :param portfolio: with several suggestors, whether only one of them is asked for each suggestion. The
+               suggestor is picked by a bandit on the improvement per second of its earlier suggestions. Otherwise
+               the first suggestor whose search space is not exhausted is asked. Type: bool
+        :param hooks: receive the timing spans of every trial, e.g. MemoryCollector, JsonlSink or
+               SuggestionProfiler. Type: list of TimingHookBase
+        :param cache: if given, parameters that are in the cache get their score from it instead of running sam,
+               and the scores of completed trials are added to it. No model is saved for cached trials.
+               Type: EvaluationCache
+        :param constraints: predicates on the actual parameters, see SearchSpace. Suggestions that violate them
+               are dropped before they are logged or run. Type: list of functions
+        :param trial_timeout: if given, every trial is run in its own process, which is killed when the trial takes
+               more than trial_timeout seconds. The trial is then logged with the status TIMED_OUT, and a trial
+               whose process dies without a result, e.g. when it is killed for running out of memory, with the
+               status FAILED. sam must be picklable on platforms that do not fork, and the models are saved by the
+               trial processes. Type: float
+        :param timeout_score: score logged for timed out and failed trials, and for pruned trials unless
+               pruned_score is given, default is NaN. Type: float
+        :param n_objectives: amount of scores sam.run returns, all of which are maximized. With several objectives
+               the param log holds a score matrix, pareto_front tracks the non-dominated trials, and ParEGOSearch
+               suggests parameters for the whole front. Single objective suggestors optimize the first objective.
+               Type: int
         """
         self.tuner_name = name
         self.sam = sam
-        self.save_path = save_path
+        self.pruner = pruner
+        self.pruned_score = pruned_score
+        self.hooks = [] if hooks is None else list(hooks)
+        self.cache = cache
+        self.trial_timeout = trial_timeout
+        self.timeout_score = np.nan if timeout_score is None else timeout_score
+
+        if n_objectives > 1 and portfolio:
+            raise ValueError("The suggestor portfolio needs a single objective")
+        if trial_timeout is not None and pruner is not None:
+            raise ValueError("Pruning needs the trials to report to the tuner and is not supported with a "
+                             "trial timeout")
+
+        # Set when the suggestors have run out of untried parameters, which stops tuning
+        self.exhausted = False
+
+        if callback_provider is None:
+            self.callback_provider = NoCallbackProvider()
+        elif isinstance(callback_provider, CallbackProviderBase):
+            self.callback_provider = callback_provider
+        elif callback_provider in callback_providers.keys():
+            self.callback_provider = callback_providers[callback_provider]()
+        else:
+            raise ValueError("The given callback provider \"{}\" is not supported".format(callback_provider))
+        self.save_path = os.path.abspath(os.path.expanduser(save_path))
+        self.journal = Journal(os.path.join(self.save_path, "{}_journal.jsonl".format(name)))
+
+        # Every journal record is tagged with the study, and a new study rotates the journal before its first record
+        self.study_id = uuid.uuid4().hex
+        self._journal_started = False
         self.suggestors_dict = {"RandomSearch": self._make_random_search,
-                                "ZoomRandomSearch": self._make_zoom_random_search}
+                                "ZoomRandomSearch": self._make_zoom_random_search,
+                                "QuasiRandomSearch": self._make_quasi_random_search,
+                                "BayesianSearch": self._make_bayesian_search,
+                                "TPESearch": self._make_tpe_search,
+                                "ParEGOSearch": self._make_parego_search}
 
-        # Making rescaler dictionary
-        p_config = ParamConfig()
-        self.rescaler_functions, self.param_names = p_config.make_rescale_dict(param_config)
+        # Compiling the search space
+        self.search_space = SearchSpace(param_config, constraints)
+        self.rescaler_functions = self.search_space.rescale_functions
+        self.param_names = self.search_space.param_names
 
         # Starting log
         if param_log is None:
-            self.param_log = ParamLog(len(self.rescaler_functions), param_descriptions=self.param_names)
+            self.param_log = ParamLog(len(self.rescaler_functions), param_descriptions=self.param_names,
+                                      n_objectives=n_objectives)
         else:
             self.param_log = param_log
+        if self.param_log.n_objectives != n_objectives:
+            raise ValueError("The param log has {} objectives but the tuner was given {}"
+                             .format(self.param_log.n_objectives, n_objectives))
+
+        # Non-dominated trials, tracked when there are several objectives
+        self.pareto_front = self.param_log.track_pareto_front() if n_objectives > 1 else None
 
         if type(suggestors) is list:
             self.suggestors = self._initialize_suggestors(suggestors)
@@ -60,69 +148,531 @@ class Tuner:
             raise TypeError("Parameter suggestor should be of type dict, string or list"
                             " but is of type {}".format(type(suggestors)))
 
+        # The suggestions of each suggestor are logged with its index as source
+        for i, suggestor in enumerate(self.suggestors):
+            suggestor.source_id = i
+
+        self.portfolio = SuggestorPortfolio(len(self.suggestors)) if portfolio else None
+
+    @property
+    def rejection_rate(self):
+        """
+        Fraction of the suggestions checked against the constraints that were infeasible. Type: float
+        """
+        return self.search_space.rejection_rate
+
+    @classmethod
+    def resume(cls, name, sam, param_config, suggestors, save_path, mmap=True, **kwargs):
+        """
+        Resumes a study from the files in save_path. The param log is loaded from the npy files, memory mapped if
+        mmap is True (see ParamLog.load), and the trials in the journal that are not in the npy files are added to
+        it. Trials that were still running when tuning stopped are logged as FAILED with the timeout score, so
+        they do not stay pending. The other arguments are the same as for Tuner.
+        :return: the Tuner, ready to continue tuning
+        """
+        param_names = [single_param.name for single_param in param_config]
+
+        abs_save_path = os.path.abspath(os.path.expanduser(save_path))
+        if os.path.exists(os.path.join(abs_save_path, "{}_params_actual.npy".format(name))):
+            param_log = ParamLog.load(abs_save_path, name, mmap=mmap, param_descriptions=param_names)
+        else:
+            param_log = ParamLog(len(param_names), param_descriptions=param_names,
+                                 n_objectives=kwargs.get("n_objectives", 1))
+
+        tuner = cls(name, sam, param_config, suggestors, save_path, param_log=param_log, **kwargs)
+        tuner._replay_journal()
+
+        # Trials that were running when tuning stopped never got a score, so they are logged as failed
+        if len(tuner.param_log) > 0:
+            for row in np.flatnonzero(tuner.param_log.get_status() == ParamLog.PENDING):
+                tuner.param_log.log_score(tuner.timeout_score, idx=row + 1, status=ParamLog.FAILED)
 
-    def tune(self, stop_tuning, live_evals=True, save_model=False):
+        return tuner
+
+    def _replay_journal(self):
+        # The study is the one that wrote the last record, and the tuner keeps appending to its journal
+        records = self.journal.read()
+        if records:
+            self.study_id = records[-1].get("study")
+        self._journal_started = True
+
+        for record in records:
+            if record.get("study") != self.study_id:
+                continue
+
+            actual = np.asarray(record["actual"])
+            unscaled = np.asarray(record["unscaled"])
+            score = np.asarray(record["score"])
+
+            # Trials already in the log get the score from the journal, as it is written last
+            if self.param_log.log_param(actual, unscaled, score, source=record.get("source")):
+                idx = len(self.param_log)
+            else:
+                idx = self.param_log.find_param_log_idx(actual, range(0, self.param_log.n_params)) + 1
+
+            for step, value in record.get("intermediate", {}).items():
+                self.param_log.log_intermediate(value, int(step), idx=idx)
+
+            if "budget" in record:
+                self.param_log.log_budget_score(score[0], record["budget"], idx=idx)
+            self.param_log.log_score(score, idx=idx, status=record.get("status"), duration=record.get("duration"))
+
+    def tune(self, stop_tuning, live_evals=True, save_model=False, n_workers=1, executor="process",
+             time_budget=None):
+        """
+        Tunes the hyperparameters of sam until stop_tuning returns True.
+        :param stop_tuning: function that is given the amount of started trials, and the seconds since tuning
+               started if it takes two arguments, and returns True when tuning should stop. Type: function
+        :param live_evals: skip for now
+        :param save_model: whether or not sam.save is called after each trial. Type: bool
+        :param n_workers: amount of trials that are run at the same time. With more than one worker sam.run is
+               called in a worker pool and a new suggestion is made every time a trial finishes. Type: int
+        :param executor: "process" or "thread", the kind of worker pool used when n_workers is above one. With
+               "process" sam is pickled and sent to the workers, with "thread" sam.run must be thread-safe.
+               Type: string
+        :param time_budget: seconds after which no new trials are started. Trials that are running are finished,
+               or cancelled by the trial timeout. Type: float
+        """
+        stop_tuning = _make_stop_tuning(stop_tuning, time_budget)
+        try:
+            if n_workers > 1:
+                self._tune_parallel(stop_tuning, save_model, n_workers, executor)
+            else:
+                self._tune_sequential(stop_tuning, save_model)
+        finally:
+            # Compacting the journal into the npy and csv files
+            with self._span("save_log"):
+                self.save_log()
+            self.journal.close()
+            self._close_hooks()
+
+    def _tune_sequential(self, stop_tuning, save_model):
         trials = 0
         previous_param_performance = None
         while not stop_tuning(trials):
-            param_suggestion = self._get_param_suggestions()
-
-            actual = self.param_log.get_actual_params()
-            param_test_name = "{}_param_{}".format(self.tuner_name, len(actual))
+            param_suggestion = self._get_next_suggestion()
+            if param_suggestion is None:
+                break
 
-            # Setting callbacks
-            self.set_callbacks(param_test_name)
+            trial_idx = param_suggestion[2]
+            param_test_name = self._trial_name(trial_idx)
 
             # Running Sam w
-            previous_param_performance = self.sam.run(name=param_test_name, **param_suggestion[0])
+            previous_param_performance, status, cached, seconds = self._run_sam(param_test_name, param_suggestion[0],
+                                                                                trial_idx, save_model)
 
-            self.param_log.log_score(previous_param_performance)
-            self._save_log(save_model=save_model)
-            # self._save_log(save_model=True, save_path="C:/SOFTWARE and giggles/NMR_tuning")
+            with self._span("scoring", trial_idx):
+                self._log_result(previous_param_performance, status, trial_idx, seconds)
+            with self._span("persistence", trial_idx):
+                self._save_log(save_model=self._saves_in_tuner(save_model, cached), trial_idx=trial_idx,
+                               cached=cached)
 
             trials = trials+1
 
-    def _save_log(self, save_model=False, save_path=None):
+    def _tune_parallel(self, stop_tuning, save_model, n_workers, executor):
+        # Imported here as the process pool pulls in multiprocessing, which is slow to import
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+        executors = {"process": ProcessPoolExecutor,
+                     "thread": ThreadPoolExecutor}
+        if executor not in executors.keys():
+            raise ValueError("The given executor \"{}\" is not supported".format(executor))
+        if executor == "process" and self.pruner is not None:
+            raise ValueError("Pruning needs the trials to report to the tuner and is not supported with the "
+                             "\"process\" executor, use the \"thread\" executor")
+        if executor == "thread" and self.trial_timeout is not None:
+            raise ValueError("Trials run in threads cannot be cancelled, use the \"process\" executor with a "
+                             "trial timeout")
+
+        # With a trial timeout every trial runs in its own process, which a thread of the pool waits on
+        if self.trial_timeout is not None:
+            executor = "thread"
+
+        trials = 0
+        running = {}
+        with executors[executor](max_workers=n_workers) as pool:
+            while True:
+                # Filling the pool with new trials
+                while len(running) < n_workers and not self.exhausted and not stop_tuning(trials):
+                    param_suggestion = self._get_next_suggestion()
+                    if param_suggestion is None:
+                        break
+
+                    trial_idx = param_suggestion[2]
+                    param_test_name = self._trial_name(trial_idx)
+                    trials = trials+1
+
+                    # Trials in the cache are logged right away instead of being run
+                    cached = self._get_cached(param_suggestion[0], trial_idx)
+                    if cached is not None:
+                        with self._span("scoring", trial_idx):
+                            self._log_result(cached[0], ParamLog.COMPLETED, trial_idx, cached[1])
+                        with self._span("persistence", trial_idx):
+                            self._save_log(trial_idx=trial_idx, cached=True)
+                        continue
+
+                    # The callbacks are made in the worker, as the trials that are running share self.sam
+                    future = pool.submit(_run_timed_trial, self.sam, param_test_name,
+                                         self._make_run_params(param_suggestion[0], trial_idx),
+                                         self.save_path if save_model else None, self.trial_timeout,
+                                         self.callback_provider, self.save_path)
+                    running[future] = (trial_idx, param_suggestion[0])
+
+                if not running:
+                    break
+
+                # Logging the trials as they finish, which may be out of order
+                with self._span("wait"):
+                    done, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    trial_idx, params = running.pop(future)
+                    score, status, start_time, seconds = future.result()
+                    self._end_span({"trial": trial_idx, "phase": "run", "start": start_time, "seconds": seconds})
+                    self._put_cached(params, score, status, seconds)
+
+                    with self._span("scoring", trial_idx):
+                        self._log_result(score, status, trial_idx, seconds)
+
+                    # The model is saved by the worker that trained it
+                    with self._span("persistence", trial_idx):
+                        self._save_log(trial_idx=trial_idx)
+
+    def tune_hyperband(self, stop_tuning, min_budget, max_budget, eta=3, budget_name="budget", save_model=False,
+                       time_budget=None):
+        """
+        Tunes the hyperparameters of sam with Hyperband. Configurations from the suggestors are run on small
+        budgets first, and only the best 1/eta of them are run again on eta times larger budgets. The budget is
+        given to sam.run as the keyword argument budget_name, e.g. the amount of epochs or the fraction of the data
+        to train on. The score of every (configuration, budget) evaluation is logged with
+        ParamLog.log_budget_score.
+        :param stop_tuning: function that is given the amount of sam.run calls so far, and the seconds since tuning
+               started if it takes two arguments, and returns True when tuning should stop. It is checked before
+               every bracket, so brackets are always finished. Type: function
+        :param min_budget: smallest budget. Type: int or float
+        :param max_budget: largest budget. Type: int or float
+        :param eta: factor between the budgets of successive rungs. Type: int
+        :param budget_name: name of the keyword argument sam.run is given the budget in. Type: string
+        :param save_model: whether or not sam.save is called after each evaluation. Type: bool
+        :param time_budget: seconds after which no new brackets are started. Type: float
+        """
+        if self.param_log.n_objectives > 1:
+            raise ValueError("Hyperband needs a single objective")
+
+        hyperband = Hyperband(min_budget, max_budget, eta=eta)
+        stop_tuning = _make_stop_tuning(stop_tuning, time_budget)
+
+        try:
+            trials = 0
+            for bracket in hyperband.brackets():
+                if self.exhausted or stop_tuning(trials):
+                    break
+
+                # Getting the configurations of the first rung from the suggestors
+                n_configurations = bracket[0][0]
+                configurations = []
+                for _ in range(0, n_configurations):
+                    param_suggestion = self._get_next_suggestion()
+                    if param_suggestion is None:
+                        break
+                    configurations.append((param_suggestion[2], param_suggestion[0]))
+
+                # The last bracket is run with the configurations that were left
+                if not configurations:
+                    break
+
+                # Successive halving
+                for rung, (_, budget) in enumerate(bracket):
+                    scores = []
+                    for trial_idx, params in configurations:
+                        param_test_name = self._trial_name(trial_idx, budget)
+
+                        budget_params = dict(params)
+                        budget_params[budget_name] = budget
+                        score, status, cached, seconds = self._run_sam(param_test_name, budget_params, trial_idx,
+                                                                       save_model)
+
+                        # Pruned and timed out trials are ranked by the score they are logged with
+                        score = self._result_score(score, status)
+                        with self._span("scoring", trial_idx):
+                            self.param_log.log_budget_score(score, budget, idx=trial_idx)
+                            self._log_result(score, status, trial_idx, seconds)
+                        with self._span("persistence", trial_idx):
+                            self._save_log(save_model=self._saves_in_tuner(save_model, cached), trial_idx=trial_idx,
+                                           budget=budget, cached=cached)
+                        scores.append(score)
+                        trials = trials+1
+
+                    if rung + 1 < len(bracket):
+                        promoted = Hyperband.promote(scores, bracket[rung + 1][0])
+                        configurations = [configurations[i] for i in promoted]
+        finally:
+            with self._span("save_log"):
+                self.save_log()
+            self.journal.close()
+            self._close_hooks()
+
+    @contextlib.contextmanager
+    def _span(self, phase, trial_idx=None):
+        """
+        Times the body of the with statement and reports it to the hooks. The span is given to the body, which can
+        set its "trial" once the trial index is known.
+        """
+        span = {"trial": trial_idx, "phase": phase, "start": time.time()}
+        for hook in self.hooks:
+            hook.span_start(span)
+
+        start_time = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span["seconds"] = time.perf_counter() - start_time
+            self._end_span(span)
+
+    def _end_span(self, span):
+        for hook in self.hooks:
+            hook.span_end(span)
+
+    def _close_hooks(self):
+        for hook in self.hooks:
+            hook.close()
+
+    def _make_run_params(self, params, trial_idx):
+        run_params = dict(params)
+        if self.pruner is not None:
+            run_params["report"] = Reporter(self.param_log, trial_idx, self.pruner)
+
+        return run_params
+
+    def _get_next_suggestion(self):
+        """
+        Gets the next suggestion from the suggestors.
+        :return: the suggestion as a dict, its actual parameters and the index of its row in the param log counting
+                 from 1, or None if the search space is exhausted
+        """
+        try:
+            with self._span("suggestion") as span:
+                param_suggestion = self._get_param_suggestions()
+                span["trial"] = param_suggestion[2]
+        except SearchSpaceExhausted:
+            self.exhausted = True
+            return None
+
+        return param_suggestion
+
+    def _run_sam(self, param_test_name, params, trial_idx, save_model=False):
+        """
+        Runs sam on a trial in the tuning thread, or in a trial process if there is a trial timeout, unless the
+        parameters are in the evaluation cache.
+        :return: the score, the status, whether the score came from the cache and the seconds sam.run took, which
+                 for cached scores is the time of the run that was cached
+        """
+        cached = self._get_cached(params, trial_idx)
+        if cached is not None:
+            return cached[0], ParamLog.COMPLETED, True, cached[1]
+
+        # Setting callbacks
+        with self._span("callbacks", trial_idx):
+            self.set_callbacks(param_test_name)
+
+        with self._span("run", trial_idx) as span:
+            if self.trial_timeout is None:
+                score, status = _run_trial(self.sam, param_test_name, self._make_run_params(params, trial_idx))
+            else:
+                score, status = _run_trial_process(self.sam, param_test_name, params,
+                                                   self.save_path if save_model else None, self.trial_timeout)
+
+        self._put_cached(params, score, status, span["seconds"])
+        return score, status, False, span["seconds"]
+
+    def _saves_in_tuner(self, save_model, cached):
+        # No model is trained for cached trials, and trial processes save their own models
+        return save_model and not cached and self.trial_timeout is None
+
+    def _get_cached(self, params, trial_idx):
+        if self.cache is None:
+            return None
+
+        with self._span("cache", trial_idx):
+            return self.cache.get(params)
+
+    def _put_cached(self, params, score, status, seconds):
+        # Pruned scores depend on the pruner and are not cached
+        if self.cache is not None and status == ParamLog.COMPLETED:
+            self.cache.put(params, score, seconds)
+
+    def _result_score(self, score, status):
+        # The score a trial is logged with
+        if status == ParamLog.PRUNED and self.pruned_score is not None:
+            return self.pruned_score
+        if status in (ParamLog.PRUNED, ParamLog.TIMED_OUT, ParamLog.FAILED):
+            return self.timeout_score
+
+        return score
+
+    def _trial_name(self, trial_idx, budget=None):
+        # Trials run on several budgets get a name per budget, so their checkpoints do not overwrite each other
+        if budget is None:
+            return "{}_param_{}".format(self.tuner_name, trial_idx)
+
+        return "{}_param_{}_budget_{}".format(self.tuner_name, trial_idx, budget)
+
+    def _log_result(self, score, status, trial_idx, seconds=None):
+        score = self._result_score(score, status)
+        if status == ParamLog.COMPLETED and np.size(score) != self.param_log.n_objectives:
+            raise ValueError("sam.run returned {} scores but the tuner has {} objectives"
+                             .format(np.size(score), self.param_log.n_objectives))
+
+        self.param_log.log_score(score, idx=trial_idx, status=status, duration=seconds)
+
+        if self.portfolio is not None:
+            self.portfolio.finish(trial_idx, score, completed=status == ParamLog.COMPLETED)
+
+    def _save_log(self, save_model=False, trial_idx=None, budget=None, cached=False):
+        """
+        Appends a finished trial to the journal.
+        :param save_model: whether or not sam.save is called. Type: bool
+        :param trial_idx: index of the trial in the param log, counting from 1. Default is the last trial.
+               Type: int
+        :param budget: budget the trial was run with, if any. Type: int or float
+        :param cached: whether the score came from the evaluation cache. Type: bool
+        """
+        if trial_idx is None:
+            trial_idx = len(self.param_log)
+
+        actual = self.param_log.get_actual_params()[trial_idx-1]
+        unscaled = self.param_log.get_unscaled_params()[trial_idx-1]
+        score = self.param_log.get_score()[trial_idx-1]
+
+        record = {"study": self.study_id,
+                  "trial": trial_idx,
+                  "actual": actual.tolist(),
+                  "unscaled": unscaled.tolist(),
+                  "score": score.tolist(),
+                  "status": int(self.param_log.get_status()[trial_idx-1]),
+                  "source": int(self.param_log.get_source()[trial_idx-1]),
+                  "duration": float(self.param_log.get_duration()[trial_idx-1]),
+                  "time": datetime.datetime.now().isoformat()}
+        if budget is not None:
+            record["budget"] = budget
+        if cached:
+            record["cached"] = True
+
+        intermediate = self.param_log.get_intermediate(trial_idx)
+        if len(intermediate) > 0:
+            record["intermediate"] = {int(step): value for _, step, value in intermediate}
+
+        if not self._journal_started:
+            self.journal.rotate()
+            self._journal_started = True
+        self.journal.append(record)
+
+        if save_model:
+            self.sam.save(os.path.join(self.save_path, self._trial_name(trial_idx, budget)))
+
+    def save_log(self, save_path=None):
+        """
+        Saves the whole param log as npy files and a csv file. Each file is written to a temporary file first and
+        then moved into place.
+        :param save_path: directory to save into, default is the save path of the tuner. Type: string
+        """
+        if len(self.param_log) == 0:
+            return
+
         if save_path is None:
             save_path = self.save_path
+        save_path = os.path.abspath(os.path.expanduser(save_path))
 
         actual = self.param_log.get_actual_params()
         unscaled = self.param_log.get_unscaled_params()
         score = self.param_log.get_score()
 
-        # Constructing csv
-        parameter_df = pd.DataFrame(data=score, columns=["Score"], dtype=np.float64)
+        # Saving numpy arrays
+        self._replace_file(os.path.join(save_path, "{}_params_actual.npy".format(self.tuner_name)),
+                           lambda f: np.save(f, actual))
+        self._replace_file(os.path.join(save_path, "{}_params_unscaled.npy".format(self.tuner_name)),
+                           lambda f: np.save(f, unscaled))
+        self._replace_file(os.path.join(save_path, "{}_params_scores.npy".format(self.tuner_name)),
+                           lambda f: np.save(f, score))
+        self._replace_file(os.path.join(save_path, "{}_params_status.npy".format(self.tuner_name)),
+                           lambda f: np.save(f, self.param_log.get_status()))
+        self._replace_file(os.path.join(save_path, "{}_params_source.npy".format(self.tuner_name)),
+                           lambda f: np.save(f, self.param_log.get_source()))
+        self._replace_file(os.path.join(save_path, "{}_params_duration.npy".format(self.tuner_name)),
+                           lambda f: np.save(f, self.param_log.get_duration()))
+
+        # The files of an earlier study with the same name are removed when the log has no such entries
+        budget_scores = self.param_log.get_budget_scores()
+        budget_path = os.path.join(save_path, "{}_params_budget_scores.npy".format(self.tuner_name))
+        if len(budget_scores) > 0:
+            self._replace_file(budget_path, lambda f: np.save(f, budget_scores))
+        elif os.path.exists(budget_path):
+            os.remove(budget_path)
+
+        intermediate = self.param_log.get_intermediate()
+        intermediate_path = os.path.join(save_path, "{}_params_intermediate.npy".format(self.tuner_name))
+        if len(intermediate) > 0:
+            self._replace_file(intermediate_path, lambda f: np.save(f, intermediate))
+        elif os.path.exists(intermediate_path):
+            os.remove(intermediate_path)
+
+        # Saving csv
+        import pandas as pd
+        score_columns = ["Score"] if score.shape[1] == 1 else ["Score_{}".format(i) for i in range(0, score.shape[1])]
+        parameter_df = pd.DataFrame(data=score, columns=score_columns, dtype=np.float64)
         joined = pd.DataFrame(data=actual, columns=self.param_names).join(parameter_df)
+        self._replace_file(os.path.join(save_path, "{}_params_score.csv".format(self.tuner_name)),
+                           lambda f: joined.to_csv(f, index=False, float_format="%.5f"), mode="w")
 
-        with cd(save_path):
-            # Saving numpy arrays
-            np.save("{}_params_actual.npy".format(self.tuner_name), actual)
-            np.save("{}_params_unscaled.npy".format(self.tuner_name), unscaled)
-            np.save("{}_params_scores.npy".format(self.tuner_name), score)
-
-            # # Saving csv
-            # heading = self.param_names
-            # heading.append("Score")
-            joined.to_csv("{}_params_score.csv".format(self.tuner_name), index=False, float_format="%.5f")
-
-            if save_model:
-                self.sam.save("{}_param_{}".format(self.tuner_name, len(actual)))
-
-            with open("Time_logger.txt", "a") as text_file:
-                text_file.write("Param id {}: {}\n".format(len(actual), datetime.datetime.now().time()))
+    @staticmethod
+    def _replace_file(path, write, mode="wb"):
+        # The temporary file is per process, as tuners sharing a param log may save into the same directory
+        tmp_path = "{}.{}.tmp".format(path, os.getpid())
+        with open(tmp_path, mode) as tmp_file:
+            write(tmp_file)
+        os.replace(tmp_path, path)
 
     def _get_param_suggestions(self):
-
-        param_suggestions = []
+        """
+        :return: the suggestion as a dict, its actual parameters and the index of its row in the param log counting
+                 from 1
+        """
+        # Getting the trials logged by other tuners sharing the param log
+        self.param_log.sync()
+
+        if self.portfolio is not None:
+            # A suggestor whose search space is exhausted is taken out of the portfolio, and another one is picked
+            suggestor_idx = self.portfolio.choose()
+            while suggestor_idx is not None:
+                start_time = time.time()
+                try:
+                    dict_params, real_params = self.suggestors[suggestor_idx].suggest_parameters()
+                except SearchSpaceExhausted:
+                    self.portfolio.exhaust(suggestor_idx)
+                    suggestor_idx = self.portfolio.choose()
+                    continue
+
+                trial_idx = self._find_trial_idx(real_params)
+                self.portfolio.start(trial_idx, suggestor_idx, time.time() - start_time)
+
+                return dict_params, real_params, trial_idx
+
+            raise SearchSpaceExhausted("The search spaces of all suggestors are exhausted")
+
+        # Suggestors log what they suggest, so only the suggestor whose suggestion is run is asked. The next one is
+        # asked when its search space is exhausted
         for suggestor in self.suggestors:
-            param_suggestions.append(suggestor.suggest_parameters())
+            try:
+                dict_params, real_params = suggestor.suggest_parameters()
+            except SearchSpaceExhausted:
+                continue
+
+            return dict_params, real_params, self._find_trial_idx(real_params)
 
-        return self._choose_param_suggestion(param_suggestions)
+        raise SearchSpaceExhausted("The search spaces of all suggestors are exhausted")
 
-    def _choose_param_suggestion(self, param_suggestion_list):
-        # print("Warning: Choosing parameters from multiple suggestors has not been implemented yet."
-        #       "Returning the first entry of the param_suggestion_list.")
-        return param_suggestion_list[0]
+    def _find_trial_idx(self, real_params):
+        # The row the suggestion was logged to, which need not be the last one when the param log is shared
+        return self.param_log.find_param_log_idx(real_params, range(0, self.param_log.n_params)) + 1
 
     def _initialize_suggestors(self, suggestor_list):
         suggestors = []
@@ -145,24 +695,152 @@ class Tuner:
         return suggestors
 
     def set_callbacks(self, name):
-        model_checkpoint = cb.ModelCheckpoint(save_best_only=True,
-                                              monitor='val_loss',
-                                              filepath=self.save_path+"/{}".format(name))
-
-        early_stopping = cb.EarlyStopping(monitor="val_loss", patience=24)
-
-        reduce_lr = cb.ReduceLROnPlateau(monitor='val_loss', factor=0.5,
-                                         patience=6, min_lr=0.0001)
+        callbacks = self.callback_provider.make_callbacks(name, self.save_path)
 
-        callbacks = [model_checkpoint, early_stopping, reduce_lr]
-        self.sam.set_callbacks(callbacks)
+        if callbacks is not None:
+            self.sam.set_callbacks(callbacks)
 
     def _make_random_search(self):
-        return RandomSearch(self.rescaler_functions, self.param_names, self.param_log)
+        return RandomSearch(self.search_space, self.param_names, self.param_log)
 
-    def _make_zoom_random_search(self, trials_per_zoom=None, n_eval_trials=None):
+    def _make_zoom_random_search(self, trials_per_zoom=None, n_eval_trials=None, **kwargs):
         return ZoomRandomSearch(trials_per_zoom=40 if trials_per_zoom is None else trials_per_zoom,
                                 n_eval_trials=10 if n_eval_trials is None else n_eval_trials,
-                                rescale_functions=self.rescaler_functions,
+                                rescale_functions=self.search_space,
                                 param_names=self.param_names,
-                                param_log=self.param_log)
+                                param_log=self.param_log,
+                                **kwargs)
+
+    def _make_quasi_random_search(self, **kwargs):
+        return QuasiRandomSearch(self.search_space, self.param_names, self.param_log, **kwargs)
+
+    def _make_bayesian_search(self, **kwargs):
+        return BayesianSearch(self.search_space, self.param_names, self.param_log, **kwargs)
+
+    def _make_tpe_search(self, **kwargs):
+        return TPESearch(self.search_space, self.param_names, self.param_log, **kwargs)
+
+    def _make_parego_search(self, **kwargs):
+        return ParEGOSearch(self.search_space, self.param_names, self.param_log, **kwargs)
+
+
+def _run_trial(sam, name, params, save_path=None):
+    """
+    Runs a single trial, either in the tuning loop or in a worker of Tuner.tune.
+    :param sam: the class instance that has hyperparameters to tune
+    :param name: name of the trial. Type: string
+    :param params: the hyperparameter suggestion. Type: dict
+    :param save_path: if given, the model is saved into this directory after the trial. Type: string
+    :return: the score returned by sam.run, or the last reported value if the trial was pruned, and the status of
+             the trial
+    """
+    try:
+        score = sam.run(name=name, **params)
+        status = ParamLog.COMPLETED
+    except TrialPruned as pruned:
+        score = pruned.value
+        status = ParamLog.PRUNED
+
+    if save_path is not None:
+        sam.save(os.path.join(save_path, name))
+
+    return score, status
+
+
+def _run_timed_trial(sam, name, params, save_path=None, timeout=None, callback_provider=None, callback_path=None):
+    """
+    Runs a single trial with _run_trial, or with _run_trial_process if a timeout is given, and times it, for trials
+    run in a worker. If a callback provider is given, the trial runs on a shallow copy of sam that is given the
+    callbacks of the trial, so trials running at the same time do not change each other's callbacks.
+    :return: the score, the status, the time.time() the trial started and its duration in seconds
+    """
+    start = time.time()
+    start_time = time.perf_counter()
+    if callback_provider is not None:
+        callbacks = callback_provider.make_callbacks(name, callback_path)
+        if callbacks is not None:
+            sam = copy.copy(sam)
+            sam.set_callbacks(callbacks)
+    if timeout is None:
+        score, status = _run_trial(sam, name, params, save_path)
+    else:
+        score, status = _run_trial_process(sam, name, params, save_path, timeout)
+
+    return score, status, start, time.perf_counter() - start_time
+
+
+def _run_trial_process(sam, name, params, save_path, timeout):
+    """
+    Runs a single trial with _run_trial in a new process, which is killed if the trial takes more than timeout
+    seconds. Exceptions raised by sam.run are raised again in the calling process.
+    :return: the score and the status of the trial. The status is TIMED_OUT if the trial was killed, and FAILED if
+             the process died without a result, both with a NaN score
+    """
+    # Imported here as multiprocessing is slow to import
+    import multiprocessing
+
+    # The process is not daemonic, so sam.run can start processes of its own, e.g. a Pool or data loader
+    # workers. It is killed and joined below in every case
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_trial_process_main, args=(sender, sam, name, params, save_path))
+    process.start()
+    sender.close()
+
+    try:
+        if not receiver.poll(timeout):
+            return np.nan, ParamLog.TIMED_OUT
+
+        try:
+            result, error = receiver.recv()
+        except EOFError:
+            # The process died, e.g. it was killed for running out of memory
+            return np.nan, ParamLog.FAILED
+    finally:
+        if process.is_alive():
+            process.kill()
+        process.join()
+        receiver.close()
+
+    if error is not None:
+        raise error
+
+    return result
+
+
+def _trial_process_main(sender, sam, name, params, save_path):
+    try:
+        message = (_run_trial(sam, name, params, save_path), None)
+    except Exception as error:
+        message = (None, error)
+
+    try:
+        sender.send(message)
+    except Exception:
+        # The exception could not be pickled
+        sender.send((None, Exception("Trial {} raised {!r}".format(name, message[1]))))
+    sender.close()
+
+
+def _make_stop_tuning(stop_tuning, time_budget=None):
+    """
+    Wraps stop_tuning into a function of the amount of trials only. stop_tuning is also given the seconds since
+    the wrapper was made if it takes two arguments, and tuning is stopped when the time budget is used up.
+    """
+    start_time = time.perf_counter()
+
+    try:
+        parameters = inspect.signature(stop_tuning).parameters.values()
+        n_args = sum(parameter.kind in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD)
+                     for parameter in parameters)
+        takes_elapsed = n_args >= 2 or any(parameter.kind == parameter.VAR_POSITIONAL for parameter in parameters)
+    except (TypeError, ValueError):
+        takes_elapsed = False
+
+    def wrapped_stop_tuning(trials):
+        elapsed = time.perf_counter() - start_time
+        if time_budget is not None and elapsed >= time_budget:
+            return True
+
+        return stop_tuning(trials, elapsed) if takes_elapsed else stop_tuning(trials)
+
+    return wrapped_stop_tuning
@@ -0,0 +1,235 @@
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+import datetime
+import numpy as np
+from src.Tuner import Tuner, _run_trial
+from src.parameter_config.SearchSpace import SearchSpace
+from src.suggestors.SuggestorBase import ParamLog
+from .Objectives import objectives as default_objectives
+
+
+def suggestor_benchmark(suggestor, objective, n_trials=50, seed=0, suggestor_kwargs=None):
+    """
+    Tunes a benchmark objective with a single suggestor and times the suggestions and the journal appends.
+    :param suggestor: name of a suggestor registered in the Tuner. Type: string
+    :param objective: the objective to tune. Type: BenchmarkObjective
+    :param n_trials: amount of trials. Type: int
+    :param seed: seed of the NumPy random generator. Type: int
+    :param suggestor_kwargs: keyword arguments of the suggestor. Type: dict
+    :return: dict with the timings in seconds and the best score after each trial
+    """
+    np.random.seed(seed)
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        tuner = Tuner("benchmark", objective, objective.param_config, {suggestor: suggestor_kwargs or {}}, tmp_dir,
+                      callback_provider="none")
+
+        suggestion_seconds = np.zeros(n_trials)
+        journal_seconds = np.zeros(n_trials)
+        for i in range(0, n_trials):
+            start_time = time.perf_counter()
+            param_suggestion = tuner._get_param_suggestions()
+            suggestion_seconds[i] = time.perf_counter() - start_time
+
+            trial_idx = param_suggestion[2]
+            score, status = _run_trial(objective, "benchmark_param_{}".format(trial_idx), param_suggestion[0])
+            tuner._log_result(score, status, trial_idx)
+
+            start_time = time.perf_counter()
+            tuner._save_log(trial_idx=trial_idx)
+            journal_seconds[i] = time.perf_counter() - start_time
+
+        tuner.journal.close()
+        best_score = np.maximum.accumulate(tuner.param_log.get_score()[:, 0])
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return {"suggestion_seconds": _summarize(suggestion_seconds),
+            "journal_append_seconds": _summarize(journal_seconds),
+            "best_score": best_score.tolist(),
+            "regret": float(objective.optimum - best_score[-1])}
+
+
+def param_log_benchmark(size, search_space, n_lookups=1000, seed=0):
+    """
+    Times appending parameters to a ParamLog one at a time and in a batch, and the duplicate check of parameters
+    that are already logged.
+    :param size: amount of rows logged. Type: int
+    :param search_space: search space the parameters are drawn from. Type: SearchSpace
+    :param n_lookups: amount of duplicate checks. Type: int
+    :param seed: seed of the NumPy random generator. Type: int
+    :return: dict with the seconds per row of each operation
+    """
+    np.random.seed(seed)
+    unscaled = np.random.random_sample((size, search_space.n_params))
+    actual = search_space.transform(unscaled)
+
+    param_log = ParamLog(search_space.n_params, param_descriptions=search_space.param_names)
+    start_time = time.perf_counter()
+    for i in range(0, size):
+        param_log.log_param(actual[i], unscaled[i], 0)
+    append_seconds = time.perf_counter() - start_time
+
+    lookups = np.random.randint(0, size, n_lookups)
+    start_time = time.perf_counter()
+    for i in lookups:
+        param_log.log_param(actual[i], unscaled[i], 0)
+    duplicate_seconds = time.perf_counter() - start_time
+
+    batch_log = ParamLog(search_space.n_params, param_descriptions=search_space.param_names)
+    start_time = time.perf_counter()
+    batch_log.log_params(actual, unscaled, np.zeros(size))
+    batch_seconds = time.perf_counter() - start_time
+
+    return {"size": size,
+            "logged": len(param_log),
+            "append_seconds_per_row": append_seconds / size,
+            "duplicate_seconds_per_row": duplicate_seconds / n_lookups,
+            "batch_append_seconds_per_row": batch_seconds / size}
+
+
+def save_log_benchmark(size, objective, seed=0):
+    """
+    Times Tuner.save_log, which writes the npy and csv files, for a param log of the given size. The first call
+    imports pandas, so it is not timed.
+    :param size: amount of completed trials in the param log. Type: int
+    :param objective: objective whose search space is used. Type: BenchmarkObjective
+    :param seed: seed of the NumPy random generator. Type: int
+    :return: dict with the seconds of save_log
+    """
+    np.random.seed(seed)
+    search_space = SearchSpace(objective.param_config)
+    unscaled = np.random.random_sample((size, search_space.n_params))
+
+    param_log = ParamLog(search_space.n_params, param_descriptions=search_space.param_names)
+    param_log.log_params(search_space.transform(unscaled), unscaled, np.zeros(size))
+    for i in range(1, len(param_log) + 1):
+        param_log.log_score(np.random.random_sample(), idx=i)
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        tuner = Tuner("benchmark", objective, objective.param_config, [], tmp_dir, param_log=param_log,
+                      callback_provider="none")
+        tuner.save_log()
+
+        start_time = time.perf_counter()
+        tuner.save_log()
+        save_seconds = time.perf_counter() - start_time
+        tuner.journal.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return {"size": size, "save_log_seconds": save_seconds}
+
+
+def run_benchmarks(suggestors=None, objectives=None, n_trials=50, sizes=(100, 1000, 10000, 100000), seed=0,
+                   output_path=None):
+    """
+    Runs the benchmark suite.
+    :param suggestors: names of the suggestors to benchmark, default is all suggestors registered in the Tuner.
+           Type: list of strings
+    :param objectives: names of the objectives, default is all of them. Type: list of strings
+    :param n_trials: amount of trials per suggestor and objective. Type: int
+    :param sizes: param log sizes of the ParamLog and save_log benchmarks. Type: list of ints
+    :param seed: seed of the NumPy random generator. Type: int
+    :param output_path: if given, the results are written to this file as JSON. Type: string
+    :return: the results. Type: dict
+    """
+    objectives = {name: default_objectives[name]() for name in (objectives or default_objectives.keys())}
+    if suggestors is None:
+        suggestors = registered_suggestors()
+
+    results = {"metadata": {"time": datetime.datetime.now().isoformat(),
+                            "python": platform.python_version(),
+                            "numpy": np.__version__,
+                            "platform": platform.platform(),
+                            "n_trials": n_trials,
+                            "seed": seed},
+               "suggestors": {},
+               "param_log": [],
+               "save_log": []}
+
+    for suggestor in suggestors:
+        results["suggestors"][suggestor] = {name: suggestor_benchmark(suggestor, objective, n_trials, seed)
+                                            for name, objective in objectives.items()}
+
+    search_space = SearchSpace(default_objectives["Hartmann6"].param_config)
+    for size in sizes:
+        results["param_log"].append(param_log_benchmark(size, search_space, seed=seed))
+        results["save_log"].append(save_log_benchmark(size, default_objectives["Hartmann6"](), seed=seed))
+
+    if output_path is not None:
+        with open(output_path, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+    return results
+
+
+def compare_results(baseline, current, tolerance=0.2):
+    """
+    Compares the timings of two benchmark results.
+    :param baseline: results of the earlier version, or the path of its JSON file. Type: dict or string
+    :param current: results of the new version, or the path of its JSON file. Type: dict or string
+    :param tolerance: relative slowdown that is not reported. Type: float
+    :return: list of (metric, baseline seconds, current seconds) of the metrics that got slower
+    """
+    baseline = _flatten_timings(_load_results(baseline))
+    current = _flatten_timings(_load_results(current))
+
+    regressions = []
+    for metric, seconds in current.items():
+        if metric in baseline and seconds > baseline[metric] * (1 + tolerance):
+            regressions.append((metric, baseline[metric], seconds))
+
+    return regressions
+
+
+def registered_suggestors():
+    """
+    :return: names of the suggestors registered in the Tuner. Type: list of strings
+    """
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        tuner = Tuner("registry", None, default_objectives["Branin"].param_config, [], tmp_dir,
+                      callback_provider="none")
+        tuner.journal.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return list(tuner.suggestors_dict.keys())
+
+
+def _summarize(seconds):
+    return {"mean": float(np.mean(seconds)),
+            "median": float(np.median(seconds)),
+            "max": float(np.max(seconds)),
+            "total": float(np.sum(seconds))}
+
+
+def _load_results(results):
+    if isinstance(results, dict):
+        return results
+
+    with open(results) as results_file:
+        return json.load(results_file)
+
+
+def _flatten_timings(results):
+    timings = {}
+    for suggestor, by_objective in results["suggestors"].items():
+        for objective, result in by_objective.items():
+            timings["{}/{}/suggestion".format(suggestor, objective)] = result["suggestion_seconds"]["median"]
+            timings["{}/{}/journal_append".format(suggestor, objective)] = result["journal_append_seconds"]["median"]
+
+    for entry in results["param_log"]:
+        for key in ("append_seconds_per_row", "duplicate_seconds_per_row", "batch_append_seconds_per_row"):
+            timings["param_log/{}/{}".format(entry["size"], key)] = entry[key]
+
+    for entry in results["save_log"]:
+        timings["save_log/{}".format(entry["size"])] = entry["save_log_seconds"]
+
+    return timings
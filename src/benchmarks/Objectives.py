@@ -0,0 +1,123 @@
+import math
+import numpy as np
+from src.parameter_config.ParamConfig import SingleParam
+
+
+class BenchmarkObjective:
+    """
+    Synthetic test function wrapped as a sam. The function is minimized, so sam.run returns the negated value and
+    the best possible score is the negated minimum.
+    """
+
+    # Configuration of the parameters and the minimum of the function, set by the subclasses
+    param_config = ()
+    minimum = 0.0
+
+    def evaluate(self, **params):
+        raise NotImplementedError
+
+    @property
+    def optimum(self):
+        """
+        Best possible score. Type: float
+        """
+        return -self.minimum
+
+    def run(self, name, **params):
+        return -self.evaluate(**params)
+
+    def save(self, name):
+        pass
+
+    def set_callbacks(self, callbacks):
+        pass
+
+
+class Branin(BenchmarkObjective):
+    """
+    Branin function on x1 in [-5, 10] and x2 in [0, 15], with three global minima.
+    """
+
+    param_config = (
+        SingleParam("x1", output_type="double", value_range=(-5, 10), scaling="incremental", increment=0.001),
+        SingleParam("x2", output_type="double", value_range=(0, 15), scaling="incremental", increment=0.001)
+    )
+    minimum = 0.397887
+
+    def evaluate(self, x1, x2):
+        b = 5.1 / (4 * math.pi ** 2)
+        c = 5 / math.pi
+        t = 1 / (8 * math.pi)
+
+        return (x2 - b * x1 ** 2 + c * x1 - 6) ** 2 + 10 * (1 - t) * math.cos(x1) + 10
+
+
+class Hartmann6(BenchmarkObjective):
+    """
+    Six dimensional Hartmann function on the unit hypercube.
+    """
+
+    param_config = tuple(SingleParam("x{}".format(i), output_type="double", value_range=(0, 1),
+                                     scaling="incremental", increment=0.0001) for i in range(1, 7))
+    minimum = -3.32237
+
+    _alpha = np.asarray([1.0, 1.2, 3.0, 3.2])
+    _a = np.asarray([[10, 3, 17, 3.5, 1.7, 8],
+                     [0.05, 10, 17, 0.1, 8, 14],
+                     [3, 3.5, 1.7, 10, 17, 8],
+                     [17, 8, 0.05, 10, 0.1, 14]])
+    _p = 1e-4 * np.asarray([[1312, 1696, 5569, 124, 8283, 5886],
+                            [2329, 4135, 8307, 3736, 1004, 9991],
+                            [2348, 1451, 3522, 2883, 3047, 6650],
+                            [4047, 8828, 8732, 5743, 1091, 381]])
+
+    def evaluate(self, **params):
+        x = np.asarray([params["x{}".format(i)] for i in range(1, 7)])
+
+        return float(-np.sum(self._alpha * np.exp(-np.sum(self._a * (x - self._p) ** 2, axis=1))))
+
+
+class Rosenbrock(BenchmarkObjective):
+    """
+    Rosenbrock function on [-2, 2] in each dimension, with the minimum 0 at all ones.
+    """
+
+    def __init__(self, n_dims=4):
+        """
+        :param n_dims: amount of dimensions. Type: int
+        """
+        self.n_dims = n_dims
+        self.param_config = tuple(SingleParam("x{}".format(i), output_type="double", value_range=(-2, 2),
+                                              scaling="incremental", increment=0.001) for i in range(1, n_dims + 1))
+
+    def evaluate(self, **params):
+        x = np.asarray([params["x{}".format(i)] for i in range(1, self.n_dims + 1)])
+
+        return float(np.sum(100 * (x[1:] - x[:-1] ** 2) ** 2 + (1 - x[:-1]) ** 2))
+
+
+class MixedSynthetic(BenchmarkObjective):
+    """
+    Quadratic bowl over a double, an integer, a log scaled and a discrete parameter, shaped like a small neural
+    network configuration. The minimum 0 is at x=0.3, layers=7, learning_rate=10^-2.5 and activation "relu".
+    """
+
+    param_config = (
+        SingleParam("x", output_type="double", value_range=(0, 1), scaling="incremental", increment=0.01),
+        SingleParam("layers", output_type="integer", value_range=(1, 20), scaling="incremental", increment=1),
+        SingleParam("learning_rate", output_type="double", value_range=(0.0001, 0.1), scaling="log"),
+        SingleParam("activation", output_type="discrete", value_range=["relu", "tanh", "sigmoid"])
+    )
+    minimum = 0.0
+
+    _activation_penalty = {"relu": 0.0, "tanh": 0.1, "sigmoid": 0.3}
+
+    def evaluate(self, x, layers, learning_rate, activation):
+        return ((x - 0.3) ** 2 + ((layers - 7) / 10) ** 2 + (math.log10(learning_rate) + 2.5) ** 2 / 4
+                + self._activation_penalty[activation])
+
+
+objectives = {"Branin": Branin,
+              "Hartmann6": Hartmann6,
+              "Rosenbrock": Rosenbrock,
+              "MixedSynthetic": MixedSynthetic}
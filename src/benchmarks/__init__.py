@@ -0,0 +1,2 @@
+from .Objectives import *
+from .Benchmark import *
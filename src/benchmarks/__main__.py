@@ -0,0 +1,31 @@
+import argparse
+from .Benchmark import run_benchmarks, compare_results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs the suggestor and param log benchmarks")
+    parser.add_argument("--output", default="benchmark.json", help="path of the JSON file with the results")
+    parser.add_argument("--suggestors", nargs="+", default=None, help="default is all registered suggestors")
+    parser.add_argument("--objectives", nargs="+", default=None, help="default is all objectives")
+    parser.add_argument("--trials", type=int, default=50, help="trials per suggestor and objective")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000],
+                        help="param log sizes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=None, help="JSON file of an earlier run to compare the timings with")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.suggestors, args.objectives, args.trials, args.sizes, args.seed, args.output)
+
+    for suggestor, by_objective in results["suggestors"].items():
+        for objective, result in by_objective.items():
+            print("{:<18} {:<15} regret {:<10.4g} median suggestion {:.2e} s".format(
+                suggestor, objective, result["regret"], result["suggestion_seconds"]["median"]))
+    for entry in results["param_log"]:
+        print("param log {:>7} rows: append {:.2e} s/row, duplicate check {:.2e} s/row".format(
+            entry["size"], entry["append_seconds_per_row"], entry["duplicate_seconds_per_row"]))
+    for entry in results["save_log"]:
+        print("save_log  {:>7} rows: {:.3f} s".format(entry["size"], entry["save_log_seconds"]))
+
+    if args.baseline is not None:
+        for metric, baseline_seconds, seconds in compare_results(args.baseline, results):
+            print("slower: {} {:.2e} s -> {:.2e} s".format(metric, baseline_seconds, seconds))
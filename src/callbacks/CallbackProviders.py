@@ -0,0 +1,75 @@
+class CallbackProviderBase:
+    """
+    Makes the callbacks the Tuner injects into sam with sam.set_callbacks before each trial. The framework the
+    callbacks belong to is only imported when the first callbacks are made.
+    """
+
+    def make_callbacks(self, name, save_path):
+        """
+        :param name: name of the trial. Type: string
+        :param save_path: storage path of the tuner. Type: string
+        :return: list of callbacks, or None if sam.set_callbacks should not be called
+        """
+        raise NotImplementedError("This class is a baseclass,"
+                                  " this function should be implemented in inheriting classes")
+
+
+class KerasCallbackProvider(CallbackProviderBase):
+    """
+    Keras ModelCheckpoint, EarlyStopping and ReduceLROnPlateau on the validation loss.
+    """
+
+    def __init__(self, patience=24, lr_patience=6, lr_factor=0.5, min_lr=0.0001):
+        self.patience = patience
+        self.lr_patience = lr_patience
+        self.lr_factor = lr_factor
+        self.min_lr = min_lr
+
+    def make_callbacks(self, name, save_path):
+        import keras.callbacks as cb
+
+        model_checkpoint = cb.ModelCheckpoint(save_best_only=True,
+                                              monitor='val_loss',
+                                              filepath=save_path+"/{}".format(name))
+
+        early_stopping = cb.EarlyStopping(monitor="val_loss", patience=self.patience)
+
+        reduce_lr = cb.ReduceLROnPlateau(monitor='val_loss', factor=self.lr_factor,
+                                         patience=self.lr_patience, min_lr=self.min_lr)
+
+        return [model_checkpoint, early_stopping, reduce_lr]
+
+
+class LightningCallbackProvider(CallbackProviderBase):
+    """
+    PyTorch Lightning ModelCheckpoint and EarlyStopping on the validation loss. Learning rate reduction is
+    configured on the optimizer in Lightning and is left to sam.
+    """
+
+    def __init__(self, patience=24):
+        self.patience = patience
+
+    def make_callbacks(self, name, save_path):
+        try:
+            import lightning.pytorch.callbacks as cb
+        except ImportError:
+            import pytorch_lightning.callbacks as cb
+
+        model_checkpoint = cb.ModelCheckpoint(dirpath=save_path, filename=name, monitor="val_loss", save_top_k=1)
+        early_stopping = cb.EarlyStopping(monitor="val_loss", patience=self.patience)
+
+        return [model_checkpoint, early_stopping]
+
+
+class NoCallbackProvider(CallbackProviderBase):
+    """
+    Makes no callbacks, sam.set_callbacks is not called and does not need to exist.
+    """
+
+    def make_callbacks(self, name, save_path):
+        return None
+
+
+callback_providers = {"keras": KerasCallbackProvider,
+                      "lightning": LightningCallbackProvider,
+                      "none": NoCallbackProvider}
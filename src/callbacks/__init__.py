@@ -0,0 +1 @@
+from .CallbackProviders import *
@@ -1,3 +1,4 @@
+import numpy as np
 from src.parameter_config.rescalers import *
 
 
@@ -34,7 +35,9 @@ class ParamConfig:
             if single_param.increment is not None:
                 args.append(single_param.increment)
 
-            rescaler = self._func_types[func_type](*args)
+            # Discrete rescalers name the parameter when a value is not one of its values
+            kwargs = {"name": single_param.name} if func_type == "discrete" else {}
+            rescaler = self._func_types[func_type](*args, **kwargs)
         else:
             raise ValueError("The given func type \"{}\" is not supported".format(func_type))
 
@@ -78,15 +81,28 @@ class ParamConfig:
         else:
             raise ValueError("The given scaling \"{}\" is not supported".format(scaling))
 
-    def _discrete(self, discrete_values):
+    def _discrete(self, discrete_values, name=None):
         min_range = 0
         max_range = len(discrete_values)-1
 
         internal_rescaler = incremental_rescaler(1, (min_range, max_range))
+        value_table = np.asarray(discrete_values)
+        sort_order = np.argsort(value_table)
 
         def rescaler(value):
-            idx = internal_rescaler(value)
-            return discrete_values[int(round(idx))]
+            idx = np.rint(internal_rescaler(value)).astype(np.int64)
+
+            if np.ndim(idx) == 0:
+                return discrete_values[int(idx)]
+
+            return value_table[idx]
+
+        def inverse(value):
+            # Finding the position of the values in the discrete values
+            idx = discrete_index(value_table, sort_order, value, name)
+            return internal_rescaler.inverse(idx)
+
+        rescaler.inverse = inverse
 
         return rescaler
 
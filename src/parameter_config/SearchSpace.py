@@ -0,0 +1,361 @@
+import numbers
+import numpy as np
+from src.parameter_config.ParamConfig import ParamConfig
+from src.parameter_config.rescalers import discrete_index
+
+
+class SearchSpace:
+    """
+    Compiled search space. The SingleParam configuration is flattened into NumPy arrays with one entry per
+    dimension, so that whole matrices of unscaled parameters can be rescaled at once and suggestors can look up
+    what kind of parameter each dimension is.
+    """
+
+    # Type codes of the dimensions
+    INCREMENTAL = 0
+    LOG = 1
+    INT_LOG = 2
+    DISCRETE = 3
+
+    def __init__(self, params, constraints=None):
+        """
+        :param params: configuration of the parameters. Type: list of SingleParam
+        :param constraints: predicates that feasible parameters satisfy. Each is given a dict from parameter name
+               to an array with the actual values of a batch of parameters, and returns a boolean array that is
+               True for the feasible ones, e.g. lambda p: p["hidden_size_l"] * p["batch_size"] <= 2 ** 17.
+               Type: list of functions
+        """
+        params = list(params)
+        self.constraints = [] if constraints is None else list(constraints)
+
+        # Amount of parameters checked against the constraints and amount of them that were infeasible
+        self.n_checked = 0
+        self.n_infeasible = 0
+
+        # The rescale functions are kept for code that works on single values
+        p_config = ParamConfig()
+        self.rescale_functions, self.param_names = p_config.make_rescale_dict(params)
+        self.n_params = len(params)
+
+        self.type_codes = np.zeros(self.n_params, dtype=np.int8)
+        self.lower_bounds = np.zeros(self.n_params)
+        self.upper_bounds = np.zeros(self.n_params)
+        self.increments = np.full(self.n_params, np.nan)
+
+        # Category tables of the discrete dimensions are stored back to back in one array
+        self.category_offsets = np.zeros(self.n_params, dtype=np.int64)
+        self.n_categories = np.zeros(self.n_params, dtype=np.int64)
+        categories = []
+
+        for i, single_param in enumerate(params):
+            self._compile_param(i, single_param, categories)
+
+        # Mixed categories are kept as python objects, so numeric categories are not turned into strings
+        numeric = all(isinstance(value, numbers.Number) for value in categories)
+        self.categories = np.asarray(categories, dtype=None if numeric else object) if categories else np.zeros(0)
+
+        # Masks of the dimensions by type
+        self._incremental = np.isin(self.type_codes, (self.INCREMENTAL, self.DISCRETE))
+        self._log = np.isin(self.type_codes, (self.LOG, self.INT_LOG))
+        self._discrete = self.type_codes == self.DISCRETE
+        self._discrete_idx = np.flatnonzero(self._discrete)
+        self._int_output = (self.type_codes == self.INT_LOG) | (self._discrete & self._integer_categories())
+
+        self._lattice = [self._make_lattice(i) for i in range(0, self.n_params)]
+        self._numeric_dims = np.asarray([not self._discrete[i] or all(isinstance(value, numbers.Number)
+                                                                      for value in self._lattice[i].tolist())
+                                         for i in range(0, self.n_params)], dtype=bool)
+        self._unscaled_lattice = [self._make_unscaled_lattice(i) for i in range(0, self.n_params)]
+
+    def _compile_param(self, i, single_param, categories):
+        value_range = single_param.value_range
+        scaling = "incremental" if single_param.scaling is None else single_param.scaling
+
+        if single_param.output_type == "discrete":
+            self.type_codes[i] = self.DISCRETE
+            self.lower_bounds[i] = 0
+            self.upper_bounds[i] = len(value_range) - 1
+            self.increments[i] = 1
+            self.category_offsets[i] = len(categories)
+            self.n_categories[i] = len(value_range)
+            categories.extend(value_range)
+
+        elif scaling == "log":
+            self.type_codes[i] = self.INT_LOG if single_param.output_type == "integer" else self.LOG
+            self.lower_bounds[i] = min(value_range)
+            self.upper_bounds[i] = max(value_range)
+
+        else:
+            self.type_codes[i] = self.INCREMENTAL
+            self.lower_bounds[i] = min(value_range)
+            self.upper_bounds[i] = max(value_range)
+
+            if single_param.increment is not None:
+                self.increments[i] = single_param.increment
+            elif single_param.output_type == "integer":
+                self.increments[i] = 1
+            else:
+                self.increments[i] = (self.upper_bounds[i] - self.lower_bounds[i]) / 100
+
+    def _integer_categories(self):
+        if len(self.categories) == 0 or not np.issubdtype(self.categories.dtype, np.number):
+            return False
+
+        return np.issubdtype(self.categories.dtype, np.integer)
+
+    def transform(self, unscaled_params):
+        """
+        Rescales unscaled parameters into actual parameters. Gives the same values as the rescale functions up to
+        floating point rounding, as the powers of the log dimensions may differ in the last bit between single
+        values and arrays.
+        :param unscaled_params: array of shape (n, n_params) with values in the range 0-1
+        :return: array of shape (n, n_params) with the actual parameters. The array is of type object if a
+                 discrete dimension has values that are not numbers.
+        """
+        unscaled_params = np.asarray(unscaled_params, dtype=np.float64).reshape((-1, self.n_params))
+        if np.any((unscaled_params < 0) | (unscaled_params > 1)):
+            raise ValueError("The unscaled parameters are not within the range 0-1")
+
+        real = np.empty(unscaled_params.shape)
+
+        # Incremental dimensions, discrete dimensions are rescaled into the index of their value
+        inc = self._incremental
+        if inc.any():
+            lower = self.lower_bounds[inc]
+            upper = self.upper_bounds[inc]
+            increments = self.increments[inc]
+
+            result = (upper - lower) * unscaled_params[:, inc] + lower
+            result = result + increments / 2
+            result = result - np.mod(result, increments)
+
+            # Snapping values that are off the range by floating point imprecision
+            tolerance = 0.001 * increments
+            result = np.where((result > upper) & (result - upper < tolerance), upper, result)
+            result = np.where((result < lower) & (lower - result < tolerance), lower, result)
+            real[:, inc] = result
+
+        # Log dimensions
+        log = self._log
+        if log.any():
+            a = np.log10(self.lower_bounds[log])
+            b = np.log10(self.upper_bounds[log])
+            real[:, log] = 10 ** ((b - a) * unscaled_params[:, log] + a)
+
+        int_log = self.type_codes == self.INT_LOG
+        real[:, int_log] = np.rint(real[:, int_log])
+
+        if len(self._discrete_idx) == 0:
+            return real
+
+        # Looking up the values of the discrete dimensions
+        category_idx = np.rint(real[:, self._discrete]).astype(np.int64) + self.category_offsets[self._discrete]
+        if np.issubdtype(self.categories.dtype, np.number):
+            real[:, self._discrete] = self.categories[category_idx]
+            return real
+
+        real = real.astype(object)
+        real[:, self._discrete] = self.categories[category_idx]
+        return real
+
+    def inverse(self, real_params):
+        """
+        Rescales actual parameters back into unscaled parameters in the range 0-1.
+        :param real_params: array of shape (n, n_params) with actual parameters
+        :return: array of shape (n, n_params) with the unscaled parameters
+        """
+        real_params = np.asarray(real_params).reshape((-1, self.n_params))
+        unscaled = np.zeros(real_params.shape)
+
+        # Replacing the values of the discrete dimensions with their index
+        numeric = np.zeros(real_params.shape)
+        continuous = ~self._discrete
+        numeric[:, continuous] = real_params[:, continuous].astype(np.float64)
+        for i in self._discrete_idx:
+            table = self.categories[self.category_offsets[i]:self.category_offsets[i] + self.n_categories[i]]
+            sort_order = np.argsort(table)
+            numeric[:, i] = discrete_index(table, sort_order, real_params[:, i], self.param_names[i])
+
+        lower = self.lower_bounds
+        upper = self.upper_bounds
+        width = upper - lower
+
+        inc = self._incremental & (width > 0)
+        unscaled[:, inc] = (numeric[:, inc] - lower[inc]) / width[inc]
+
+        log = self._log & (width > 0)
+        a = np.log10(lower[log])
+        b = np.log10(upper[log])
+        unscaled[:, log] = (np.log10(numeric[:, log]) - a) / (b - a)
+
+        return np.clip(unscaled, 0, 1)
+
+    def to_dicts(self, real_params):
+        """
+        Makes parameter dicts out of actual parameters. Integer log and integer discrete values are given as ints.
+        :param real_params: array of shape (n, n_params) with actual parameters
+        :return: list of n dicts from parameter name to value
+        """
+        columns = []
+        for i in range(0, self.n_params):
+            column = real_params[:, i]
+            if self._int_output[i]:
+                column = column.astype(np.int64)
+            columns.append(column.tolist())
+
+        return [dict(zip(self.param_names, values)) for values in zip(*columns)]
+
+    def feasible(self, real_params, count=True):
+        """
+        Checks a batch of actual parameters against the constraints.
+        :param real_params: array of shape (n, n_params) with actual parameters
+        :param count: whether the parameters count towards the rejection rate. Candidates that are only screened,
+               and not proposed, should not be counted. Type: bool
+        :return: boolean array of length n, True for the parameters that satisfy all constraints
+        """
+        real_params = np.asarray(real_params).reshape((-1, self.n_params))
+        mask = np.ones(len(real_params), dtype=bool)
+        if not self.constraints or len(real_params) == 0:
+            return mask
+
+        # Numeric columns of object arrays are given as floats, so the predicates can do arithmetic on them
+        columns = {}
+        for i, name in enumerate(self.param_names):
+            column = real_params[:, i]
+            if column.dtype == object and self._numeric_dims[i]:
+                column = column.astype(np.float64)
+            columns[name] = column
+
+        for constraint in self.constraints:
+            mask &= np.broadcast_to(np.asarray(constraint(columns), dtype=bool), mask.shape)
+
+        if count:
+            self.n_checked += len(mask)
+            self.n_infeasible += int(len(mask) - mask.sum())
+
+        return mask
+
+    @property
+    def rejection_rate(self):
+        """
+        Fraction of the counted parameters that were infeasible. Type: float
+        """
+        return self.n_infeasible / self.n_checked if self.n_checked > 0 else 0.0
+
+    @property
+    def cardinality(self):
+        """
+        Amount of reachable values of each dimension, inf for continuous dimensions. Type: array of floats
+        """
+        return np.asarray([np.inf if lattice is None else len(lattice) for lattice in self._lattice],
+                          dtype=np.float64)
+
+    @property
+    def lattice(self):
+        """
+        The reachable values of each dimension, None for continuous dimensions. Type: list of arrays
+        """
+        return self._lattice
+
+    @property
+    def unscaled_lattice(self):
+        """
+        Unscaled values that transform into the values of the lattice, None for continuous dimensions.
+        Type: list of arrays
+        """
+        return self._unscaled_lattice
+
+    def lattice_index(self, real_params):
+        """
+        Finds the index of actual parameters in the lattice of their dimension.
+        :param real_params: array of shape (n, n_params) with actual parameters
+        :return: integer array of shape (n, n_params), -1 in continuous dimensions
+        """
+        real_params = np.asarray(real_params).reshape((-1, self.n_params))
+        idx = np.full(real_params.shape, -1, dtype=np.int64)
+
+        for i, lattice in enumerate(self._lattice):
+            if lattice is None:
+                continue
+
+            if self.type_codes[i] == self.DISCRETE:
+                sort_order = np.argsort(lattice)
+                idx[:, i] = sort_order[np.searchsorted(lattice, real_params[:, i], sorter=sort_order)]
+            elif len(lattice) == 1:
+                idx[:, i] = 0
+            else:
+                # The nearest lattice value, so floating point differences do not matter
+                values = real_params[:, i].astype(np.float64)
+                right = np.clip(np.searchsorted(lattice, values), 1, len(lattice) - 1)
+                nearer_left = values - lattice[right - 1] < lattice[right] - values
+                idx[:, i] = np.where(nearer_left, right - 1, right)
+
+        return idx
+
+    def lattice_box(self, lower=None, upper=None):
+        """
+        Finds the lattice values that can be reached from unscaled parameters within a box.
+        :param lower: lower corner of the box, default is all zeros. Type: array of n_params floats
+        :param upper: upper corner of the box, default is all ones. Type: array of n_params floats
+        :return: list with, per dimension, the unscaled values within the box that transform into the reachable
+                 lattice values, or None for continuous dimensions
+        """
+        lower = np.zeros(self.n_params) if lower is None else np.asarray(lower, dtype=np.float64)
+        upper = np.ones(self.n_params) if upper is None else np.asarray(upper, dtype=np.float64)
+
+        # The transform is monotonic, so the reachable values are those between the values of the corners
+        ends = self.lattice_index(self.transform(np.vstack([lower, upper])))
+
+        box = []
+        for i, unscaled_lattice in enumerate(self._unscaled_lattice):
+            if unscaled_lattice is None:
+                box.append(None)
+            else:
+                box.append(np.clip(unscaled_lattice[ends[0, i]:ends[1, i] + 1], lower[i], upper[i]))
+
+        return box
+
+    def _make_unscaled_lattice(self, i):
+        lattice = self._lattice[i]
+        if lattice is None:
+            return None
+
+        lower = self.lower_bounds[i]
+        upper = self.upper_bounds[i]
+        if upper == lower:
+            return np.zeros(len(lattice))
+
+        if self.type_codes[i] == self.DISCRETE:
+            return np.arange(0, len(lattice)) / (len(lattice) - 1)
+
+        if self.type_codes[i] == self.INT_LOG:
+            unscaled = (np.log10(lattice) - np.log10(lower)) / (np.log10(upper) - np.log10(lower))
+        else:
+            unscaled = (lattice - lower) / (upper - lower)
+
+        return np.clip(unscaled, 0, 1)
+
+    def _make_lattice(self, i):
+        type_code = self.type_codes[i]
+
+        if type_code == self.DISCRETE:
+            return self.categories[self.category_offsets[i]:self.category_offsets[i] + self.n_categories[i]]
+
+        if type_code == self.INT_LOG:
+            return np.arange(np.rint(self.lower_bounds[i]), np.rint(self.upper_bounds[i]) + 1)
+
+        if type_code == self.LOG:
+            return None
+
+        # The incremental values are multiples of the increment between the rescaled ends of the range
+        lower = self.lower_bounds[i]
+        upper = self.upper_bounds[i]
+        increment = self.increments[i]
+        ends = self.transform(np.vstack([np.zeros(self.n_params), np.ones(self.n_params)]))[:, i].astype(np.float64)
+
+        multiples = np.arange(np.rint(ends[0] / increment), np.rint(ends[1] / increment) + 1) * increment
+        tolerance = 0.001 * increment
+        multiples = np.where((multiples > upper) & (multiples - upper < tolerance), upper, multiples)
+        multiples = np.where((multiples < lower) & (lower - multiples < tolerance), lower, multiples)
+
+        return multiples
@@ -1,2 +1,2 @@
 from .ParamConfig import *
-
+from .SearchSpace import *
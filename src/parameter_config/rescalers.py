@@ -4,6 +4,8 @@ import numpy as np
 def create_min_max_rescaler(original_min_max, target_min_max):
     """
     Min max rescaler creator. Creates a rescaler that rescales from target range into original range.
+    The rescaler works on single values as well as on arrays of values, and has an attribute inverse that
+    rescales from original range back into target range.
     :param original_min_max: tuple of floats, the range of values that is rescaled to
     :param target_min_max: tuple of floats, the range of value used to input to the rescaler
     :return: function, the created min_max_rescaler
@@ -14,19 +16,31 @@ def create_min_max_rescaler(original_min_max, target_min_max):
     t_max = max(target_min_max)
 
     def min_max_rescaler(x):
-        if (t_min > x) or (x > t_max):
+        x = np.asarray(x)
+        if np.any((t_min > x) | (x > t_max)):
             raise ValueError("x is not within the min and max range of the rescaler. "
                              "\n min/max: {}-{}"
                              "\n x: {}".format(t_min, t_max, x))
 
         return ((o_max - o_min) * (x - t_min)) / (t_max - t_min) + o_min
 
+    def inverse(y):
+        y = np.asarray(y)
+        if o_max == o_min:
+            return np.full(y.shape, t_min, dtype=np.float64)[()]
+
+        return ((t_max - t_min) * (y - o_min)) / (o_max - o_min) + t_min
+
+    min_max_rescaler.inverse = inverse
+
     return min_max_rescaler
 
 
 def incremental_rescaler(incremental, min_max_range):
     """
     Rescaler creator that creates a rescaler that rescales into a range with increments.
+    The rescaler works on single values as well as on arrays of values, and has an attribute inverse that
+    rescales actual values back into the range 0-1.
     :param incremental: float, the rescaled value is rounded to nearest multiple of incremental
     :param min_max_range: tuple of floats, min and max of range to rescale into
     :return: function, the created rescaler
@@ -42,21 +56,19 @@ def incremental_rescaler(incremental, min_max_range):
         rescaled_value = min_max_scaler(value)
         # Round to neares incremental value and return it
         result = rescaled_value + incremental / 2
-        result -= result % incremental
+        result = result - np.mod(result, incremental)
 
         # Floating point inprecision makes it necessary to create checks for small misalingments
         # To avoid breaking the unit testing, the difference has to be less than 0.1 % of increment
-        if result > max_range:
-            diff = result - max_range
-            if diff < (0.001 * incremental):
-                result = max_range
+        result = np.where((result > max_range) & (result - max_range < (0.001 * incremental)), max_range, result)
+        result = np.where((result < min_range) & (min_range - result < (0.001 * incremental)), min_range, result)
 
-        if result < min_range:
-            diff = min_range - result
-            if diff < (0.001 * incremental):
-                result = min_range
+        return result[()]
 
-        return result
+    def inverse(value):
+        return np.clip(min_max_scaler.inverse(value), 0, 1)[()]
+
+    rescaler.inverse = inverse
 
     return rescaler
 
@@ -64,6 +76,8 @@ def incremental_rescaler(incremental, min_max_range):
 def log_rescaler(min_max_range, int_log=False):
     """
     Rescaler creator that creates a resclaer which rescales into a range with logarithmic increment.
+    The rescaler works on single values as well as on arrays of values, and has an attribute inverse that
+    rescales actual values back into the range 0-1.
     :param min_max_range: tuple of float, min and max range to rescale into
     :return: function, the created rescaler
     """
@@ -80,14 +94,17 @@ def log_rescaler(min_max_range, int_log=False):
     if int_log:
         if min_range < 1 or max_range < 1:
             raise ValueError("With int_log min_range and max_range can not be less than 1\n"
-                             "min_range: {}, max_range: {]".format(min_range, max_range))
+                             "min_range: {}, max_range: {}".format(min_range, max_range))
 
         def rescaler(value):
             # calculate log rescale value
             r = min_max_log_scale(value)
             log_rescale_value = 10 ** r
 
-            return int(round(log_rescale_value))
+            if np.ndim(log_rescale_value) == 0:
+                return int(round(log_rescale_value))
+
+            return np.rint(log_rescale_value).astype(np.int64)
     else:
         def rescaler(value):
             # calculate log rescale value
@@ -96,4 +113,34 @@ def log_rescaler(min_max_range, int_log=False):
 
             return log_rescale_value
 
+    def inverse(value):
+        return np.clip(min_max_log_scale.inverse(np.log10(value)), 0, 1)[()]
+
+    rescaler.inverse = inverse
+
     return rescaler
+
+
+def discrete_index(value_table, sort_order, value, name=None):
+    """
+    Finds the positions of values in a table of discrete values.
+    :param value_table: array of the discrete values
+    :param sort_order: argsort of value_table
+    :param value: a value or an array of values to look up
+    :param name: name of the parameter, used in the error message. Type: string
+    :return: int or array of ints, the positions of the values in value_table
+    """
+    value = np.asarray(value)
+    try:
+        position = np.searchsorted(value_table, value, sorter=sort_order)
+        idx = sort_order[np.clip(position, 0, len(value_table) - 1)]
+        found = np.asarray(value_table[idx] == value, dtype=bool)
+    except TypeError:
+        found = np.zeros(value.shape, dtype=bool)
+
+    if not np.all(found):
+        raise ValueError("The value is not one of the discrete values of the parameter {}. "
+                         "\n discrete values: {}"
+                         "\n value: {}".format(name, value_table.tolist(), np.atleast_1d(value)[~np.atleast_1d(found)].tolist()))
+
+    return idx
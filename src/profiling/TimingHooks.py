@@ -0,0 +1,168 @@
+import os
+import json
+import threading
+import cProfile
+import pstats
+
+
+class TimingHookBase:
+    """
+    Receives the timing spans of the Tuner. A span is a dict with the keys "trial" (index of the trial in the param
+    log, None for spans that do not belong to a trial), "phase", "start" (time.time() when the span started) and,
+    once it has ended, "seconds". The phases are "suggestion", "callbacks", "run", "scoring" and "persistence" for
+    every trial, "cache" for looking a trial up in the evaluation cache, "wait" for the time the parallel tuner
+    waits on its workers and "save_log" for writing the npy and csv files.
+    """
+
+    def span_start(self, span):
+        """
+        Called when a span starts. Spans of trials that run in workers are only reported to span_end.
+        :param span: the span, without "seconds". Type: dict
+        """
+        pass
+
+    def span_end(self, span):
+        """
+        Called when a span has ended.
+        :param span: the span. Type: dict
+        """
+        raise NotImplementedError("This class is a baseclass,"
+                                  " this function should be implemented in inheriting classes")
+
+    def close(self):
+        """
+        Called when tuning stops.
+        """
+        pass
+
+
+class MemoryCollector(TimingHookBase):
+    """
+    Keeps the spans in a list.
+    """
+
+    def __init__(self):
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def span_end(self, span):
+        with self._lock:
+            self.spans.append(dict(span))
+
+    def summary(self):
+        """
+        :return: where the study time went, see summarize_spans. Type: dict
+        """
+        with self._lock:
+            return summarize_spans(self.spans)
+
+
+class JsonlSink(TimingHookBase):
+    """
+    Appends the spans to a file as JSON lines. The file is flushed after every span but not fsync'd, as the spans
+    are diagnostics and not part of the study.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: path of the file. Type: string
+        """
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self._file = None
+        self._lock = threading.Lock()
+
+    def span_end(self, span):
+        line = json.dumps(span) + "\n"
+
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a")
+
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class SuggestionProfiler(TimingHookBase):
+    """
+    Runs cProfile during the spans of the given phases, by default only while the suggestors make suggestions.
+    The profile accumulates over all trials.
+    """
+
+    def __init__(self, phases=("suggestion", )):
+        """
+        :param phases: phases to profile. Profiling "run" only works for trials run in the tuning thread.
+               Type: list of strings
+        """
+        self.phases = set(phases)
+        self.profile = cProfile.Profile()
+
+    def span_start(self, span):
+        if span["phase"] in self.phases:
+            self.profile.enable()
+
+    def span_end(self, span):
+        if span["phase"] in self.phases:
+            self.profile.disable()
+
+    def stats(self, sort="cumulative"):
+        """
+        :param sort: key to sort the statistics by. Type: string
+        :return: the profile. Type: pstats.Stats
+        """
+        return pstats.Stats(self.profile).sort_stats(sort)
+
+    def dump(self, path):
+        """
+        Writes the profile in the format of cProfile, e.g. for snakeviz.
+        :param path: path of the file. Type: string
+        """
+        self.profile.dump_stats(path)
+
+
+def read_spans(path):
+    """
+    Reads the spans written by a JsonlSink.
+    :param path: path of the file. Type: string
+    :return: list of spans
+    """
+    with open(path, "r") as spans_file:
+        return [json.loads(line) for line in spans_file if line.endswith("\n")]
+
+
+def summarize_spans(spans):
+    """
+    Sums the spans per phase. Time in the "run" phase is spent in sam.run, in the "wait" phase the tuner is idle and
+    the other phases are overhead of the tuner. In parallel tuning the runs overlap, so their total can exceed the
+    wall time of the study.
+    :param spans: list of spans
+    :return: dict with "phases", from phase to its count, total, mean and max seconds and its fraction of the total
+             time of all spans, and "tuner_seconds", "run_seconds", "wait_seconds" and "tuner_fraction", the
+             fraction of the tuner overhead in the tuner and run time
+    """
+    phases = {}
+    for span in spans:
+        phase = phases.setdefault(span["phase"], {"count": 0, "total": 0.0, "max": 0.0})
+        phase["count"] += 1
+        phase["total"] += span["seconds"]
+        phase["max"] = max(phase["max"], span["seconds"])
+
+    total = sum(phase["total"] for phase in phases.values())
+    for phase in phases.values():
+        phase["mean"] = phase["total"] / phase["count"]
+        phase["fraction"] = phase["total"] / total if total > 0 else 0.0
+
+    run_seconds = phases["run"]["total"] if "run" in phases else 0.0
+    wait_seconds = phases["wait"]["total"] if "wait" in phases else 0.0
+    tuner_seconds = total - run_seconds - wait_seconds
+
+    return {"phases": phases,
+            "tuner_seconds": tuner_seconds,
+            "run_seconds": run_seconds,
+            "wait_seconds": wait_seconds,
+            "tuner_fraction": tuner_seconds / (tuner_seconds + run_seconds) if total > wait_seconds else 0.0}
@@ -0,0 +1 @@
+from .TimingHooks import *
@@ -0,0 +1,38 @@
+import numpy as np
+from .PrunerBase import PrunerBase
+
+
+class PercentilePruner(PrunerBase):
+    """
+    Prunes a trial if its reported value is worse than the given percentile of the values the completed trials
+    reported at the same step, e.g. with percentile 25 only trials in the best quarter are kept.
+    """
+
+    def __init__(self, percentile, maximize=True, n_startup_trials=5, n_warmup_steps=0):
+        super(PercentilePruner, self).__init__(maximize=maximize, n_startup_trials=n_startup_trials,
+                                               n_warmup_steps=n_warmup_steps)
+
+        if not 0 <= percentile <= 100:
+            raise ValueError("percentile must be between 0 and 100 but is {}".format(percentile))
+        self.percentile = percentile
+
+    def calculate_prune(self, param_log, idx, step, value):
+        values = self._completed_values_at_step(param_log, idx, step)
+        if len(values) < self.n_startup_trials:
+            return False
+
+        if self.maximize:
+            return value < np.nanpercentile(values, 100 - self.percentile)
+
+        return value > np.nanpercentile(values, self.percentile)
+
+
+class MedianPruner(PercentilePruner):
+    """
+    Prunes a trial if its reported value is worse than the median of the values the completed trials reported at
+    the same step.
+    """
+
+    def __init__(self, maximize=True, n_startup_trials=5, n_warmup_steps=0):
+        super(MedianPruner, self).__init__(50, maximize=maximize, n_startup_trials=n_startup_trials,
+                                           n_warmup_steps=n_warmup_steps)
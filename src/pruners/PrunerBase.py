@@ -0,0 +1,78 @@
+import numpy as np
+from src.suggestors.SuggestorBase import ParamLog
+
+
+class TrialPruned(Exception):
+    """
+    Raised by the report function given to sam.run when the trial should be stopped. sam.run should let it
+    propagate, the Tuner catches it and logs the trial as pruned.
+    """
+
+    def __init__(self, step, value):
+        super(TrialPruned, self).__init__("Trial pruned at step {} with value {}".format(step, value))
+        self.step = step
+        self.value = value
+
+
+class PrunerBase:
+
+    def __init__(self, maximize=True, n_startup_trials=5, n_warmup_steps=0):
+        """
+        :param maximize: whether higher reported values are better. Type: bool
+        :param n_startup_trials: amount of completed trials before any trial is pruned. Type: int
+        :param n_warmup_steps: steps of a trial before it can be pruned. Type: int
+        """
+        self.maximize = maximize
+        self.n_startup_trials = n_startup_trials
+        self.n_warmup_steps = n_warmup_steps
+
+    def prune(self, param_log, idx, step):
+        """
+        Decides whether or not a trial should be stopped after it reported a value.
+        :param param_log: log with the reported values of all trials. Type: ParamLog
+        :param idx: index of the trial in the param log, counting from 1. Type: int
+        :param step: the step the trial reported at. Type: int
+        :return: True if the trial should be stopped
+        """
+        if step < self.n_warmup_steps:
+            return False
+
+        value = param_log.get_intermediate_at_step(step)[idx]
+        if np.isnan(value):
+            return True
+
+        return self.calculate_prune(param_log, idx, step, value)
+
+    def calculate_prune(self, param_log, idx, step, value):
+        raise NotImplementedError("This class is a baseclass,"
+                                  " this function should be implemented in inheriting classes")
+
+    def _completed_values_at_step(self, param_log, idx, step):
+        """
+        :return: array with the values the other completed trials reported at the step
+        """
+        status = param_log.get_status()
+        values = [value for i, value in param_log.get_intermediate_at_step(step).items()
+                  if i != idx and status[i-1] == ParamLog.COMPLETED]
+
+        return np.asarray(values, dtype=np.float64)
+
+
+class Reporter:
+    """
+    The report function given to sam.run. Calling it with a step and a value logs the value and raises TrialPruned
+    if the pruner decides that the trial should be stopped.
+    """
+
+    def __init__(self, param_log, idx, pruner):
+        self.param_log = param_log
+        self.idx = idx
+        self.pruner = pruner
+        self.last_value = None
+
+    def __call__(self, step, value):
+        self.param_log.log_intermediate(value, step, idx=self.idx)
+        self.last_value = value
+
+        if self.pruner.prune(self.param_log, self.idx, step):
+            raise TrialPruned(step, value)
@@ -0,0 +1,21 @@
+from .PrunerBase import PrunerBase
+
+
+class ThresholdPruner(PrunerBase):
+    """
+    Prunes a trial if its reported value is below lower or above upper.
+    """
+
+    def __init__(self, lower=None, upper=None, n_warmup_steps=0):
+        super(ThresholdPruner, self).__init__(n_startup_trials=0, n_warmup_steps=n_warmup_steps)
+
+        if lower is None and upper is None:
+            raise ValueError("Either lower or upper must be given")
+        self.lower = lower
+        self.upper = upper
+
+    def calculate_prune(self, param_log, idx, step, value):
+        if self.lower is not None and value < self.lower:
+            return True
+
+        return self.upper is not None and value > self.upper
@@ -0,0 +1,3 @@
+from .PrunerBase import *
+from .MedianPruner import *
+from .ThresholdPruner import *
@@ -0,0 +1,66 @@
+import math
+import numpy as np
+
+
+class Hyperband:
+    """
+    Schedule of Hyperband. Each bracket is a round of successive halving: n configurations are run on a small
+    budget, the best 1/eta of them are run again on an eta times larger budget, and so on until the maximum budget
+    is reached. The brackets differ in how many configurations they start with and how small their first budget is.
+    """
+
+    def __init__(self, min_budget, max_budget, eta=3):
+        """
+        :param min_budget: smallest budget a configuration is run with. Type: int or float
+        :param max_budget: largest budget a configuration is run with. Type: int or float
+        :param eta: factor between the budgets of two rungs, only the best 1/eta configurations of a rung are
+               promoted. Type: int
+        """
+        if not 0 < min_budget <= max_budget:
+            raise ValueError("min_budget must be positive and no larger than max_budget")
+        if eta < 2:
+            raise ValueError("eta must be at least 2")
+
+        self.min_budget = min_budget
+        self.max_budget = max_budget
+        self.eta = eta
+
+        # Budgets are given as ints if the limits are ints, e.g. epochs
+        self.integer_budget = isinstance(min_budget, (int, np.integer)) and isinstance(max_budget, (int, np.integer))
+        self.s_max = int(math.floor(math.log(max_budget / min_budget, eta) + 1e-9))
+
+    def bracket(self, s):
+        """
+        :param s: index of the bracket, from s_max for the most aggressive bracket down to 0 for plain evaluation
+               on the maximum budget. Type: int
+        :return: list of the rungs of the bracket as (amount of configurations, budget) tuples
+        """
+        n = int(math.ceil((self.s_max + 1) / (s + 1) * self.eta ** s))
+
+        rungs = []
+        for i in range(0, s + 1):
+            n_i = int(math.floor(n * self.eta ** (-i)))
+            budget = self.max_budget * self.eta ** (i - s)
+            if self.integer_budget:
+                budget = int(round(budget))
+            rungs.append((max(n_i, 1), budget))
+
+        return rungs
+
+    def brackets(self):
+        """
+        Generator that cycles through the brackets, starting with the most aggressive one.
+        """
+        while True:
+            for s in range(self.s_max, -1, -1):
+                yield self.bracket(s)
+
+    @staticmethod
+    def promote(scores, n_promoted):
+        """
+        :param scores: scores of the configurations of a rung. Type: array
+        :param n_promoted: amount of configurations to promote. Type: int
+        :return: positions of the configurations with the highest scores, best first
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        return np.argsort(-scores, kind="stable")[:n_promoted]
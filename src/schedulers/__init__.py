@@ -0,0 +1 @@
+from .Hyperband import *
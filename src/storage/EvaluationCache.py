@@ -0,0 +1,108 @@
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+import numpy as np
+
+
+class EvaluationCache:
+    """
+    On-disk cache of the scores of evaluated parameters, shared between studies. An entry is keyed by a hash of
+    the actual parameter dict and a version tag of the objective, which should be changed whenever the results of
+    sam.run would change, e.g. when the data or the model changes. The cache holds at most max_entries entries
+    and the least recently used entries are evicted first.
+    """
+
+    def __init__(self, path, version="", max_entries=100000, timeout=60.0):
+        """
+        :param path: path of the SQLite database file, which is created if it does not exist. Type: string
+        :param version: version tag of the objective. Type: string
+        :param max_entries: maximum amount of entries in the cache. Type: int
+        :param timeout: seconds to wait for another process writing to the cache. Type: float
+        """
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.version = str(version)
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, timeout=timeout, check_same_thread=False)
+        with self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, score REAL, "
+                                     "seconds REAL, last_used INTEGER)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS cache_last_used ON cache (last_used)")
+
+    def make_key(self, params):
+        """
+        :param params: the actual parameters. Type: dict
+        :return: hash of the parameters and the version tag. Type: string
+        """
+        canonical = json.dumps({"version": self.version,
+                                "params": {str(name): _to_python(value) for name, value in params.items()}},
+                               sort_keys=True)
+
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, params):
+        """
+        :param params: the actual parameters. Type: dict
+        :return: the score, or the array of scores of several objectives, and the seconds sam.run took, or None if
+                 the parameters are not in the cache
+        """
+        key = self.make_key(params)
+
+        with self._lock, self._connection:
+            row = self._connection.execute("SELECT score, seconds FROM cache WHERE key = ?", (key, )).fetchone()
+            if row is None:
+                return None
+
+            self._connection.execute("UPDATE cache SET last_used = ? WHERE key = ?", (self._next_use(), key))
+
+        # The scores of several objectives are stored as a JSON list
+        if isinstance(row[0], str):
+            return np.asarray(json.loads(row[0]), dtype=np.float64), row[1]
+
+        return (np.nan if row[0] is None else row[0]), row[1]
+
+    def put(self, params, score, seconds=None):
+        """
+        Adds the score of parameters to the cache, evicting the least recently used entries if it is full.
+        :param params: the actual parameters. Type: dict
+        :param score: the score sam.run returned. Type: float or array
+        :param seconds: the seconds sam.run took. Type: float
+        """
+        key = self.make_key(params)
+        score = float(score) if np.ndim(score) == 0 else json.dumps(np.asarray(score, dtype=np.float64).tolist())
+
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)",
+                                     (key, score, seconds, self._next_use()))
+
+            n_evict = self._connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_entries
+            if n_evict > 0:
+                self._connection.execute("DELETE FROM cache WHERE key IN "
+                                         "(SELECT key FROM cache ORDER BY last_used LIMIT ?)", (n_evict, ))
+
+    def _next_use(self):
+        # Uses are numbered instead of timed, so the order is exact and does not depend on the clocks of machines
+        return self._connection.execute("SELECT COALESCE(MAX(last_used), 0) + 1 FROM cache").fetchone()[0]
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM cache")
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def _to_python(value):
+    # NumPy scalars are hashed like the Python values they equal
+    if isinstance(value, np.generic):
+        return value.item()
+
+    return value
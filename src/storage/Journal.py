@@ -0,0 +1,104 @@
+import os
+import json
+import threading
+
+
+class Journal:
+    """
+    Append-only journal of trials. Every record is written as a single JSON line which is flushed and fsync'd
+    before append returns, so the cost of persisting a trial does not grow with the amount of trials.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: path of the journal file, made absolute so the journal does not depend on the working
+               directory. Type: string
+        """
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self._file = None
+        self._lock = threading.Lock()
+
+    def append(self, record):
+        """
+        Appends a record to the journal.
+        :param record: JSON serializable record. Type: dict
+        """
+        line = json.dumps(record) + "\n"
+
+        with self._lock:
+            if self._file is None:
+                self._truncate_partial_line()
+                self._file = open(self.path, "a")
+
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def rotate(self):
+        """
+        Starts a new journal. The journal file is moved to path.1, or path.2 and so on if that exists, so the
+        records of earlier studies are kept but not read.
+        :return: the path the journal file was moved to, or None if there was no journal file
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+            if not os.path.exists(self.path):
+                return None
+
+            i = 1
+            while os.path.exists("{}.{}".format(self.path, i)):
+                i += 1
+            rotated_path = "{}.{}".format(self.path, i)
+            os.replace(self.path, rotated_path)
+
+            return rotated_path
+
+    def _truncate_partial_line(self):
+        # A partially written last line, as left by a crash, is cut off so the next record starts on its own line
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "rb+") as journal_file:
+            size = journal_file.seek(0, os.SEEK_END)
+
+            # Searching backwards for the end of the last complete line
+            position = size
+            while position > 0:
+                start = max(position - 4096, 0)
+                journal_file.seek(start)
+                newline = journal_file.read(position - start).rfind(b"\n")
+                if newline >= 0:
+                    position = start + newline + 1
+                    break
+                position = start
+
+            if position < size:
+                journal_file.truncate(position)
+                journal_file.flush()
+                os.fsync(journal_file.fileno())
+
+    def read(self):
+        """
+        Reads the records of the journal. A partially written last line, as left by a crash, is skipped.
+        :return: list of records
+        """
+        if not os.path.exists(self.path):
+            return []
+
+        records = []
+        with open(self.path, "r") as journal_file:
+            for line in journal_file:
+                if not line.endswith("\n"):
+                    break
+                records.append(json.loads(line))
+
+        return records
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,238 @@
+import os
+import json
+import socket
+import sqlite3
+import threading
+import contextlib
+import numpy as np
+from src.suggestors.SuggestorBase import ParamLog
+
+
+class SharedParamLog(ParamLog):
+    """
+    ParamLog stored in an SQLite database that any number of Tuner processes, on one machine or on several machines
+    with a shared filesystem, can attach to. Every process keeps the whole log in memory like a ParamLog and brings
+    it up to date with the database at the start of every write.
+
+    Writes are made in exclusive transactions, and the log is synced at the start of each one. A new entry is
+    therefore always the next row of the database, so the entry index, counting from 1, is the same in every
+    process. Entries suggested by other processes are in the log from the moment they are logged, still pending,
+    and are not suggested again.
+
+    The database stores a single score per entry, so the log only supports studies with one objective.
+    """
+
+    _schema = (
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)",
+        "CREATE TABLE IF NOT EXISTS trials (id INTEGER PRIMARY KEY, key TEXT UNIQUE NOT NULL, actual TEXT, "
+        "unscaled TEXT, score REAL, status INTEGER, source INTEGER, duration REAL, worker TEXT, version INTEGER)",
+        "CREATE INDEX IF NOT EXISTS trials_version ON trials (version)",
+        "CREATE TABLE IF NOT EXISTS budget_scores (trial INTEGER, budget REAL, score REAL, version INTEGER, "
+        "PRIMARY KEY (trial, budget))",
+        "CREATE TABLE IF NOT EXISTS intermediate (trial INTEGER, step INTEGER, value REAL, version INTEGER, "
+        "PRIMARY KEY (trial, step))"
+    )
+
+    def __init__(self, path, n_params, param_descriptions=None, key_decimals=None, timeout=60.0, wal=False,
+                 n_objectives=1):
+        """
+        :param path: path of the database file, which is created if it does not exist. Type: string
+        :param n_params: amount of parameters, must match the database if it exists. Type: int
+        :param param_descriptions: names of the parameters. Type: list of strings
+        :param key_decimals: see ParamLog. All processes must use the same value. Type: int
+        :param timeout: seconds to wait for another process to finish its write. Type: float
+        :param wal: whether the database uses write-ahead logging, which is faster but only works when all
+               processes are on the same machine. Type: bool
+        :param n_objectives: amount of scores per entry, which must be 1. Type: int
+        """
+        if n_objectives != 1:
+            raise ValueError("SharedParamLog stores a single score per entry but was given {} objectives"
+                             .format(n_objectives))
+
+        super(SharedParamLog, self).__init__(n_params, param_descriptions=param_descriptions,
+                                             key_decimals=key_decimals, n_objectives=n_objectives)
+
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.worker = "{}:{}".format(socket.gethostname(), os.getpid())
+
+        # Version of the database the log is synced to. Every write transaction increments the version of the
+        # database and stamps the rows it writes with it
+        self._version = 0
+        self._depth = 0
+        self._lock = threading.RLock()
+
+        self._connection = sqlite3.connect(self.path, timeout=timeout, isolation_level=None,
+                                           check_same_thread=False)
+        if wal:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        self._create_tables()
+
+        # Reading the entries that are already in the database
+        self.sync()
+
+    def _create_tables(self):
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            for statement in self._schema:
+                self._connection.execute(statement)
+            self._connection.execute("INSERT OR IGNORE INTO meta VALUES ('version', 0)")
+            self._connection.execute("INSERT OR IGNORE INTO meta VALUES ('n_params', ?)", (self.n_params, ))
+
+            n_params = self._connection.execute("SELECT value FROM meta WHERE key = 'n_params'").fetchone()[0]
+        finally:
+            self._connection.execute("COMMIT")
+
+        if n_params != self.n_params:
+            raise ValueError("The database {} has {} parameters but the log was given {}"
+                             .format(self.path, n_params, self.n_params))
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """
+        Exclusive transaction in which the log is synced first. Nested transactions are part of the outermost one.
+        """
+        with self._lock:
+            if self._depth > 0:
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+                return
+
+            self._connection.execute("BEGIN IMMEDIATE")
+            self._depth = 1
+            try:
+                self._sync()
+                yield
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            else:
+                self._connection.execute("COMMIT")
+            finally:
+                self._depth = 0
+
+    def _next_version(self):
+        self._connection.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+        self._version += 1
+
+        return self._version
+
+    def sync(self):
+        """
+        Brings the log up to date with the database.
+        """
+        with self._lock:
+            if self._depth > 0:
+                self._sync()
+                return
+
+            # A deferred transaction only takes a shared lock, so syncing does not wait on writers
+            self._connection.execute("BEGIN")
+            try:
+                self._sync()
+            finally:
+                self._connection.execute("COMMIT")
+
+    def _sync(self):
+        version = self._connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+        if version == self._version:
+            return
+
+        n_synced = self._n_entries
+
+        # Scores and status of entries that were updated since the last sync
+        for trial, score, status, duration in self._connection.execute(
+                "SELECT id, score, status, duration FROM trials WHERE version > ? AND id <= ?",
+                (self._version, n_synced)):
+            self._score[trial-1] = np.nan if score is None else score
+            self._status[trial-1] = status
+            self._duration[trial-1] = np.nan if duration is None else duration
+            self._update_top(trial-1)
+
+        # Entries logged by other processes
+        rows = self._connection.execute("SELECT id, actual, unscaled, score, status, source, duration FROM trials "
+                                        "WHERE id > ? ORDER BY id", (n_synced, )).fetchall()
+        if rows:
+            if rows[-1][0] != n_synced + len(rows):
+                raise ValueError("The trials in {} are not numbered consecutively".format(self.path))
+
+            actual = [json.loads(row[1]) for row in rows]
+            actual_dtype = object if any(isinstance(value, str) for values in actual for value in values) else None
+            ParamLog._append(self, np.asarray(actual, dtype=actual_dtype),
+                             np.asarray([json.loads(row[2]) for row in rows], dtype=np.float64),
+                             np.asarray([row[3] for row in rows], dtype=np.float64))
+            self._status[n_synced:self._n_entries] = [row[4] for row in rows]
+            self._source[n_synced:self._n_entries] = [row[5] for row in rows]
+            self._duration[n_synced:self._n_entries] = [np.nan if row[6] is None else row[6] for row in rows]
+            for row in range(n_synced, self._n_entries):
+                self._update_top(row)
+
+        for trial, budget, score in self._connection.execute(
+                "SELECT trial, budget, score FROM budget_scores WHERE version > ?", (self._version, )):
+            self._budget_scores[(trial, budget)] = score
+
+        for trial, step, value in self._connection.execute(
+                "SELECT trial, step, value FROM intermediate WHERE version > ?", (self._version, )):
+            ParamLog.log_intermediate(self, value, step, idx=trial)
+
+        self._version = version
+
+    def log_param(self, actual_param, unscaled_param, score, source=None):
+        with self._transaction():
+            return super(SharedParamLog, self).log_param(actual_param, unscaled_param, score, source)
+
+    def log_params(self, actual_params, unscaled_params, scores, source=None):
+        with self._transaction():
+            return super(SharedParamLog, self).log_params(actual_params, unscaled_params, scores, source)
+
+    def log_score(self, score, idx=None, status=None, duration=None):
+        with self._transaction():
+            if idx is None:
+                idx = self._n_entries
+            super(SharedParamLog, self).log_score(score, idx=idx, status=status, duration=duration)
+
+            duration = self._duration[idx-1]
+            self._connection.execute("UPDATE trials SET score = ?, status = ?, duration = ?, version = ? WHERE id = ?",
+                                     (float(self._score[idx-1, 0]), int(self._status[idx-1]),
+                                      None if np.isnan(duration) else float(duration), self._next_version(), idx))
+
+    def log_budget_score(self, score, budget, idx=None):
+        with self._transaction():
+            if idx is None:
+                idx = self._n_entries
+            self._connection.execute("INSERT OR REPLACE INTO budget_scores VALUES (?, ?, ?, ?)",
+                                     (idx, budget, float(score), self._next_version()))
+
+            super(SharedParamLog, self).log_budget_score(score, budget, idx=idx)
+
+    def log_intermediate(self, value, step, idx=None):
+        with self._transaction():
+            if idx is None:
+                idx = self._n_entries
+            self._connection.execute("INSERT OR REPLACE INTO intermediate VALUES (?, ?, ?, ?)",
+                                     (idx, int(step), float(value), self._next_version()))
+
+            super(SharedParamLog, self).log_intermediate(value, step, idx=idx)
+
+    def _append(self, actual_param, unscaled_param, score, source=None):
+        # Only called in a transaction, after the log is synced, so the new entries get the next ids
+        actual_param = np.asarray(actual_param).reshape((-1, self.n_params))
+        unscaled_param = np.asarray(unscaled_param).reshape((-1, self.n_params))
+        score = np.asarray(score, dtype=np.float64).reshape(-1)
+
+        version = self._next_version()
+        source = self.NO_SOURCE if source is None else source
+        rows = []
+        for i in range(0, len(actual_param)):
+            rows.append((self._n_entries + i + 1, json.dumps(self._make_key(actual_param[i])),
+                         json.dumps(actual_param[i].tolist()), json.dumps(unscaled_param[i].tolist()),
+                         float(score[i]), self.PENDING, int(source), None, self.worker, version))
+        self._connection.executemany("INSERT INTO trials VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+        super(SharedParamLog, self)._append(actual_param, unscaled_param, score, source)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,3 @@
+from .Journal import *
+from .SharedParamLog import *
+from .EvaluationCache import *
@@ -0,0 +1,263 @@
+import math
+import numpy as np
+from .SuggestorBase import SuggestorBase
+from .RandomSearch import RandomSearch
+from .QuasiRandomSearch import QuasiRandomSearch
+
+
+class BayesianSearch(SuggestorBase):
+    """
+    Bayesian optimization with a Gaussian process on the unscaled parameters. Suggestions maximize the expected
+    improvement of the score over a large set of candidates. The Cholesky factor of the kernel matrix is extended
+    with the new observations instead of being refactorized every time.
+
+    With cost_aware, the expected improvement is divided by the expected duration of sam.run, so the search
+    maximizes the improvement per second instead of per trial. The log duration is modelled by a second Gaussian
+    process on the same observations, which shares the Cholesky factor with the one of the score.
+    """
+
+    # Number of rows allocated the first time the Cholesky factor grows
+    _initial_capacity = 64
+
+    def __init__(self, rescale_functions, param_names, param_log, n_initial=10, n_candidates=2000,
+                 length_scale=0.2, noise=1e-6, xi=0.01, initial_design="sobol", cost_aware=False):
+        """
+        :param n_initial: amount of completed trials before the Gaussian process is used, suggestions are random
+               until then. Type: int
+        :param n_candidates: amount of candidates the expected improvement is evaluated on. Type: int
+        :param length_scale: length scale of the Matern 5/2 kernel, in unscaled units. Type: float or array
+        :param noise: noise variance added to the diagonal of the kernel matrix. Type: float
+        :param xi: exploration parameter of the expected improvement. Type: float
+        :param initial_design: how the suggestions are made until the Gaussian process is used, "random" or a method
+               of QuasiRandomSearch. Type: string
+        :param cost_aware: whether the expected improvement per second of sam.run is maximized, using the durations
+               in the param log. Type: bool
+        """
+        super(BayesianSearch, self).__init__(rescale_functions, param_names=param_names, param_log=param_log)
+
+        self.n_initial = n_initial
+        self.n_candidates = n_candidates
+        self.length_scale = np.asarray(length_scale, dtype=np.float64)
+        self.noise = noise
+        self.xi = xi
+        self.cost_aware = cost_aware
+
+        if initial_design == "random":
+            self._initial_design = RandomSearch(rescale_functions, param_names, param_log)
+        else:
+            self._initial_design = QuasiRandomSearch(rescale_functions, param_names, param_log, method=initial_design,
+                                                     batch_size=n_initial)
+
+        # Observations in the Gaussian process, as indexes into the param log, and the Cholesky factor of their
+        # kernel matrix. Both are buffers of which the first _n_obs rows are filled
+        self._n_obs = 0
+        self._obs_idx = np.zeros(0, dtype=np.int64)
+        self._x = np.zeros((0, self.n_param))
+        self._chol = np.zeros((0, 0))
+
+    def calculate_suggestion(self):
+        self._update_observations()
+
+        if self._n_obs < self.n_initial:
+            return self._initial_suggestion()
+
+        # Evaluating the expected improvement of the candidates
+        candidates = self._make_candidates()
+        k_candidates = self._kernel(self._x[:self._n_obs], candidates)
+        expected_improvement = self._expected_improvement(k_candidates)
+        if self.cost_aware:
+            expected_improvement = expected_improvement / self._expected_duration(k_candidates)
+
+        # Logging the best feasible candidate that has not been tried yet
+        feasible = np.flatnonzero(self._feasible_unscaled(candidates))
+        order = feasible[np.argsort(-expected_improvement[feasible])[:64]]
+        dict_params, real_params = self._rescale(candidates[order])
+        for i in range(0, len(order)):
+            if self._log_param(real_params[i], candidates[order[i]]):
+                return dict_params[i], real_params[i]
+
+        return self._initial_suggestion()
+
+    def _initial_suggestion(self):
+        # Suggestions of the initial design are logged as coming from this suggestor
+        self._initial_design.source_id = self.source_id
+        return self._initial_design.calculate_suggestion()
+
+    def _update_observations(self):
+        completed = self.param_log.get_completed_idx()
+        if len(completed) > 0:
+            # Trials that completed with a nan or infinite score are left out of the fit
+            completed = completed[np.all(np.isfinite(self.param_log.get_score()[completed]), axis=1)]
+
+        # Rows that are no longer completed, e.g. re-scored or pruned under Hyperband, are removed by refactorizing
+        # the kernel matrix of the completed rows
+        observed = self._obs_idx[:self._n_obs]
+        if not np.all(np.isin(observed, completed)):
+            self._n_obs = 0
+            observed = observed[:0]
+
+        new_idx = completed[~np.isin(completed, observed)]
+        if len(new_idx) == 0:
+            return
+
+        new_x = self.param_log.get_unscaled_params()[new_idx].astype(np.float64)
+        self._extend_cholesky(new_x)
+
+        self._obs_idx = self._fill(self._obs_idx, new_idx)
+        self._x = self._fill(self._x, new_x)
+        self._n_obs += len(new_idx)
+
+    def _extend_cholesky(self, new_x):
+        """
+        Extends the Cholesky factor L of the kernel matrix with new observations. With the kernel matrix of the new
+        observations K22 and the kernel between old and new K12, the new rows are L21 = (L^-1 K12)^T and
+        L22 = chol(K22 - L21 L21^T), which costs O(n^2 m) instead of O((n+m)^3) for refactorizing.
+        """
+        n = self._n_obs
+        m = len(new_x)
+
+        k22 = self._kernel(new_x, new_x) + self.noise * np.eye(m)
+        if n > 0:
+            chol = self._chol[:n, :n]
+            l21 = self._solve_lower(chol, self._kernel(self._x[:n], new_x)).T
+            l22 = self._cholesky(k22 - l21 @ l21.T)
+        else:
+            l21 = np.zeros((m, 0))
+            l22 = self._cholesky(k22)
+
+        if n + m > len(self._chol):
+            capacity = max(len(self._chol), self._initial_capacity)
+            while capacity < n + m:
+                capacity *= 2
+            new_chol = np.zeros((capacity, capacity))
+            new_chol[:n, :n] = self._chol[:n, :n]
+            self._chol = new_chol
+
+        self._chol[n:n+m, :n] = l21
+        self._chol[n:n+m, n:n+m] = l22
+
+    def _fill(self, buffer, rows):
+        n = self._n_obs
+        if n + len(rows) > len(buffer):
+            capacity = max(len(buffer), self._initial_capacity)
+            while capacity < n + len(rows):
+                capacity *= 2
+            new_buffer = np.zeros((capacity, ) + buffer.shape[1:], dtype=buffer.dtype)
+            new_buffer[:n] = buffer[:n]
+            buffer = new_buffer
+
+        buffer[n:n+len(rows)] = rows
+        return buffer
+
+    def _make_candidates(self):
+        # Uniform candidates and candidates around the best observations
+        n_local = self.n_candidates // 4
+        candidates = np.random.random_sample((self.n_candidates - n_local, self.n_param))
+
+        y = self._targets()
+        best = self._x[:self._n_obs][np.argsort(-y)[:5]]
+        local = best[np.random.randint(0, len(best), n_local)] + np.random.normal(0, 0.05, (n_local, self.n_param))
+
+        return np.vstack([candidates, np.clip(local, 0, 1)])
+
+    def _targets(self):
+        return self.param_log.get_score()[self._obs_idx[:self._n_obs], 0]
+
+    def _expected_improvement(self, k_candidates):
+        """
+        :param k_candidates: kernel between the observations and the candidates, of shape (n_obs, n_candidates)
+        :return: the expected improvement of the standardized score at each candidate
+        """
+        chol = self._chol[:self._n_obs, :self._n_obs]
+
+        # Standardizing the scores
+        y = self._targets()
+        y_mean = y.mean()
+        y_std = y.std() if y.std() > 0 else 1
+        y = (y - y_mean) / y_std
+
+        mean = self._posterior_mean(k_candidates, y)
+        v = self._solve_lower(chol, k_candidates)
+        std = np.sqrt(np.maximum(1 - np.sum(v ** 2, axis=0), 1e-12))
+
+        improvement = mean - y.max() - self.xi
+        z = improvement / std
+
+        return improvement * _norm_cdf(z) + std * _norm_pdf(z)
+
+    def _expected_duration(self, k_candidates):
+        """
+        :param k_candidates: kernel between the observations and the candidates, of shape (n_obs, n_candidates)
+        :return: the predicted seconds of sam.run at each candidate, ones if no durations are logged
+        """
+        duration = self.param_log.get_duration()[self._obs_idx[:self._n_obs]]
+        known = ~np.isnan(duration)
+        if not known.any():
+            return np.ones(k_candidates.shape[1])
+
+        # Observations of unknown duration get the mean log duration, which the standardized model predicts as 0
+        log_duration = np.log(np.maximum(duration[known], 1e-3))
+        log_mean = log_duration.mean()
+        log_std = log_duration.std() if log_duration.std() > 0 else 1
+        y = np.zeros(self._n_obs)
+        y[known] = (log_duration - log_mean) / log_std
+
+        return np.exp(self._posterior_mean(k_candidates, y) * log_std + log_mean)
+
+    def _posterior_mean(self, k_candidates, y):
+        chol = self._chol[:self._n_obs, :self._n_obs]
+        alpha = self._solve_lower(chol.T, self._solve_lower(chol, y), lower=False)
+
+        return k_candidates.T @ alpha
+
+    def _kernel(self, x1, x2):
+        # Matern 5/2 kernel
+        x1 = x1 / self.length_scale
+        x2 = x2 / self.length_scale
+        squared_distance = np.sum(x1 ** 2, axis=1)[:, None] + np.sum(x2 ** 2, axis=1)[None, :] - 2 * x1 @ x2.T
+        r = np.sqrt(np.maximum(squared_distance, 0)) * math.sqrt(5)
+
+        return (1 + r + r ** 2 / 3) * np.exp(-r)
+
+    @staticmethod
+    def _cholesky(matrix):
+        jitter = 0
+        for _ in range(0, 10):
+            try:
+                return np.linalg.cholesky(matrix + jitter * np.eye(len(matrix)))
+            except np.linalg.LinAlgError:
+                jitter = 1e-10 if jitter == 0 else jitter * 10
+
+        raise np.linalg.LinAlgError("The kernel matrix is not positive definite")
+
+    @staticmethod
+    def _solve_lower(chol, b, lower=True):
+        solve_triangular = _get_solve_triangular()
+        if solve_triangular is not None:
+            return solve_triangular(chol, b, lower=lower)
+
+        return np.linalg.solve(chol, b)
+
+
+_erf = np.vectorize(math.erf, otypes=[np.float64])
+_solve_triangular = []
+
+
+def _get_solve_triangular():
+    # scipy is optional and slow to import, so it is imported on first use
+    if not _solve_triangular:
+        try:
+            from scipy.linalg import solve_triangular
+        except ImportError:
+            solve_triangular = None
+        _solve_triangular.append(solve_triangular)
+
+    return _solve_triangular[0]
+
+
+def _norm_cdf(x):
+    return 0.5 * (1 + _erf(x / math.sqrt(2)))
+
+
+def _norm_pdf(x):
+    return np.exp(-x ** 2 / 2) / math.sqrt(2 * math.pi)
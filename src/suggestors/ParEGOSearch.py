@@ -0,0 +1,38 @@
+import numpy as np
+from .BayesianSearch import BayesianSearch
+
+
+class ParEGOSearch(BayesianSearch):
+    """
+    Multi-objective Bayesian optimization with ParEGO. For every suggestion the objectives are normalized to the
+    range 0-1 over the completed trials and scalarized with the augmented Tchebycheff function of a random weight
+    vector, and the expected improvement of the scalarized score is maximized as in BayesianSearch. The random
+    weights spread the suggestions over the Pareto front. All objectives are maximized.
+    """
+
+    def __init__(self, rescale_functions, param_names, param_log, rho=0.05, **kwargs):
+        """
+        :param rho: weight of the sum of the weighted objectives in the augmented Tchebycheff function, which keeps
+               weakly dominated suggestions from scoring as well as the ones that dominate them. Type: float
+        :param kwargs: arguments of BayesianSearch
+        """
+        super(ParEGOSearch, self).__init__(rescale_functions, param_names, param_log, **kwargs)
+
+        self.rho = rho
+        self._weights = np.full(param_log.n_objectives, 1 / param_log.n_objectives)
+
+    def calculate_suggestion(self):
+        # Weights drawn uniformly from the simplex
+        self._weights = np.random.dirichlet(np.ones(self.param_log.n_objectives))
+
+        return super(ParEGOSearch, self).calculate_suggestion()
+
+    def _targets(self):
+        scores = self.param_log.get_score()[self._obs_idx[:self._n_obs]]
+
+        low = scores.min(axis=0)
+        high = scores.max(axis=0)
+        shortfall = (high - scores) / np.where(high > low, high - low, 1)
+
+        weighted = self._weights * shortfall
+        return -(weighted.max(axis=1) + self.rho * weighted.sum(axis=1))
@@ -0,0 +1,109 @@
+import numpy as np
+from .RandomSearch import RandomSearch
+
+
+class QuasiRandomSearch(RandomSearch):
+    """
+    Random search with low-discrepancy points, which cover the unit cube far more evenly than independent uniform
+    samples and therefore also hit fewer duplicates once rounded to the increments of the parameters. The points
+    are generated batch_size at a time.
+
+    Methods:
+    "sobol": scrambled Sobol sequence from scipy.stats.qmc. Falls back to "halton" if scipy is not installed.
+    "halton": Halton sequence, randomly shifted modulo 1.
+    "lhs": Latin hypercube, every batch is stratified in each dimension.
+    """
+
+    methods = ("sobol", "halton", "lhs")
+
+    def __init__(self, rescale_functions, param_names, param_log, method="sobol", batch_size=256):
+        """
+        :param method: "sobol", "halton" or "lhs". Type: string
+        :param batch_size: amount of points generated at a time. Rounded up to a power of 2 for "sobol", as the
+               balance properties of Sobol points hold for powers of 2. Type: int
+        """
+        super(QuasiRandomSearch, self).__init__(rescale_functions, param_names=param_names, param_log=param_log)
+
+        if method not in self.methods:
+            raise ValueError("The given method \"{}\" is not supported, use one of {}".format(method, self.methods))
+
+        self.method = method
+        self.batch_size = batch_size
+
+        self._sobol = None
+        if method == "sobol":
+            self.batch_size = 2 ** int(np.ceil(np.log2(max(batch_size, 1))))
+            self._sobol = _make_sobol(self.n_param)
+            if self._sobol is None:
+                self.method = "halton"
+
+        # Halton state, the index of the next point and the random shift
+        self._n_generated = 0
+        self._shift = np.random.random_sample(self.n_param)
+        self._primes = _first_primes(self.n_param)
+
+        # Generated points that have not been suggested yet
+        self._points = np.zeros((0, self.n_param))
+
+    def _random_param_samples(self, n):
+        while len(self._points) < n:
+            self._points = np.vstack([self._points, self._generate_batch()])
+
+        unscaled_parameters = self._points[:n]
+        self._points = self._points[n:]
+        dict_params, real_parameters = self._rescale(unscaled_parameters)
+
+        return dict_params, real_parameters, unscaled_parameters
+
+    def _generate_batch(self):
+        if self.method == "sobol":
+            return self._sobol.random(self.batch_size)
+
+        if self.method == "halton":
+            points = _halton(np.arange(self._n_generated, self._n_generated + self.batch_size) + 1, self._primes)
+            self._n_generated += self.batch_size
+            return np.mod(points + self._shift, 1)
+
+        # Latin hypercube, each dimension gets one point in each of batch_size equally wide strata
+        strata = np.argsort(np.random.random_sample((self.batch_size, self.n_param)), axis=0)
+        return (strata + np.random.random_sample((self.batch_size, self.n_param))) / self.batch_size
+
+
+def _make_sobol(n_param):
+    # scipy is optional and slow to import, so it is imported when a Sobol sequence is made
+    try:
+        from scipy.stats import qmc
+    except ImportError:
+        return None
+
+    return qmc.Sobol(n_param, scramble=True, seed=np.random.randint(0, 2 ** 31))
+
+
+def _halton(idx, primes):
+    """
+    Radical inverses of the indexes in the prime bases.
+    :param idx: array of n positive indexes
+    :param primes: array of the bases, one per dimension
+    :return: array of shape (n, len(primes)) in the range 0-1
+    """
+    points = np.zeros((len(idx), len(primes)))
+    for j, base in enumerate(primes):
+        remaining = idx.copy()
+        fraction = 1.0
+        while np.any(remaining > 0):
+            fraction /= base
+            points[:, j] += fraction * (remaining % base)
+            remaining //= base
+
+    return points
+
+
+def _first_primes(n):
+    primes = []
+    candidate = 2
+    while len(primes) < n:
+        if all(candidate % prime != 0 for prime in primes):
+            primes.append(candidate)
+        candidate += 1
+
+    return np.asarray(primes, dtype=np.int64)
@@ -5,25 +5,20 @@ from .SuggestorBase import SuggestorBase
 class RandomSearch(SuggestorBase):
 
     def calculate_suggestion(self):
-        unique = False
-        dict_param = None
-        real = None
+        dict_params, real_params = self._suggest_unique(1, self._random_param_samples)
 
-        while not unique:
-            dict_param, real, unscaled = self._random_param_sample()
+        return dict_params[0], real_params[0]
 
-            unique = self.param_log.log_param(real, unscaled, np.array([0]))
-
-        return dict_param, real
+    def calculate_suggestions(self, n):
+        return self._suggest_unique(n, self._random_param_samples)
 
     def _random_param_sample(self):
-        real_parameters = []
-        dict_param = {}
-        unscaled_parameters = np.random.random_sample(self.n_param)
+        dict_params, real_parameters, unscaled_parameters = self._random_param_samples(1)
+
+        return dict_params[0], real_parameters[0], unscaled_parameters[0]
 
-        for i, func in enumerate(self._rescale_functions):
-            param_value = func(unscaled_parameters[i])
-            real_parameters.append(param_value)
-            dict_param[self.param_names[i]] = param_value
+    def _random_param_samples(self, n):
+        unscaled_parameters = np.random.random_sample((n, self.n_param))
+        dict_params, real_parameters = self._rescale(unscaled_parameters)
 
-        return dict_param, np.asarray(real_parameters), unscaled_parameters
+        return dict_params, real_parameters, unscaled_parameters
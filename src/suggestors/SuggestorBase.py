@@ -1,11 +1,40 @@
+import os
+import heapq
 import numpy as np
+from src.parameter_config.SearchSpace import SearchSpace
+
+
+class SearchSpaceExhausted(Exception):
+    """
+    Raised by a suggestor when every point of the search space it samples from is already in the param log.
+    """
+    pass
 
 
 class SuggestorBase:
 
+    # Finite spaces with at most this many points are sampled without replacement, by going through a random
+    # permutation of their points, from the first time a sample is a duplicate
+    max_lattice_size = 100000
+
+    # Amount of samples in a row that may be duplicates before a space is taken as full. A finite space of at most
+    # max_lattice_size * 100 points is then sampled without replacement, other spaces are taken as exhausted
+    max_rejections = 1000
+
+    # Amount of samples in a row that may violate the constraints of the search space before the constraints are
+    # taken to exclude the whole space
+    max_infeasible = 100000
+
     def __init__(self, rescale_functions, param_names, param_log):
 
-        # Setting rescale function information
+        # Setting rescale function information. A compiled SearchSpace can be given instead of the list of
+        # rescale functions, in which case whole matrices are rescaled at once
+        if isinstance(rescale_functions, SearchSpace):
+            self.search_space = rescale_functions
+            rescale_functions = self.search_space.rescale_functions
+        else:
+            self.search_space = None
+
         self._rescale_functions = rescale_functions
         self.n_param = len(rescale_functions)
         self.param_names = param_names
@@ -13,29 +42,248 @@ class SuggestorBase:
         # Starting log
         self.param_log = param_log
 
-    def suggest_parameters(self):
-        return self.calculate_suggestion()
+        # Id the suggestions are logged with, set by the Tuner
+        self.source_id = None
+
+        # Permutation of the lattice points of the box that is sampled without replacement, see _lattice_samples
+        self._lattice_key = None
+        self._lattice_points = None
+        self._lattice_order = None
+        self._lattice_position = 0
+
+    def suggest_parameters(self, n=None):
+        """
+        Suggests parameters and logs them in the param log.
+        :param n: amount of suggestions. If None a single suggestion is made. Type: int
+        :return: if n is None, the suggestion as a dict and its actual parameters as an array. Otherwise a list of
+                 n dicts and the actual parameters as an (n, n_param) array
+        """
+        if n is None:
+            return self.calculate_suggestion()
+
+        return self.calculate_suggestions(n)
 
     def calculate_suggestion(self):
         raise NotImplementedError("This class is a baseclass,"
                                   " this function should be implemented in inheriting classes")
 
+    def calculate_suggestions(self, n):
+        # Inheriting classes that can draw several suggestions at once should override this
+        dict_params = []
+        real_params = []
+        for _ in range(0, n):
+            dict_param, real = self.calculate_suggestion()
+            dict_params.append(dict_param)
+            real_params.append(real)
+
+        return dict_params, np.vstack(real_params)
+
+    def _rescale(self, unscaled_params):
+        """
+        Rescales a matrix of unscaled parameters into actual parameters.
+        :param unscaled_params: array of shape (n, n_param) with values in the range 0-1
+        :return: list of n dicts with the actual parameters and an array of shape (n, n_param) with the same values
+        """
+        if self.search_space is not None:
+            real_params = self.search_space.transform(unscaled_params)
+            return self.search_space.to_dicts(real_params), real_params
+
+        columns = []
+        for i, func in enumerate(self._rescale_functions):
+            columns.append(np.asarray(func(unscaled_params[:, i])))
+
+        value_lists = [column.tolist() for column in columns]
+        dict_params = [dict(zip(self.param_names, values)) for values in zip(*value_lists)]
+
+        return dict_params, np.column_stack(columns)
+
+    def _suggest_unique(self, n, draw, lower=None, upper=None):
+        """
+        Logs n feasible suggestions that are not in the param log yet. The suggestions are drawn with draw until a draw
+        hits a duplicate. From then on, a box lower-upper of the unscaled space that is a finite lattice of at most
+        max_lattice_size points is sampled without replacement, so the amount of work does not grow as the box
+        fills up.
+        :param n: amount of suggestions. Type: int
+        :param draw: function that is given an amount and returns that many dicts, actual and unscaled parameters
+        :param lower: lower corner of the box, default is all zeros. Type: array of n_param floats
+        :param upper: upper corner of the box, default is all ones. Type: array of n_param floats
+        :return: list of n dicts and the actual parameters as an (n, n_param) array
+        :raises SearchSpaceExhausted: if every feasible point of the box is logged
+        """
+        lower = np.zeros(self.n_param) if lower is None else lower
+        upper = np.ones(self.n_param) if upper is None else upper
+        size = self._lattice_size(lower, upper)
+        key = (tuple(lower), tuple(upper))
+
+        dict_params = []
+        real_params = []
+        rejections = 0
+        infeasible = 0
+        while len(dict_params) < n:
+            if (key == self._lattice_key or (rejections > 0 and size <= self.max_lattice_size)
+                    or (rejections >= self.max_rejections and size <= self.max_lattice_size * 100)):
+                unscaled = self._lattice_samples(n - len(dict_params), lower, upper)
+                if len(unscaled) == 0:
+                    raise SearchSpaceExhausted("All {} points of the search space are in the param log".format(size))
+                dicts, real = self._rescale(unscaled)
+            elif rejections >= self.max_rejections:
+                raise SearchSpaceExhausted("{} samples in a row were already in the param log".format(rejections))
+            elif infeasible >= self.max_infeasible:
+                raise SearchSpaceExhausted("{} samples in a row violated the constraints".format(infeasible))
+            else:
+                dicts, real, unscaled = draw(n - len(dict_params))
+
+            # Infeasible samples are dropped before the duplicate check and do not count as duplicates
+            feasible = self._feasible(real)
+            infeasible = 0 if feasible.any() else infeasible + len(feasible)
+            if not feasible.all():
+                dicts = [dict_param for dict_param, is_feasible in zip(dicts, feasible) if is_feasible]
+                real, unscaled = real[feasible], unscaled[feasible]
+
+            dicts, real = self._log_unique(dicts, real, unscaled)
+            rejections = 0 if len(dicts) > 0 else rejections + len(unscaled)
+
+            dict_params += dicts
+            real_params.append(real)
+
+        return dict_params, np.vstack(real_params)
+
+    def _lattice_size(self, lower, upper):
+        if self.search_space is None:
+            return np.inf
+
+        box = self.search_space.lattice_box(lower, upper)
+        if any(values is None for values in box):
+            return np.inf
+
+        return int(np.prod([len(values) for values in box], dtype=np.float64))
+
+    def _lattice_samples(self, n, lower, upper):
+        """
+        Takes the next n points of a random permutation of the lattice points in the box lower-upper. The
+        permutation is made when the box changes, and every point is taken at most once.
+        :return: array of shape (m, n_param) with the unscaled points, m < n when the permutation runs out
+        """
+        key = (tuple(lower), tuple(upper))
+        if key != self._lattice_key:
+            self._lattice_key = key
+            self._lattice_points = self.search_space.lattice_box(lower, upper)
+            self._lattice_order = np.random.permutation(self._lattice_size(lower, upper))
+            self._lattice_position = 0
+
+        flat_idx = self._lattice_order[self._lattice_position:self._lattice_position + n]
+        self._lattice_position += len(flat_idx)
+
+        point_idx = np.unravel_index(flat_idx, [len(values) for values in self._lattice_points])
+        return np.column_stack([values[idx] for values, idx in zip(self._lattice_points, point_idx)]
+                               ).reshape((-1, self.n_param))
+
+    def _feasible(self, real_params):
+        """
+        :param real_params: array of shape (n, n_param) with actual parameters
+        :return: boolean array of length n, True for the parameters that satisfy the constraints of the search space
+        """
+        if self.search_space is None:
+            return np.ones(len(real_params), dtype=bool)
+
+        return self.search_space.feasible(real_params)
+
+    def _feasible_unscaled(self, unscaled_params):
+        # Same as _feasible for unscaled candidates that are screened before they are ranked. The candidates are
+        # not proposals, so they do not count towards the rejection rate
+        if self.search_space is None or not self.search_space.constraints:
+            return np.ones(len(unscaled_params), dtype=bool)
+
+        return self.search_space.feasible(self.search_space.transform(unscaled_params), count=False)
+
+    def _log_param(self, real_param, unscaled_param):
+        """
+        Logs a suggestion with a zero score if it is not in the param log already.
+        :return: True if the suggestion was logged
+        """
+        return self.param_log.log_param(real_param, unscaled_param, np.array([0]), source=self.source_id)
+
+    def _log_unique(self, dict_params, real_params, unscaled_params):
+        """
+        Logs the suggestions that are neither in the param log nor duplicated earlier in the batch.
+        :return: the logged dicts and the actual parameters of the logged suggestions
+        """
+        logged = self.param_log.log_params(real_params, unscaled_params, np.zeros(len(real_params)),
+                                           source=self.source_id)
+        dict_params = [dict_param for dict_param, is_logged in zip(dict_params, logged) if is_logged]
+
+        return dict_params, real_params[logged]
+
 
 class ParamLog:
 
-    def __init__(self, n_params, actual=None, unscaled=None, score=None, param_descriptions=None):
+    # Number of rows allocated the first time the log grows
+    _initial_capacity = 64
+
+    # Status of the entries. Entries are pending from they are suggested until their score is logged
+    PENDING = 0
+    COMPLETED = 1
+    PRUNED = 2
+    TIMED_OUT = 3
+    FAILED = 4
+
+    # Source of entries that were not logged by a suggestor of a Tuner
+    NO_SOURCE = -1
+
+    def __init__(self, n_params, actual=None, unscaled=None, score=None, param_descriptions=None, key_decimals=None,
+                 status=None, source=None, duration=None, n_objectives=None):
 
         self.n_params = n_params
 
+        # Amount of scores of each entry, all of which are maximized. Taken from the given scores if there are any
+        self.n_objectives = 1 if n_objectives is None else n_objectives
+
+        # Hash index of the logged actual parameters, used for constant time duplicate checks. Float values are
+        # rounded to key_decimals decimals before hashing if given. Indexes over subsets of the columns are built
+        # on first lookup and kept in sync afterwards.
+        self.key_decimals = key_decimals
+        self._all_columns = tuple(range(0, n_params))
+        self._index = {self._all_columns: {}}
+
+        # The logs are preallocated buffers of which only the first _n_entries rows are filled.
+        # Capacity is doubled whenever it runs out, so appending is O(1) amortized.
+        self._n_entries = 0
+        self._capacity = 0
+
         # Initializing logs
         check = [actual is not None, unscaled is not None, score is not None]
         if all(check):
             if not len(actual) == len(unscaled) == len(score):
                 raise Exception("Parameter actual, unscaled and score must have the same amount of entries")
 
-            self._actual_param_log = actual
-            self._unscaled_param_log = unscaled
-            self._score = score
+            self._actual_param_log = np.asanyarray(actual).reshape((-1, self.n_params))
+            self._unscaled_param_log = np.asanyarray(unscaled).reshape((-1, self.n_params))
+            score = np.asarray(score, dtype=np.float64)
+            self._score = score.reshape((len(score), -1)) if score.ndim > 1 else score.reshape((-1, 1))
+            if n_objectives is not None and self._score.shape[1] != n_objectives:
+                raise Exception("Parameter score has {} objectives but n_objectives is {}"
+                                .format(self._score.shape[1], n_objectives))
+            self.n_objectives = self._score.shape[1]
+
+            # Entries of a given log are taken as completed unless their status is given
+            if status is None:
+                self._status = np.full(len(self._score), self.COMPLETED, dtype=np.int8)
+            else:
+                self._status = np.array(status, dtype=np.int8).reshape(-1)
+
+            if source is None:
+                self._source = np.full(len(self._score), self.NO_SOURCE, dtype=np.int16)
+            else:
+                self._source = np.array(source, dtype=np.int16).reshape(-1)
+
+            if duration is None:
+                self._duration = np.full(len(self._score), np.nan)
+            else:
+                self._duration = np.array(duration, dtype=np.float64).reshape(-1)
+
+            self._n_entries = len(self._score)
+            self._capacity = self._n_entries
+            self._index_rows(0, self._n_entries)
         else:
             if any(check):
                 raise Warning("Parameters actual, unscaled and score were not all provided. Initializing"
@@ -44,57 +292,538 @@ class ParamLog:
             self._actual_param_log = None
             self._unscaled_param_log = None
             self._score = None
+            self._status = None
+            self._source = None
+            self._duration = None
+
+        # Scores of entries that are evaluated on several budgets, keyed by (entry index, budget) where the entry
+        # index counts from 1 like in log_score
+        self._budget_scores = {}
+
+        # Intermediate values reported while entries are evaluated, both by step and by entry index
+        self._intermediate_by_step = {}
+        self._intermediate_by_idx = {}
+
+        # Trackers of the highest scores and of the Pareto front, updated by log_score
+        self._top_trackers = []
+        self._front_trackers = []
 
         # Param descriptions
         if param_descriptions is not None:
             self.param_descriptions = param_descriptions
 
-    def log_param(self, actual_param, unscaled_param, score):
+    @classmethod
+    def load(cls, save_path, name, mmap=True, param_descriptions=None, key_decimals=None):
+        """
+        Loads a param log from the npy files saved by Tuner.save_log.
+        :param save_path: directory the files were saved in. Type: string
+        :param name: name of the tuner that saved the files. Type: string
+        :param mmap: whether or not the parameter arrays are memory mapped instead of read into memory. This only
+               delays the copy: building the duplicate index reads every row once, and the arrays are copied into
+               memory the first time the log grows. Type: bool
+        :param param_descriptions: names of the parameters. Type: list of strings
+        :param key_decimals: see ParamLog. Type: int
+        :return: the loaded ParamLog
+        """
+        path = os.path.join(os.path.abspath(os.path.expanduser(save_path)), name)
 
-        if self._actual_param_log is None:
-            self._actual_param_log = actual_param.reshape((-1, self.n_params))
-            self._unscaled_param_log = unscaled_param.reshape((-1, self.n_params))
-            self._score = score.reshape((-1, 1)).astype(np.float64)
+        actual = cls._load_array("{}_params_actual.npy".format(path), mmap)
+        unscaled = cls._load_array("{}_params_unscaled.npy".format(path), mmap)
 
-            return True
-        else:
+        # Scores are read into memory as they are updated by log_score
+        score = np.array(np.load("{}_params_scores.npy".format(path)), dtype=np.float64)
+
+        status_path = "{}_params_status.npy".format(path)
+        status = np.load(status_path) if os.path.exists(status_path) else None
+        source_path = "{}_params_source.npy".format(path)
+        source = np.load(source_path) if os.path.exists(source_path) else None
+        duration_path = "{}_params_duration.npy".format(path)
+        duration = np.load(duration_path) if os.path.exists(duration_path) else None
+
+        param_log = cls(actual.shape[1], actual=actual, unscaled=unscaled, score=score,
+                        param_descriptions=param_descriptions, key_decimals=key_decimals, status=status,
+                        source=source, duration=duration)
+
+        budget_path = "{}_params_budget_scores.npy".format(path)
+        if os.path.exists(budget_path):
+            for idx, budget, score in np.load(budget_path):
+                param_log._budget_scores[(int(idx), budget.item())] = score.item()
+
+        intermediate_path = "{}_params_intermediate.npy".format(path)
+        if os.path.exists(intermediate_path):
+            for idx, step, value in np.load(intermediate_path):
+                param_log.log_intermediate(value.item(), int(step), idx=int(idx))
+
+        return param_log
 
-            if self.find_param_log_idx(actual_param, list(range(0, self.n_params))) is None:
-                self._actual_param_log = np.append(self._actual_param_log, actual_param.reshape((-1, self.n_params)), 0)
-                self._unscaled_param_log = np.append(self._unscaled_param_log,
-                                                     unscaled_param.reshape((-1, self.n_params)), 0)
-                self._score = np.append(self._score, score.reshape((-1, 1)), 0)
+    @staticmethod
+    def _load_array(path, mmap):
+        if mmap:
+            try:
+                return np.load(path, mmap_mode="r")
+            except ValueError:
+                # Arrays of python objects can not be memory mapped
+                pass
 
-                return True
+        return np.load(path, allow_pickle=True)
+
+    def sync(self):
+        """
+        Brings the log up to date with its storage. The log is only kept in memory, so there is nothing to do.
+        """
+        pass
+
+    def log_param(self, actual_param, unscaled_param, score, source=None):
+
+        if self.find_param_log_idx(actual_param, self._all_columns) is None:
+            self._append(actual_param, unscaled_param, score, source)
+
+            return True
 
         return False
 
-    def log_score(self, score, idx=None):
+    def log_params(self, actual_params, unscaled_params, scores, source=None):
+        """
+        Logs a batch of parameters in a single append. Rows that are already logged, or that are duplicates of an
+        earlier row in the batch, are skipped.
+        :param actual_params: array of shape (n, n_params)
+        :param unscaled_params: array of shape (n, n_params)
+        :param scores: array of n scores
+        :param source: id of the suggestor that made the parameters. Type: int
+        :return: boolean array of length n, True for the rows that were logged
+        """
+        actual_params = np.asarray(actual_params).reshape((-1, self.n_params))
+        unscaled_params = np.asarray(unscaled_params).reshape((-1, self.n_params))
+        scores = np.asarray(scores, dtype=np.float64)
+        scores = scores.reshape((-1, 1)) if scores.ndim < 2 else scores
 
+        index = self._index[self._all_columns]
+        batch_keys = set()
+        logged = np.zeros(len(actual_params), dtype=bool)
+        for i, values in enumerate(actual_params):
+            key = self._make_key(values)
+            if key not in index and key not in batch_keys:
+                batch_keys.add(key)
+                logged[i] = True
+
+        if logged.any():
+            self._append(actual_params[logged], unscaled_params[logged], scores[logged], source)
+
+        return logged
+
+    def log_score(self, score, idx=None, status=None, duration=None):
+        """
+        Logs the score of an entry.
+        :param score: the score, or the n_objectives scores. Type: float or array
+        :param idx: index of the entry counting from 1, default is the last entry. Type: int
+        :param status: status of the entry, default is COMPLETED. Type: int
+        :param duration: seconds the evaluation of the entry took, if known. Type: float
+        """
         if idx is None:
-            idx, _ = self._score.shape
+            idx = self._n_entries
         self._score[idx-1] = score
+        self._status[idx-1] = self.COMPLETED if status is None else status
+        if duration is not None:
+            self._duration[idx-1] = duration
 
-    def find_param_log_idx(self, real_values, column_idx):
+        self._update_top(idx-1)
+
+    def track_top(self, k):
+        """
+        Starts tracking the k completed entries with the highest scores. The tracker is updated by log_score, so
+        reading it does not scan the log.
+        :param k: amount of entries to track. Type: int
+        :return: the tracker. Type: TopScores
+        """
+        tracker = TopScores(self, k)
+        self._top_trackers.append(tracker)
+
+        return tracker
+
+    def track_pareto_front(self):
+        """
+        Starts tracking the completed entries whose scores are not dominated by the scores of another completed
+        entry. The tracker is updated by log_score, so reading it does not scan the log.
+        :return: the tracker. Type: ParetoFront
+        """
+        tracker = ParetoFront(self)
+        self._front_trackers.append(tracker)
+
+        return tracker
+
+    def _update_top(self, row):
+        # Single objective trackers follow the first objective
+        for tracker in self._top_trackers:
+            tracker.update(row, self._score[row, 0], self._status[row] == self.COMPLETED)
+        for tracker in self._front_trackers:
+            tracker.update(row, self._score[row], self._status[row] == self.COMPLETED)
+
+    def log_intermediate(self, value, step, idx=None):
+        """
+        Logs an intermediate value reported while an entry is evaluated, e.g. the validation score after an epoch.
+        :param value: the reported value. Type: float
+        :param step: the step the value was reported at. Type: int
+        :param idx: index of the entry counting from 1, default is the last entry. Type: int
+        """
+        if idx is None:
+            idx = self._n_entries
+
+        self._intermediate_by_step.setdefault(step, {})[idx] = float(value)
+        self._intermediate_by_idx.setdefault(idx, {})[step] = float(value)
+
+    def get_intermediate_at_step(self, step):
+        """
+        :return: dict from entry index, counting from 1, to the value reported at the step
+        """
+        return self._intermediate_by_step.get(step, {})
 
-        # Finding the columns that contains the values
-        columns = self._actual_param_log[:, column_idx]
-        real_values = real_values.reshape((-1, len(column_idx)))
+    def get_intermediate(self, idx=None):
+        """
+        :param idx: if given, only the values of this entry are returned. Type: int
+        :return: array of shape (n, 3) with rows of (entry index, step, value)
+        """
+        if idx is None:
+            rows = [(i, step, value) for i, curve in self._intermediate_by_idx.items() for step, value in curve.items()]
+        else:
+            rows = [(idx, step, value) for step, value in self._intermediate_by_idx.get(idx, {}).items()]
+
+        return np.asarray(rows, dtype=np.float64).reshape((-1, 3))
+
+    def log_budget_score(self, score, budget, idx=None):
+        """
+        Logs the score of an entry evaluated on a budget, e.g. an amount of epochs. The score of the entry is set to
+        the score of its latest evaluation.
+        :param score: the score. Type: float
+        :param budget: the budget the entry was evaluated on. Type: int or float
+        :param idx: index of the entry counting from 1, default is the last entry. Type: int
+        """
+        if idx is None:
+            idx = self._n_entries
 
-        # Finding wether or not the param logs contain the values in the columns
-        if (columns == [real_values]).all(1).any():
+        self._budget_scores[(idx, budget)] = float(score)
+        self.log_score(score, idx=idx)
 
-            # Find index of the values and return the corresponding params
-            idx = np.argmax(columns == real_values, axis=1)
-            return idx
+    def get_budget_scores(self, idx=None):
+        """
+        :param idx: if given, only the scores of this entry are returned. Type: int
+        :return: array of shape (n, 3) with rows of (entry index, budget, score)
+        """
+        budget_scores = np.asarray([(idx, budget, score) for (idx, budget), score in self._budget_scores.items()],
+                                   dtype=np.float64).reshape((-1, 3))
+        if idx is not None:
+            budget_scores = budget_scores[budget_scores[:, 0] == idx]
 
-        return None
+        return budget_scores
+
+    def find_param_log_idx(self, real_values, column_idx):
+        """
+        Finds the first logged entry whose actual parameters in the columns column_idx equal real_values.
+        :param real_values: array, values of the parameters in the columns column_idx
+        :param column_idx: list of ints, indexes of the columns to compare
+        :return: int, the index of the first matching entry or None if no entry matches
+        """
+        column_idx = tuple(int(i) for i in column_idx)
+
+        # Building index over the columns if it is the first lookup by them
+        if column_idx not in self._index:
+            self._index[column_idx] = {}
+            self._index_rows(0, self._n_entries, [column_idx])
+
+        return self._index[column_idx].get(self._make_key(real_values))
 
     def get_actual_params(self):
-        return self._actual_param_log
+        return self._filled(self._actual_param_log)
 
     def get_unscaled_params(self):
-        return self._unscaled_param_log
+        return self._filled(self._unscaled_param_log)
 
     def get_score(self):
-        return self._score
+        return self._filled(self._score)
+
+    def get_status(self):
+        return self._filled(self._status)
+
+    def get_source(self):
+        return self._filled(self._source)
+
+    def get_duration(self):
+        """
+        :return: array with the seconds the evaluation of each entry took, NaN where it is not known
+        """
+        return self._filled(self._duration)
+
+    def get_completed_idx(self):
+        """
+        :return: array with the indexes of the entries that have a logged score, counting from 0
+        """
+        if self._status is None:
+            return np.zeros(0, dtype=np.int64)
+
+        return np.flatnonzero(self.get_status() == self.COMPLETED)
+
+    def __len__(self):
+        return self._n_entries
+
+    def _filled(self, buffer):
+        if buffer is None:
+            return None
+
+        return buffer[:self._n_entries]
+
+    def _append(self, actual_param, unscaled_param, score, source=None):
+        actual_param = np.asarray(actual_param).reshape((-1, self.n_params))
+        unscaled_param = np.asarray(unscaled_param).reshape((-1, self.n_params))
+        score = np.asarray(score, dtype=np.float64).reshape((len(actual_param), -1))
+
+        n_new = len(actual_param)
+        self._reserve(self._n_entries + n_new, actual_param.dtype, unscaled_param.dtype)
+
+        start = self._n_entries
+        self._actual_param_log[start:start+n_new] = actual_param
+        self._unscaled_param_log[start:start+n_new] = unscaled_param
+        self._score[start:start+n_new] = score
+        self._status[start:start+n_new] = self.PENDING
+        self._source[start:start+n_new] = self.NO_SOURCE if source is None else source
+        self._duration[start:start+n_new] = np.nan
+        self._n_entries += n_new
+
+        self._index_rows(start, self._n_entries)
+
+    def _index_rows(self, start, stop, column_sets=None):
+        if column_sets is None:
+            column_sets = self._index.keys()
+
+        rows = self._actual_param_log[start:stop]
+        for column_idx in column_sets:
+            index = self._index[column_idx]
+            columns = rows[:, column_idx]
+
+            for i, values in enumerate(columns, start):
+                index.setdefault(self._make_key(values), i)
+
+    def _make_key(self, values):
+        values = np.asarray(values).reshape(-1)
+
+        if self.key_decimals is not None and np.issubdtype(values.dtype, np.floating):
+            values = np.round(values, self.key_decimals)
+
+        return tuple(values.tolist())
+
+    def _reserve(self, n_rows, actual_dtype, unscaled_dtype):
+        """
+        Makes sure the buffers can hold n_rows rows of the given dtypes. When they can not, new buffers with
+        doubled capacity are allocated and the filled rows are copied over.
+        :param n_rows: int, amount of rows the buffers must be able to hold
+        :param actual_dtype: dtype of the actual parameters that are about to be appended
+        :param unscaled_dtype: dtype of the unscaled parameters that are about to be appended
+        """
+        if self._actual_param_log is not None:
+            actual_dtype = np.result_type(self._actual_param_log.dtype, actual_dtype)
+            unscaled_dtype = np.result_type(self._unscaled_param_log.dtype, unscaled_dtype)
+
+            if (n_rows <= self._capacity and actual_dtype == self._actual_param_log.dtype
+                    and unscaled_dtype == self._unscaled_param_log.dtype):
+                return
+
+        capacity = max(self._capacity, self._initial_capacity)
+        while capacity < n_rows:
+            capacity *= 2
+
+        self._actual_param_log = self._grow(self._actual_param_log, capacity, self.n_params, actual_dtype)
+        self._unscaled_param_log = self._grow(self._unscaled_param_log, capacity, self.n_params, unscaled_dtype)
+        self._score = self._grow(self._score, capacity, self.n_objectives, np.float64)
+        self._status = self._grow(self._status, capacity, None, np.int8)
+        self._source = self._grow(self._source, capacity, None, np.int16)
+        self._duration = self._grow(self._duration, capacity, None, np.float64)
+        self._capacity = capacity
+
+    def _grow(self, buffer, capacity, width, dtype):
+        # A width of None makes a one dimensional buffer
+        new_buffer = np.zeros((capacity, ) if width is None else (capacity, width), dtype=dtype)
+
+        if buffer is not None:
+            new_buffer[:self._n_entries] = buffer[:self._n_entries]
+
+        return new_buffer
+
+
+class TopScores:
+    """
+    The k completed entries of a ParamLog with the highest scores, kept in a min-heap that ParamLog.log_score
+    updates. An insert costs O(log k). When the score of a tracked entry drops, or it stops being completed, an
+    entry outside the heap may have taken its place, so the heap is rebuilt from the log the next time it is read.
+    """
+
+    def __init__(self, param_log, k):
+        """
+        :param param_log: the log to track. Type: ParamLog
+        :param k: amount of entries to track. Type: int
+        """
+        self.param_log = param_log
+        self.k = k
+
+        # Heap of (score, row) and the score of each row in the heap
+        self._heap = []
+        self._members = {}
+        self._stale = False
+
+        self._rebuild()
+
+    def update(self, row, score, completed):
+        """
+        :param row: index of the entry, counting from 0. Type: int
+        :param score: the score of the entry. Type: float
+        :param completed: whether the entry is completed. Type: bool
+        """
+        if self._stale:
+            return
+
+        if row in self._members:
+            if not completed or score < self._members[row]:
+                self._stale = True
+                return
+
+            self._members[row] = score
+            self._heap = [(member_score, member) for member, member_score in self._members.items()]
+            heapq.heapify(self._heap)
+
+        elif completed and not np.isnan(score):
+            if len(self._heap) < self.k:
+                heapq.heappush(self._heap, (score, row))
+                self._members[row] = score
+            elif score > self._heap[0][0]:
+                _, removed = heapq.heapreplace(self._heap, (score, row))
+                del self._members[removed]
+                self._members[row] = score
+
+    def get_idx(self):
+        """
+        :return: array with the indexes of the tracked entries counting from 0, best first
+        """
+        if self._stale:
+            self._rebuild()
+
+        rows = sorted(self._members.keys(), key=lambda member: -self._members[member])
+        return np.asarray(rows, dtype=np.int64)
+
+    def _rebuild(self):
+        completed = self.param_log.get_completed_idx()
+        scores = self.param_log.get_score()[completed, 0] if len(completed) > 0 else np.zeros(0)
+
+        valid = ~np.isnan(scores)
+        completed = completed[valid]
+        scores = scores[valid]
+        top = np.argsort(-scores, kind="stable")[:self.k]
+
+        self._members = {int(completed[i]): float(scores[i]) for i in top}
+        self._heap = [(score, row) for row, score in self._members.items()]
+        heapq.heapify(self._heap)
+        self._stale = False
+
+
+class ParetoFront:
+    """
+    The completed entries of a ParamLog whose scores are not dominated by the scores of another completed entry,
+    with all objectives maximized. ParamLog.log_score updates it: a new score is only compared with the members of
+    the front, and the members it dominates are dropped. When a score of a member drops, or it stops being
+    completed, entries outside the front may have joined it, so the front is rebuilt from the log the next time
+    it is read.
+    """
+
+    def __init__(self, param_log):
+        """
+        :param param_log: the log to track. Type: ParamLog
+        """
+        self.param_log = param_log
+
+        # Rows of the members and their scores
+        self._rows = np.zeros(0, dtype=np.int64)
+        self._scores = np.zeros((0, param_log.n_objectives))
+        self._stale = False
+
+        self._rebuild()
+
+    def update(self, row, score, completed):
+        """
+        :param row: index of the entry, counting from 0. Type: int
+        :param score: the scores of the entry. Type: array of n_objectives floats
+        :param completed: whether the entry is completed. Type: bool
+        """
+        if self._stale:
+            return
+
+        score = np.asarray(score, dtype=np.float64).reshape(-1)
+        member = self._rows == row
+        if member.any():
+            if not completed or np.any(~(score >= self._scores[member][0])):
+                self._stale = True
+                return
+
+            # An improved member stays in the front and may now dominate other members
+            self._rows = self._rows[~member]
+            self._scores = self._scores[~member]
+
+        if not completed or np.isnan(score).any() or _dominated(self._scores, score).any():
+            return
+
+        kept = ~_dominated(score[None, :], self._scores)
+        self._rows = np.append(self._rows[kept], row)
+        self._scores = np.vstack([self._scores[kept], score])
+
+    def get_idx(self):
+        """
+        :return: array with the indexes of the entries in the front counting from 0, in the order of the log
+        """
+        if self._stale:
+            self._rebuild()
+
+        return np.sort(self._rows)
+
+    def _rebuild(self):
+        completed = self.param_log.get_completed_idx()
+        scores = (self.param_log.get_score()[completed] if len(completed) > 0
+                  else np.zeros((0, self.param_log.n_objectives)))
+
+        valid = ~np.isnan(scores).any(axis=1)
+        completed = completed[valid]
+        scores = scores[valid]
+        front = non_dominated_sort(scores) == 0
+
+        self._rows = completed[front].astype(np.int64)
+        self._scores = scores[front]
+        self._stale = False
+
+
+def non_dominated_sort(scores):
+    """
+    Sorts scores into non-dominated fronts, with all objectives maximized, using the efficient non-dominated sort
+    with sequential search (ENS-SS). The scores are sorted lexicographically from best to worst first, so a score
+    can only be dominated by scores before it, and each score is only compared with the fronts found so far
+    instead of with all other scores.
+    :param scores: array of shape (n, n_objectives)
+    :return: int array of length n with the front of each score, 0 for the non-dominated scores
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    scores = scores.reshape((-1, 1)) if scores.ndim < 2 else scores
+
+    ranks = np.zeros(len(scores), dtype=np.int64)
+    fronts = []
+    for i in np.lexsort(-scores.T[::-1]):
+        for rank, front in enumerate(fronts):
+            if not _dominated(scores[front], scores[i]).any():
+                break
+        else:
+            rank = len(fronts)
+            fronts.append([])
+
+        fronts[rank].append(i)
+        ranks[i] = rank
+
+    return ranks
+
+
+def _dominated(dominating, dominated):
+    """
+    :return: boolean array, True where a row of dominating dominates a row of dominated, broadcast over the rows
+    """
+    return np.all(dominating >= dominated, axis=-1) & np.any(dominating > dominated, axis=-1)
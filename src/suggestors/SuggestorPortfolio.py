@@ -0,0 +1,100 @@
+import math
+import time
+import numpy as np
+
+
+class SuggestorPortfolio:
+    """
+    Bandit that picks which suggestor makes the next suggestion. The reward of a trial is how much it improved the
+    best score, and its cost is the time spent suggesting and running it. Suggestors are picked by an upper
+    confidence bound on their improvement per second, so cheap and expensive suggestors can run side by side.
+    """
+
+    def __init__(self, n_suggestors, exploration=1.0):
+        """
+        :param n_suggestors: amount of suggestors to pick between. Type: int
+        :param exploration: weight of the confidence bound. Type: float
+        """
+        self.n_suggestors = n_suggestors
+        self.exploration = exploration
+
+        self.pulls = np.zeros(n_suggestors)
+        self.improvements = np.zeros(n_suggestors)
+        self.seconds = np.zeros(n_suggestors)
+        self.best_score = None
+
+        # Suggestors whose search space is exhausted, which are not picked again
+        self.exhausted = np.zeros(n_suggestors, dtype=bool)
+
+        # Trials that are running, from trial index to (suggestor, best score before, suggestion time, start time)
+        self._pending = {}
+
+    def choose(self):
+        """
+        :return: index of the suggestor that should make the next suggestion, or None if every suggestor is
+                 exhausted
+        """
+        if np.all(self.exhausted):
+            return None
+
+        untried = np.flatnonzero((self.pulls == 0) & ~self.exhausted)
+        if len(untried) > 0:
+            return int(untried[0])
+
+        available = ~self.exhausted
+        rates = self.improvements / np.maximum(self.seconds, 1e-9)
+        if rates[available].max() > 0:
+            rates = rates / rates[available].max()
+
+        bound = np.sqrt(2 * math.log(self.pulls.sum()) / np.maximum(self.pulls, 1))
+        return int(np.argmax(np.where(available, rates + self.exploration * bound, -np.inf)))
+
+    def exhaust(self, suggestor_idx):
+        """
+        Registers that the search space of a suggestor is exhausted, so it is not picked again.
+        :param suggestor_idx: index of the suggestor. Type: int
+        """
+        self.exhausted[suggestor_idx] = True
+
+    def start(self, trial_idx, suggestor_idx, suggestion_time):
+        """
+        Registers that a suggestor made the suggestion of a trial.
+        :param trial_idx: index of the trial in the param log. Type: int
+        :param suggestor_idx: index of the suggestor. Type: int
+        :param suggestion_time: seconds the suggestion took. Type: float
+        """
+        self.pulls[suggestor_idx] += 1
+        self._pending[trial_idx] = (suggestor_idx, self.best_score, suggestion_time, time.time())
+
+    def finish(self, trial_idx, score, completed=True):
+        """
+        Credits the suggestor of a finished trial with its improvement and cost. Trials that were not started
+        through the portfolio are ignored.
+        :param trial_idx: index of the trial in the param log. Type: int
+        :param score: score of the trial. Type: float
+        :param completed: False if the trial did not complete, e.g. was pruned, in which case it improves nothing.
+               Trials with a NaN or infinite score improve nothing either. Type: bool
+        """
+        if trial_idx not in self._pending:
+            return
+
+        suggestor_idx, best_before, suggestion_time, start_time = self._pending.pop(trial_idx)
+        self.seconds[suggestor_idx] += suggestion_time + time.time() - start_time
+
+        if not completed:
+            return
+
+        score = float(np.max(score))
+        if not np.isfinite(score):
+            return
+        if best_before is not None:
+            self.improvements[suggestor_idx] += max(score - best_before, 0)
+        if self.best_score is None or score > self.best_score:
+            self.best_score = score
+
+    def summary(self):
+        """
+        :return: list with a dict of the pulls, improvement and seconds of each suggestor
+        """
+        return [{"pulls": int(self.pulls[i]), "improvement": float(self.improvements[i]),
+                 "seconds": float(self.seconds[i])} for i in range(0, self.n_suggestors)]
@@ -0,0 +1,142 @@
+import math
+import numpy as np
+from .SuggestorBase import SuggestorBase
+from .RandomSearch import RandomSearch
+from .QuasiRandomSearch import QuasiRandomSearch
+from src.parameter_config.SearchSpace import SearchSpace
+
+
+class TPESearch(SuggestorBase):
+    """
+    Tree-structured Parzen Estimator. The completed trials are split into a good and a bad set by score, and a
+    Parzen density is fitted per dimension on each set. Candidates are drawn from the density of the good set and
+    the one with the highest ratio between the good and the bad density is suggested. Discrete parameters of the
+    search space are modelled as categories.
+
+    The good set holds at most max_good trials and the bad set is subsampled to max_bad trials, so the cost of a
+    suggestion does not grow with the amount of logged trials.
+    """
+
+    def __init__(self, rescale_functions, param_names, param_log, n_initial=10, n_candidates=1000, gamma=0.1,
+                 max_good=25, max_bad=250, prior_weight=1.0, min_bandwidth=0.01, initial_design="sobol"):
+        """
+        :param n_initial: amount of completed trials before the densities are used, suggestions are random until
+               then. Type: int
+        :param n_candidates: amount of candidates drawn from the good density per suggestion. Type: int
+        :param gamma: fraction of the completed trials in the good set. Type: float
+        :param max_good: maximum amount of trials in the good set. Type: int
+        :param max_bad: maximum amount of trials the bad density is fitted on. Type: int
+        :param prior_weight: weight of the uniform prior in the densities, relative to a single trial. Type: float
+        :param min_bandwidth: minimum bandwidth of the Parzen kernels, in unscaled units. Type: float
+        :param initial_design: how the suggestions are made until the densities are used, "random" or a method of
+               QuasiRandomSearch. Type: string
+        """
+        super(TPESearch, self).__init__(rescale_functions, param_names=param_names, param_log=param_log)
+
+        self.n_initial = n_initial
+        self.n_candidates = n_candidates
+        self.gamma = gamma
+        self.max_good = max_good
+        self.max_bad = max_bad
+        self.prior_weight = prior_weight
+        self.min_bandwidth = min_bandwidth
+
+        if initial_design == "random":
+            self._initial_design = RandomSearch(rescale_functions, param_names, param_log)
+        else:
+            self._initial_design = QuasiRandomSearch(rescale_functions, param_names, param_log, method=initial_design,
+                                                     batch_size=n_initial)
+
+        # Amount of categories of each dimension, 0 for dimensions modelled as continuous
+        self._n_categories = np.zeros(self.n_param, dtype=np.int64)
+        if self.search_space is not None:
+            discrete = self.search_space.type_codes == SearchSpace.DISCRETE
+            self._n_categories[discrete] = self.search_space.n_categories[discrete]
+
+    def calculate_suggestion(self):
+        completed = self.param_log.get_completed_idx()
+        if len(completed) < max(self.n_initial, 2):
+            return self._initial_suggestion()
+
+        good, bad = self._split(completed)
+        unscaled = self.param_log.get_unscaled_params()
+        good_x = unscaled[good].astype(np.float64)
+        bad_x = unscaled[bad].astype(np.float64)
+
+        # Drawing candidates from the good density and scoring them by the density ratio
+        candidates = np.zeros((self.n_candidates, self.n_param))
+        log_ratio = np.zeros(self.n_candidates)
+        for i in range(0, self.n_param):
+            if self._n_categories[i] > 0:
+                candidates[:, i], column_ratio = self._categorical(good_x[:, i], bad_x[:, i], self._n_categories[i])
+            else:
+                candidates[:, i], column_ratio = self._continuous(good_x[:, i], bad_x[:, i])
+            log_ratio += column_ratio
+
+        # Logging the best feasible candidate that has not been tried yet
+        feasible = np.flatnonzero(self._feasible_unscaled(candidates))
+        order = feasible[np.argsort(-log_ratio[feasible])[:64]]
+        dict_params, real_params = self._rescale(candidates[order])
+        for i in range(0, len(order)):
+            if self._log_param(real_params[i], candidates[order[i]]):
+                return dict_params[i], real_params[i]
+
+        return self._initial_suggestion()
+
+    def _initial_suggestion(self):
+        # Suggestions of the initial design are logged as coming from this suggestor
+        self._initial_design.source_id = self.source_id
+        return self._initial_design.calculate_suggestion()
+
+    def _split(self, completed):
+        score = self.param_log.get_score()[completed, 0]
+
+        n_good = max(min(int(math.ceil(self.gamma * len(completed))), self.max_good, len(completed) - 1), 1)
+        partition = np.argpartition(-score, n_good - 1)
+        good = completed[partition[:n_good]]
+        bad = completed[partition[n_good:]]
+
+        if len(bad) > self.max_bad:
+            bad = bad[np.random.choice(len(bad), self.max_bad, replace=False)]
+
+        return good, bad
+
+    def _continuous(self, good, bad):
+        good_bandwidth = self._bandwidth(good)
+        bad_bandwidth = self._bandwidth(bad)
+
+        # Sampling from the good mixture, where the prior is a uniform component
+        from_prior = np.random.random_sample(self.n_candidates) < self.prior_weight / (len(good) + self.prior_weight)
+        component = np.random.randint(0, len(good), self.n_candidates)
+        samples = good[component] + np.random.normal(0, good_bandwidth, self.n_candidates)
+        samples = np.where(from_prior, np.random.random_sample(self.n_candidates), np.clip(samples, 0, 1))
+
+        log_ratio = self._log_density(samples, good, good_bandwidth) - self._log_density(samples, bad, bad_bandwidth)
+        return samples, log_ratio
+
+    def _categorical(self, good, bad, n_categories):
+        good_probabilities = self._category_probabilities(good, n_categories)
+        bad_probabilities = self._category_probabilities(bad, n_categories)
+
+        categories = np.random.choice(n_categories, self.n_candidates, p=good_probabilities)
+        log_ratio = np.log(good_probabilities[categories]) - np.log(bad_probabilities[categories])
+
+        return categories / max(n_categories - 1, 1), log_ratio
+
+    def _category_probabilities(self, values, n_categories):
+        categories = np.rint(values * (n_categories - 1)).astype(np.int64)
+        counts = np.bincount(categories, minlength=n_categories) + self.prior_weight
+
+        return counts / counts.sum()
+
+    def _bandwidth(self, values):
+        # Scott's rule on the unscaled values
+        bandwidth = 1.06 * max(values.std(), 1 / len(values)) * len(values) ** (-1 / 5)
+        return min(max(bandwidth, self.min_bandwidth), 1.0)
+
+    def _log_density(self, x, centers, bandwidth):
+        # Mixture of Gaussians at the centers and a uniform prior over 0-1
+        z = (x[:, None] - centers[None, :]) / bandwidth
+        kernels = np.exp(-z ** 2 / 2).sum(axis=1) / (bandwidth * math.sqrt(2 * math.pi))
+
+        return np.log((kernels + self.prior_weight) / (len(centers) + self.prior_weight))
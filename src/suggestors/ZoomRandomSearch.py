@@ -1,10 +1,22 @@
 import numpy as np
-from .SuggestorBase import SuggestorBase
+from .SuggestorBase import SuggestorBase, SearchSpaceExhausted
+from src.parameter_config.SearchSpace import SearchSpace
 
 
 class ZoomRandomSearch(SuggestorBase):
 
-    def __init__(self, trials_per_zoom, rescale_functions, param_names, param_log, n_eval_trials=None):
+    def __init__(self, trials_per_zoom, rescale_functions, param_names, param_log, n_eval_trials=None, min_width=0.0,
+                 log_space=False):
+        """
+        :param trials_per_zoom: amount of suggestions between zooms. Type: int
+        :param n_eval_trials: amount of best completed trials the zoomed range is fitted around, default is 10% of
+               trials_per_zoom. Type: int
+        :param min_width: minimum width of the zoomed range of each dimension, in unscaled units. Type: float or
+               array of floats
+        :param log_space: zoomed ranges of incremental parameters with positive values are sampled uniformly in
+               the log of the actual values, so small values are zoomed in on as closely as large ones. True for all
+               such parameters or a list of parameter names. Needs a SearchSpace. Type: bool or list of strings
+        """
         # setting super init
         super(ZoomRandomSearch, self).__init__(rescale_functions, param_names=param_names, param_log=param_log)
 
@@ -17,52 +29,120 @@ class ZoomRandomSearch(SuggestorBase):
 
         # Setting amount of top suggestions to look at when zooming
         if n_eval_trials is None:
-            self.n_eval_trials = int(trials_per_zoom*0.1)
+            self.n_eval_trials = max(int(trials_per_zoom*0.1), 1)
         else:
             self.n_eval_trials = n_eval_trials
 
+        # Tracker of the best completed trials, made at the first zoom
+        self._top = None
+
+        self.min_width = np.broadcast_to(np.asarray(min_width, dtype=np.float64), (self.n_param, ))
+        self._log_dims = self._make_log_dims(log_space)
+
+    def _make_log_dims(self, log_space):
+        if log_space is False:
+            return np.zeros(self.n_param, dtype=bool)
+        if self.search_space is None:
+            raise ValueError("Zooming in log space needs a SearchSpace")
+
+        if log_space is True:
+            requested = np.ones(self.n_param, dtype=bool)
+        else:
+            requested = np.isin(self.param_names, list(log_space))
+
+        space = self.search_space
+        return (requested & (space.type_codes == SearchSpace.INCREMENTAL) & (space.lower_bounds > 0)
+                & (space.upper_bounds > space.lower_bounds))
+
     def calc_zoom_bounds(self):
-        score = self.param_log.get_score()
-        unscaled_params = self.param_log.get_unscaled_params()
+        if self._top is None:
+            self._top = self.param_log.track_top(self.n_eval_trials)
 
-        # Finding idx of top performing suggestions
-        idx = np.argpartition(score, -self.n_eval_trials, axis=None)[-self.n_eval_trials:]
+        # Finding idx of top performing completed suggestions, the range is kept until a trial is completed
+        idx = self._top.get_idx()
+        if len(idx) == 0:
+            return
 
         # Getting values of top performing suggestions
-        best_suggestions = unscaled_params[idx]
+        best_suggestions = self.param_log.get_unscaled_params()[idx].astype(np.float64)
 
         # Finding new bounds
-        self.upper_bounds = np.amax(best_suggestions, axis=0)
-        self.lower_bounds = np.amin(best_suggestions, axis=0)
+        upper_bounds = np.amax(best_suggestions, axis=0)
+        lower_bounds = np.amin(best_suggestions, axis=0)
+
+        # Widening ranges that are narrower than the minimum width around their center, within 0-1
+        narrow = upper_bounds - lower_bounds < self.min_width
+        width = np.minimum(self.min_width, 1)
+        lower_bounds = np.where(narrow, np.clip((upper_bounds + lower_bounds - width) / 2, 0, 1 - width),
+                                lower_bounds)
+        upper_bounds = np.where(narrow, lower_bounds + width, upper_bounds)
+
+        self.upper_bounds = upper_bounds
+        self.lower_bounds = lower_bounds
         self.difference = self.upper_bounds - self.lower_bounds
 
     def calculate_suggestion(self):
-        # If done with this trial range, zoom onto new range
-        if self.current_trial_in_zoom == self.trials_per_zoom:
-            self.calc_zoom_bounds()
-            self.current_trial_in_zoom = 0
+        dict_params, real_params = self.calculate_suggestions(1)
+
+        return dict_params[0], real_params[0]
+
+    def calculate_suggestions(self, n):
+        dict_params = []
+        real_params = []
 
-        dict_param = None
-        real = None
+        while len(dict_params) < n:
+            # If done with this trial range, zoom onto new range
+            if self.current_trial_in_zoom == self.trials_per_zoom:
+                self.calc_zoom_bounds()
+                self.current_trial_in_zoom = 0
 
-        unique = False
-        while not unique:
-            dict_param, real, unscaled = self._random_param_sample()
+            # Suggestions of a batch are not drawn across a zoom
+            n_draw = min(n - len(dict_params), self.trials_per_zoom - self.current_trial_in_zoom)
+            try:
+                dicts, real = self._suggest_unique(n_draw, self._random_param_samples, self.lower_bounds,
+                                                   self.upper_bounds)
+            except SearchSpaceExhausted:
+                if np.all(self.lower_bounds == 0) and np.all(self.upper_bounds == 1):
+                    raise
 
-            unique = self.param_log.log_param(real, unscaled, np.array([0]))
+                # Zooming out onto the whole space when the zoomed range is exhausted
+                self.upper_bounds = np.ones((self.n_param, ))
+                self.lower_bounds = np.zeros((self.n_param, ))
+                self.difference = self.upper_bounds - self.lower_bounds
+                continue
 
-        self.current_trial_in_zoom += 1
-        return dict_param, real
+            dict_params += dicts
+            real_params.append(real)
+            self.current_trial_in_zoom += len(dicts)
+
+        return dict_params, np.vstack(real_params)
 
     def _random_param_sample(self):
-        real_parameters = []
-        dict_param = {}
+        dict_params, real_parameters, unscaled_parameters = self._random_param_samples(1)
+
+        return dict_params[0], real_parameters[0], unscaled_parameters[0]
+
+    def _random_param_samples(self, n):
         # random are multiplied by range and lower bounds is added to get a value in the new range
-        unscaled_parameters = np.multiply(np.random.random_sample(self.n_param), self.difference)+self.lower_bounds
+        random = np.random.random_sample((n, self.n_param))
+        unscaled_parameters = np.multiply(random, self.difference)+self.lower_bounds
+
+        if self._log_dims.any():
+            unscaled_parameters[:, self._log_dims] = self._log_uniform(random[:, self._log_dims])
+
+        dict_params, real_parameters = self._rescale(unscaled_parameters)
+
+        return dict_params, real_parameters, unscaled_parameters
+
+    def _log_uniform(self, random):
+        # Unscaled values of actual values that are log-uniform between the actual values of the range ends
+        offset = self.search_space.lower_bounds[self._log_dims]
+        scale = self.search_space.upper_bounds[self._log_dims] - offset
+        lower = self.lower_bounds[self._log_dims]
+        upper = self.upper_bounds[self._log_dims]
 
-        for i, func in enumerate(self._rescale_functions):
-            param_value = func(unscaled_parameters[i])
-            real_parameters.append(param_value)
-            dict_param[self.param_names[i]] = param_value
+        log_lower = np.log(offset + scale * lower)
+        log_upper = np.log(offset + scale * upper)
+        unscaled = (np.exp(log_lower + random * (log_upper - log_lower)) - offset) / scale
 
-        return dict_param, np.asarray(real_parameters), unscaled_parameters
+        return np.clip(unscaled, lower, upper)
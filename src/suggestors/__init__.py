@@ -1,2 +1,8 @@
+from .SuggestorBase import SearchSpaceExhausted, ParetoFront, non_dominated_sort
 from .RandomSearch import *
 from .ZoomRandomSearch import *
+from .QuasiRandomSearch import *
+from .BayesianSearch import *
+from .ParEGOSearch import *
+from .TPESearch import *
+from .SuggestorPortfolio import *
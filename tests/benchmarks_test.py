@@ -0,0 +1,38 @@
+import json
+import math
+import pytest
+import numpy as np
+from src.benchmarks import Branin, Hartmann6, Rosenbrock, MixedSynthetic, run_benchmarks, compare_results
+
+
+def test_objective_minima():
+    assert Branin().evaluate(math.pi, 2.275) == pytest.approx(Branin.minimum, abs=1e-5)
+    assert Branin().run("test", x1=math.pi, x2=2.275) == pytest.approx(Branin().optimum, abs=1e-5)
+
+    optimum = [0.20169, 0.150011, 0.476874, 0.275332, 0.311652, 0.6573]
+    params = {"x{}".format(i + 1): value for i, value in enumerate(optimum)}
+    assert Hartmann6().evaluate(**params) == pytest.approx(Hartmann6.minimum, abs=1e-5)
+
+    assert Rosenbrock(3).evaluate(x1=1, x2=1, x3=1) == 0
+    assert MixedSynthetic().evaluate(x=0.3, layers=7, learning_rate=10 ** -2.5, activation="relu") == 0
+
+
+def test_run_benchmarks(tmp_path):
+    output_path = str(tmp_path / "benchmark.json")
+    results = run_benchmarks(suggestors=["RandomSearch", "TPESearch"], objectives=["Branin", "MixedSynthetic"],
+                             n_trials=12, sizes=(100, ), output_path=output_path)
+
+    with open(output_path) as output_file:
+        assert json.load(output_file) == results
+
+    branin = results["suggestors"]["TPESearch"]["Branin"]
+    assert len(branin["best_score"]) == 12
+    assert np.all(np.diff(branin["best_score"]) >= 0)
+    assert branin["regret"] >= 0
+    assert results["param_log"][0]["logged"] == 100
+
+    # Comparing with itself reports no regressions, and with a faster baseline it does
+    assert compare_results(results, output_path) == []
+    faster = json.loads(json.dumps(results))
+    faster["save_log"][0]["save_log_seconds"] /= 10
+    assert [metric for metric, _, _ in compare_results(faster, results)] == ["save_log/100"]
@@ -0,0 +1,26 @@
+import pytest
+import sys
+import subprocess
+from src.callbacks import KerasCallbackProvider, NoCallbackProvider
+
+
+def test_import_is_light():
+    # Importing src must not import the deep learning frameworks or pandas
+    code = ("import sys, src; from src.suggestors import RandomSearch; "
+            "print([m for m in ('keras', 'tensorflow', 'torch', 'pandas', 'scipy') if m in sys.modules])")
+    output = subprocess.check_output([sys.executable, "-c", code], universal_newlines=True)
+
+    assert output.strip() == "[]"
+
+
+def test_no_callback_provider():
+    assert NoCallbackProvider().make_callbacks("test", "/tmp") is None
+
+
+def test_keras_callback_provider(tmp_path):
+    pytest.importorskip("keras")
+
+    callbacks = KerasCallbackProvider(patience=3).make_callbacks("test.keras", str(tmp_path))
+
+    assert len(callbacks) == 3
+    assert callbacks[1].patience == 3
@@ -0,0 +1,71 @@
+import numpy as np
+from src import Tuner, SingleParam
+from src.storage import EvaluationCache
+
+
+class CountingSam:
+
+    def __init__(self):
+        self.runs = 0
+
+    def run(self, name, x, y):
+        self.runs += 1
+        return x + y
+
+
+param_config = (SingleParam("x", output_type="integer", value_range=(0, 99), scaling="incremental", increment=1),
+                SingleParam("y", output_type="discrete", value_range=[1, 2, 3]))
+
+
+def test_cache_keys(tmp_path):
+    cache = EvaluationCache(str(tmp_path / "cache.db"), version="v1")
+
+    assert cache.make_key({"x": np.int64(3), "y": 0.5}) == cache.make_key({"y": 0.5, "x": 3})
+    assert cache.make_key({"x": 3}) != cache.make_key({"x": 4})
+    assert cache.make_key({"x": 3}) != EvaluationCache(str(tmp_path / "cache.db"), version="v2").make_key({"x": 3})
+
+    assert cache.get({"x": 3}) is None
+    cache.put({"x": 3}, 0.5, seconds=2.0)
+    assert cache.get({"x": 3}) == (0.5, 2.0)
+
+    # Scores of several objectives
+    cache.put({"x": 4}, np.array([0.5, -2.0]))
+    assert cache.get({"x": 4})[0].tolist() == [0.5, -2.0]
+
+    # The version tag separates objectives in the same file
+    assert EvaluationCache(str(tmp_path / "cache.db"), version="v2").get({"x": 3}) is None
+
+
+def test_cache_eviction(tmp_path):
+    cache = EvaluationCache(str(tmp_path / "cache.db"), max_entries=3)
+    for x in range(0, 3):
+        cache.put({"x": x}, x)
+
+    # Using the oldest entry makes the second entry the least recently used
+    cache.get({"x": 0})
+    cache.put({"x": 3}, 3)
+
+    assert len(cache) == 3
+    assert cache.get({"x": 1}) is None
+    assert [cache.get({"x": x})[0] for x in (0, 2, 3)] == [0, 2, 3]
+
+
+def test_tuner_cache(tmp_path):
+    cache = EvaluationCache(str(tmp_path / "cache.db"), version="v1")
+
+    sam = CountingSam()
+    np.random.seed(0)
+    first = Tuner("first", sam, param_config, "RandomSearch", str(tmp_path), callback_provider="none", cache=cache)
+    first.tune(lambda trials: trials >= 10)
+    assert sam.runs == 10
+    assert len(cache) == 10
+
+    # A new study suggesting the same parameters takes every score from the cache
+    sam = CountingSam()
+    np.random.seed(0)
+    second = Tuner("second", sam, param_config, "RandomSearch", str(tmp_path), callback_provider="none", cache=cache)
+    second.tune(lambda trials: trials >= 12, n_workers=2, executor="thread")
+
+    assert sam.runs == 2
+    assert np.array_equal(second.param_log.get_score()[:10], first.param_log.get_score())
+    assert all(record.get("cached", False) for record in second.journal.read()[:10])
@@ -0,0 +1,90 @@
+import os
+import time
+import pytest
+import numpy as np
+from src import Tuner, SingleParam
+from src.schedulers import Hyperband
+from src.suggestors.SuggestorBase import ParamLog
+
+
+def test_hyperband_brackets():
+    hyperband = Hyperband(1, 81, eta=3)
+
+    assert hyperband.s_max == 4
+    assert hyperband.bracket(4) == [(81, 1), (27, 3), (9, 9), (3, 27), (1, 81)]
+    assert hyperband.bracket(2) == [(15, 9), (5, 27), (1, 81)]
+    assert hyperband.bracket(0) == [(5, 81)]
+
+    brackets = hyperband.brackets()
+    assert [len(next(brackets)) for _ in range(0, 6)] == [5, 4, 3, 2, 1, 5]
+
+
+def test_hyperband_promote():
+    assert list(Hyperband.promote([0.1, 0.5, 0.3, 0.9], 2)) == [3, 1]
+
+
+def test_hyperband_float_budget():
+    hyperband = Hyperband(0.1, 1.0, eta=3)
+
+    assert hyperband.s_max == 2
+    assert np.allclose([budget for _, budget in hyperband.bracket(2)], [1 / 9, 1 / 3, 1])
+
+
+class BudgetSam:
+
+    def __init__(self, hang=False):
+        self.hang = hang
+        self.runs = []
+        self.saved = []
+
+    def run(self, name, x, epochs):
+        self.runs.append((name, x, epochs))
+
+        # x = 3 hangs on the largest budget if hang is set
+        if self.hang and x == 3 and epochs == 9:
+            time.sleep(60)
+
+        return float(x * epochs)
+
+    def save(self, path):
+        self.saved.append(os.path.basename(path))
+
+
+def test_tune_hyperband(tmp_path):
+    param_config = (SingleParam("x", "integer", (0, 3), "incremental", 1), )
+    sam = BudgetSam()
+    tuner = Tuner("test", sam, param_config, "RandomSearch", str(tmp_path), callback_provider="none")
+
+    # A single bracket with 9 configurations is more than the space has, so it is run with the 4 there are
+    tuner.tune_hyperband(lambda trials: trials > 0, 1, 9, eta=3, budget_name="epochs", save_model=True)
+
+    x = tuner.param_log.get_actual_params()[:, 0].astype(int)
+    runs = [(run_x, epochs) for _, run_x, epochs in sam.runs]
+    assert sorted(runs[:4]) == [(0, 1), (1, 1), (2, 1), (3, 1)]
+    # The best 3 are run on 3 epochs, and the best of those on 9
+    assert runs[4:] == [(3, 3), (2, 3), (1, 3), (3, 9)]
+
+    # Every evaluation is logged with its budget, and the log has the score of the largest budget
+    budget_scores = {(int(idx), budget): score for idx, budget, score in tuner.param_log.get_budget_scores()}
+    for idx in range(1, 5):
+        assert budget_scores[(idx, 1)] == x[idx-1]
+    best = int(np.flatnonzero(x == 3)[0]) + 1
+    assert budget_scores[(best, 3)] == 9 and budget_scores[(best, 9)] == 27
+    assert tuner.param_log.get_score()[best-1, 0] == 27
+
+    # Checkpoints are saved per budget
+    assert len(set(sam.saved)) == 8
+    assert "test_param_{}_budget_9".format(best) in sam.saved
+
+
+def test_tune_hyperband_timeout(tmp_path):
+    param_config = (SingleParam("x", "integer", (0, 3), "incremental", 1), )
+    tuner = Tuner("test", BudgetSam(hang=True), param_config, "RandomSearch", str(tmp_path), callback_provider="none",
+                  trial_timeout=1.0, timeout_score=-1.0)
+    tuner.tune_hyperband(lambda trials: trials > 0, 1, 9, eta=3, budget_name="epochs")
+
+    # The timed out evaluation is ranked and logged with the timeout score
+    best = int(np.flatnonzero(tuner.param_log.get_actual_params()[:, 0].astype(int) == 3)[0]) + 1
+    assert tuner.param_log.get_budget_scores(best)[:, 2].tolist() == [3.0, 9.0, -1.0]
+    assert tuner.param_log.get_status()[best-1] == ParamLog.TIMED_OUT
+    assert tuner.param_log.get_score()[best-1, 0] == -1.0
@@ -0,0 +1,83 @@
+import os
+import pytest
+import numpy as np
+from src import Tuner, SingleParam
+from src.storage import Journal
+
+
+class Sam:
+
+    def run(self, name, x):
+        return float(x)
+
+
+def test_journal(tmp_path):
+    journal = Journal(str(tmp_path / "test_journal.jsonl"))
+
+    for i in range(1, 11):
+        journal.append({"trial": i, "score": [i * 0.5]})
+    journal.close()
+
+    records = journal.read()
+    assert [record["trial"] for record in records] == list(range(1, 11))
+    assert records[3]["score"] == [2.0]
+
+    # A partially written record is ignored
+    with open(journal.path, "a") as journal_file:
+        journal_file.write('{"trial": 11, "sco')
+
+    assert len(journal.read()) == 10
+
+    # Appending after the crash starts a new line, so the journal stays readable
+    journal.append({"trial": 11, "score": [5.5]})
+    journal.close()
+    assert [record["trial"] for record in journal.read()] == list(range(1, 12))
+
+
+def test_resume_after_torn_write(tmp_path):
+    param_config = (SingleParam("x", "integer", (0, 99), "incremental", 1), )
+    tuner = Tuner("test", Sam(), param_config, "RandomSearch", str(tmp_path), callback_provider="none")
+    tuner.tune(lambda trials: trials >= 5)
+    os.remove(os.path.join(str(tmp_path), "test_params_actual.npy"))
+
+    # A crash in the middle of writing a record
+    with open(tuner.journal.path, "a") as journal_file:
+        journal_file.write('{"trial": 6, "actual": [1')
+
+    for n_trials in [8, 10]:
+        tuner = Tuner.resume("test", Sam(), param_config, "RandomSearch", str(tmp_path), callback_provider="none")
+        tuner.tune(lambda trials: len(tuner.param_log) >= n_trials)
+        os.remove(os.path.join(str(tmp_path), "test_params_actual.npy"))
+
+    resumed = Tuner.resume("test", Sam(), param_config, "RandomSearch", str(tmp_path), callback_provider="none")
+    assert len(resumed.param_log) == 10
+    assert np.all(resumed.param_log.get_score()[:, 0] == resumed.param_log.get_actual_params()[:, 0])
+
+
+def test_new_study_starts_new_journal(tmp_path):
+    param_config = (SingleParam("x", "integer", (0, 99), "incremental", 1), )
+    tuner = Tuner("test", Sam(), param_config, "RandomSearch", str(tmp_path), callback_provider="none")
+    tuner.tune(lambda trials: trials >= 3)
+
+    # A new study with the same name and another value range
+    param_config = (SingleParam("x", "integer", (100, 199), "incremental", 1), )
+    tuner = Tuner("test", Sam(), param_config, "RandomSearch", str(tmp_path), callback_provider="none")
+    tuner.tune(lambda trials: trials >= 2)
+
+    assert len(tuner.journal.read()) == 2
+    assert len(Journal(tuner.journal.path + ".1").read()) == 3
+
+    resumed = Tuner.resume("test", Sam(), param_config, "RandomSearch", str(tmp_path), callback_provider="none")
+    assert len(resumed.param_log) == 2
+    assert np.all(resumed.param_log.get_actual_params()[:, 0].astype(float) >= 100)
+
+    # Only the records of the study that wrote the last record are replayed
+    os.remove(os.path.join(str(tmp_path), "test_params_actual.npy"))
+    with open(tuner.journal.path + ".1") as old_journal, open(tuner.journal.path) as journal:
+        lines = old_journal.read() + journal.read()
+    with open(tuner.journal.path, "w") as journal:
+        journal.write(lines)
+
+    resumed = Tuner.resume("test", Sam(), param_config, "RandomSearch", str(tmp_path), callback_provider="none")
+    assert len(resumed.param_log) == 2
+    assert resumed.study_id == tuner.study_id
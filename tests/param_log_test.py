@@ -0,0 +1,142 @@
+import pytest
+import numpy as np
+from src.suggestors.SuggestorBase import ParamLog, non_dominated_sort
+
+
+def test_param_log_growth():
+    param_log = ParamLog(3)
+
+    assert param_log.get_actual_params() is None
+
+    actual = np.arange(0, 3000, dtype=np.float64).reshape((-1, 3))
+    unscaled = actual / 3000
+    for i in range(len(actual)):
+        assert param_log.log_param(actual[i], unscaled[i], np.array([0]))
+        param_log.log_score(i)
+
+    assert len(param_log) == 1000
+    assert param_log.get_actual_params().shape == (1000, 3)
+    assert np.array_equal(param_log.get_actual_params(), actual)
+    assert np.array_equal(param_log.get_unscaled_params(), unscaled)
+    assert np.array_equal(param_log.get_score(), np.arange(1000, dtype=np.float64).reshape((-1, 1)))
+
+
+def test_param_log_upcasts_dtype():
+    param_log = ParamLog(2)
+
+    param_log.log_param(np.array([1, 2]), np.array([0.1, 0.2]), np.array([0]))
+    param_log.log_param(np.array([1.5, 3]), np.array([0.15, 0.3]), np.array([0]))
+
+    assert np.array_equal(param_log.get_actual_params(), [[1, 2], [1.5, 3]])
+
+
+def test_param_log_duplicate_detection():
+    param_log = ParamLog(3)
+
+    param_log.log_param(np.array([1, 2, 3]), np.array([0.1, 0.2, 0.3]), np.array([0]))
+    param_log.log_param(np.array([1, 2, 4]), np.array([0.1, 0.2, 0.4]), np.array([0]))
+
+    assert not param_log.log_param(np.array([1, 2, 4]), np.array([0.1, 0.2, 0.4]), np.array([0]))
+    assert param_log.log_param(np.array([2, 2, 4]), np.array([0.2, 0.2, 0.4]), np.array([0]))
+
+    assert param_log.find_param_log_idx(np.array([1, 2, 4]), [0, 1, 2]) == 1
+    assert param_log.find_param_log_idx(np.array([9, 9, 9]), [0, 1, 2]) is None
+
+    # Lookups by a subset of the columns return the first matching entry
+    assert param_log.find_param_log_idx(np.array([2, 4]), [1, 2]) == 1
+    param_log.log_param(np.array([3, 5, 6]), np.array([0.3, 0.5, 0.6]), np.array([0]))
+    assert param_log.find_param_log_idx(np.array([5, 6]), [1, 2]) == 3
+
+
+def test_param_log_quantized_keys():
+    param_log = ParamLog(1, key_decimals=6)
+
+    param_log.log_param(np.array([0.1 + 0.2]), np.array([0.3]), np.array([0]))
+
+    assert not param_log.log_param(np.array([0.3]), np.array([0.3]), np.array([0]))
+
+
+def test_param_log_load(tmp_path):
+    actual = np.random.random_sample((100, 3))
+    unscaled = np.random.random_sample((100, 3))
+    score = np.random.random_sample((100, 1))
+
+    np.save(str(tmp_path / "test_params_actual.npy"), actual)
+    np.save(str(tmp_path / "test_params_unscaled.npy"), unscaled)
+    np.save(str(tmp_path / "test_params_scores.npy"), score)
+
+    param_log = ParamLog.load(str(tmp_path), "test")
+
+    assert isinstance(param_log.get_actual_params(), np.memmap)
+    assert np.array_equal(param_log.get_actual_params(), actual)
+    assert np.array_equal(param_log.get_score(), score)
+
+    # The loaded entries are indexed and the log can be appended to
+    assert not param_log.log_param(actual[5], unscaled[5], np.array([0]))
+    assert param_log.log_param(actual[5] + 1, unscaled[5], np.array([0]))
+    param_log.log_score(7)
+
+    assert len(param_log) == 101
+    assert np.array_equal(param_log.get_actual_params()[:100], actual)
+    assert param_log.get_score()[-1] == 7
+
+
+def test_top_scores():
+    param_log = ParamLog(1)
+    for i in range(0, 6):
+        param_log.log_param(np.array([i]), np.array([i / 10]), 0)
+    param_log.log_score(0.5, idx=1)
+    top = param_log.track_top(3)
+
+    # Pending entries are not tracked, whatever their placeholder score
+    assert list(top.get_idx()) == [0]
+
+    for idx, score in [(2, 0.9), (3, 0.1), (4, 0.7), (5, 0.8)]:
+        param_log.log_score(score, idx=idx)
+    assert list(top.get_idx()) == [1, 4, 3]
+
+    # An entry whose score rises stays tracked, one that is pruned is replaced from the log
+    param_log.log_score(0.95, idx=4)
+    assert list(top.get_idx()) == [3, 1, 4]
+    param_log.log_score(0.95, idx=2, status=ParamLog.PRUNED)
+    assert list(top.get_idx()) == [3, 4, 0]
+
+
+def brute_force_ranks(scores):
+    # dominates[i, j] is True if score i dominates score j
+    dominates = np.all(scores[:, None] >= scores[None], axis=2) & np.any(scores[:, None] > scores[None], axis=2)
+
+    ranks = np.full(len(scores), -1)
+    rank = 0
+    while np.any(ranks < 0):
+        left = ranks < 0
+        ranks[left & ~np.any(dominates[left], axis=0)] = rank
+        rank += 1
+
+    return ranks
+
+
+@pytest.mark.parametrize("n_objectives", [2, 3])
+def test_non_dominated_sort(n_objectives):
+    # Few distinct values, so there are ties in every objective
+    scores = np.random.randint(0, 5, (200, n_objectives)).astype(float)
+
+    assert np.array_equal(non_dominated_sort(scores), brute_force_ranks(scores))
+
+
+def test_pareto_front():
+    param_log = ParamLog(1, n_objectives=2)
+    front = param_log.track_pareto_front()
+    scores = np.random.random_sample((100, 2))
+
+    for i in range(0, 100):
+        param_log.log_param(np.array([i]), np.array([i / 100]), 0)
+        param_log.log_score(scores[i])
+        assert list(front.get_idx()) == list(np.flatnonzero(brute_force_ranks(scores[:i+1]) == 0))
+
+    # A member whose scores drop is replaced from the log
+    best = front.get_idx()[0]
+    param_log.log_score(scores[best] - 1, idx=best + 1)
+    scores[best] -= 1
+    assert list(front.get_idx()) == list(np.flatnonzero(brute_force_ranks(scores) == 0))
+    assert param_log.get_score().shape == (100, 2)
@@ -0,0 +1,69 @@
+import time
+import pytest
+from src import Tuner, SingleParam
+from src.profiling import MemoryCollector, JsonlSink, SuggestionProfiler, read_spans, summarize_spans
+
+
+class SleepingSam:
+
+    def run(self, name, x):
+        time.sleep(0.01)
+        return x
+
+
+def make_tuner(tmp_path, hooks):
+    param_config = (SingleParam("x", output_type="double", value_range=(0, 1), scaling="incremental",
+                                increment=0.001), )
+    return Tuner("test", SleepingSam(), param_config, "RandomSearch", str(tmp_path), callback_provider="none",
+                 hooks=hooks)
+
+
+def test_trial_spans(tmp_path):
+    collector = MemoryCollector()
+    sink = JsonlSink(str(tmp_path / "spans.jsonl"))
+    profiler = SuggestionProfiler()
+
+    tuner = make_tuner(tmp_path, [collector, sink, profiler])
+    tuner.tune(lambda trials: trials >= 5)
+
+    phases = ["suggestion", "callbacks", "run", "scoring", "persistence"]
+    assert [span["phase"] for span in collector.spans] == phases * 5 + ["save_log"]
+    assert [span["trial"] for span in collector.spans[:10]] == [1] * 5 + [2] * 5
+
+    # The sink has the same spans as the collector
+    assert read_spans(str(tmp_path / "spans.jsonl")) == collector.spans
+
+    summary = collector.summary()
+    assert summary["phases"]["run"]["count"] == 5
+    assert summary["run_seconds"] >= 0.05
+    assert 0 < summary["tuner_fraction"] < 1
+
+    # Only the suggestions are profiled
+    functions = [function for _, _, function in profiler.stats().stats.keys()]
+    assert "calculate_suggestion" in functions
+    assert "run" not in functions
+
+
+def test_parallel_spans(tmp_path):
+    collector = MemoryCollector()
+    tuner = make_tuner(tmp_path, [collector])
+    tuner.tune(lambda trials: trials >= 6, n_workers=3, executor="thread")
+
+    runs = [span for span in collector.spans if span["phase"] == "run"]
+    assert sorted(span["trial"] for span in runs) == list(range(1, 7))
+    assert all(span["seconds"] >= 0.01 for span in runs)
+
+    summary = collector.summary()
+    assert summary["wait_seconds"] > 0
+    assert summary["phases"]["suggestion"]["count"] == 6
+
+
+def test_summarize_spans():
+    spans = [{"trial": 1, "phase": "suggestion", "start": 0, "seconds": 1.0},
+             {"trial": 1, "phase": "run", "start": 1, "seconds": 3.0},
+             {"trial": None, "phase": "wait", "start": 1, "seconds": 2.0}]
+
+    summary = summarize_spans(spans)
+    assert summary["tuner_seconds"] == 1.0
+    assert summary["tuner_fraction"] == pytest.approx(0.25)
+    assert summary["phases"]["run"]["fraction"] == pytest.approx(0.5)
@@ -0,0 +1,77 @@
+import pytest
+import numpy as np
+from src.suggestors.SuggestorBase import ParamLog
+from src.pruners import MedianPruner, PercentilePruner, ThresholdPruner, Reporter, TrialPruned
+
+
+def make_log(n_trials):
+    param_log = ParamLog(1)
+    for i in range(1, n_trials + 1):
+        param_log.log_param(np.array([i]), np.array([i / n_trials]), np.array([0]))
+
+    return param_log
+
+
+def test_median_pruner():
+    param_log = make_log(7)
+
+    # Six completed trials reporting 0-5 at every step
+    for idx in range(1, 7):
+        for step in range(0, 3):
+            param_log.log_intermediate(idx - 1, step, idx=idx)
+        param_log.log_score(idx - 1, idx=idx)
+
+    reporter = Reporter(param_log, 7, MedianPruner(n_startup_trials=5, n_warmup_steps=1))
+
+    # No pruning in the warmup steps
+    reporter(0, -10)
+    reporter(1, 3)
+
+    with pytest.raises(TrialPruned):
+        reporter(2, 2)
+
+    assert np.array_equal(param_log.get_intermediate(7), [[7, 0, -10], [7, 1, 3], [7, 2, 2]])
+
+
+def test_median_pruner_startup():
+    param_log = make_log(3)
+
+    for idx in range(1, 3):
+        param_log.log_intermediate(idx, 0, idx=idx)
+        param_log.log_score(idx, idx=idx)
+
+    # Too few completed trials to prune
+    Reporter(param_log, 3, MedianPruner(n_startup_trials=5))(0, -10)
+
+
+def test_percentile_pruner():
+    param_log = make_log(101)
+
+    for idx in range(1, 101):
+        param_log.log_intermediate(idx, 0, idx=idx)
+        param_log.log_score(idx, idx=idx)
+
+    pruner = PercentilePruner(25)
+    param_log.log_intermediate(80, 0, idx=101)
+    assert not pruner.prune(param_log, 101, 0)
+    param_log.log_intermediate(70, 0, idx=101)
+    assert pruner.prune(param_log, 101, 0)
+
+    # Lower is better
+    pruner = PercentilePruner(25, maximize=False)
+    param_log.log_intermediate(20, 0, idx=101)
+    assert not pruner.prune(param_log, 101, 0)
+    param_log.log_intermediate(30, 0, idx=101)
+    assert pruner.prune(param_log, 101, 0)
+
+
+def test_threshold_pruner():
+    param_log = make_log(1)
+    pruner = ThresholdPruner(lower=0.1)
+
+    param_log.log_intermediate(0.5, 0)
+    assert not pruner.prune(param_log, 1, 0)
+    param_log.log_intermediate(0.05, 1)
+    assert pruner.prune(param_log, 1, 1)
+    param_log.log_intermediate(np.nan, 2)
+    assert pruner.prune(param_log, 1, 2)
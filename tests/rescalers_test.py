@@ -36,3 +36,53 @@ def test_log_rescaler():
     assert rescaler(0) == 0.01
     assert rescaler(1) == 10
 
+
+
+def test_rescalers_vectorized():
+    values = np.linspace(0, 1, 1001)
+
+    rescalers = [res.create_min_max_rescaler((40, 120), (0, 1)),
+                 res.incremental_rescaler(incremental=0.05, min_max_range=(0, 0.7)),
+                 res.incremental_rescaler(incremental=50, min_max_range=(100, 1000)),
+                 res.log_rescaler((0.0001, 0.01)),
+                 res.log_rescaler((1, 1000), int_log=True)]
+
+    for rescaler in rescalers:
+        rescaled = rescaler(values)
+
+        assert rescaled.shape == values.shape
+        assert np.allclose(rescaled, [rescaler(value) for value in values])
+
+        # Rescaling the inverse gives back the same values
+        assert np.allclose(rescaler(rescaler.inverse(rescaled)), rescaled)
+
+
+def test_rescaler_range_check():
+    rescaler = res.incremental_rescaler(incremental=5, min_max_range=(0, 100))
+
+    with pytest.raises(ValueError):
+        rescaler(np.array([0.5, 1.5]))
+
+
+def test_discrete_rescaler():
+    from src.parameter_config.ParamConfig import ParamConfig
+
+    discrete_values = [64, 128, 256, 512, 1024]
+    rescaler = ParamConfig()._discrete(discrete_values)
+
+    rescaled = rescaler(np.linspace(0, 1, 101))
+
+    assert np.array_equal(rescaled, [rescaler(value) for value in np.linspace(0, 1, 101)])
+    assert type(rescaler(0.5)) is int
+    assert np.array_equal(rescaler(rescaler.inverse(discrete_values)), discrete_values)
+
+
+def test_discrete_rescaler_unknown_value():
+    from src.parameter_config.ParamConfig import ParamConfig, SingleParam
+
+    rescaler = ParamConfig()._get_rescale_function(SingleParam("batch_size", "discrete", [64, 128, 256]))
+
+    with pytest.raises(ValueError, match="batch_size"):
+        rescaler.inverse(100)
+    with pytest.raises(ValueError, match="batch_size"):
+        rescaler.inverse([64, "relu"])
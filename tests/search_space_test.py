@@ -0,0 +1,134 @@
+import pytest
+import numpy as np
+from src.parameter_config.ParamConfig import SingleParam
+from src.parameter_config.SearchSpace import SearchSpace
+
+
+param_config = (
+    SingleParam("learning_rate", output_type="double", value_range=(0.0001, 0.01), scaling="log"),
+    SingleParam("dropout_l", output_type="double", value_range=(0, 0.7), scaling="incremental", increment=0.05),
+    SingleParam("hidden_size_l", "integer", (100, 1000), "incremental", 50),
+    SingleParam("units", "integer", (1, 100), "log"),
+    SingleParam("batch_size", output_type="discrete", value_range=[64, 128, 256, 512, 1024])
+)
+
+
+def test_transform_matches_rescale_functions():
+    search_space = SearchSpace(param_config)
+
+    unscaled = np.random.random_sample((1000, search_space.n_params))
+    unscaled[0] = 0
+    unscaled[1] = 1
+
+    real = search_space.transform(unscaled)
+
+    for i, func in enumerate(search_space.rescale_functions):
+        assert np.array_equal(real[:, i], func(unscaled[:, i]))
+
+    # Single values are equal up to floating point rounding
+    for i, func in enumerate(search_space.rescale_functions):
+        assert np.allclose(real[:100, i].astype(float), [func(value) for value in unscaled[:100, i]], rtol=1e-12)
+
+    dict_params = search_space.to_dicts(real)
+    assert type(dict_params[0]["batch_size"]) is int
+    assert type(dict_params[0]["units"]) is int
+
+
+def test_inverse():
+    search_space = SearchSpace(param_config)
+
+    real = search_space.transform(np.random.random_sample((1000, search_space.n_params)))
+
+    assert np.array_equal(search_space.transform(search_space.inverse(real)), real)
+
+
+def test_lattice():
+    search_space = SearchSpace(param_config)
+
+    assert np.array_equal(search_space.cardinality, [np.inf, 15, 19, 100, 5])
+    assert search_space.lattice[0] is None
+    assert np.array_equal(search_space.lattice[4], [64, 128, 256, 512, 1024])
+
+    # All reachable values are in the lattice
+    real = search_space.transform(np.random.random_sample((10000, search_space.n_params)))
+    for i in range(1, search_space.n_params):
+        assert set(np.unique(real[:, i])) == set(search_space.lattice[i])
+
+
+def test_unscaled_lattice():
+    search_space = SearchSpace(param_config)
+    assert search_space.unscaled_lattice[0] is None
+
+    # The unscaled lattice transforms into the lattice, and the lattice index finds each value
+    for i in range(1, search_space.n_params):
+        unscaled = np.full((len(search_space.lattice[i]), search_space.n_params), 0.5)
+        unscaled[:, i] = search_space.unscaled_lattice[i]
+        real = search_space.transform(unscaled)
+
+        assert np.array_equal(real[:, i], search_space.lattice[i])
+        assert np.array_equal(search_space.lattice_index(real)[:, i], np.arange(0, len(search_space.lattice[i])))
+
+
+def test_lattice_box():
+    search_space = SearchSpace(param_config)
+    lower = np.full(search_space.n_params, 0.2)
+    upper = np.full(search_space.n_params, 0.4)
+
+    box = search_space.lattice_box(lower, upper)
+    assert box[0] is None
+    assert [len(values) for values in box[1:]] == [4, 4, 4, 2]
+
+    # Every value reachable from the box is in it, and the box values are within the box
+    real = search_space.transform(np.random.uniform(0.2, 0.4, (10000, search_space.n_params)))
+    for i in range(1, search_space.n_params):
+        unscaled = np.full((len(box[i]), search_space.n_params), 0.3)
+        unscaled[:, i] = box[i]
+        assert set(np.unique(real[:, i])) == set(search_space.transform(unscaled)[:, i])
+        assert np.all((box[i] >= 0.2) & (box[i] <= 0.4))
+
+
+def test_non_numeric_categories():
+    search_space = SearchSpace([SingleParam("activation", "discrete", ["relu", "tanh"]),
+                                SingleParam("dropout_l", "double", (0, 0.5), "incremental", 0.1)])
+
+    real = search_space.transform(np.array([[0.1, 0.5], [0.9, 1]]))
+
+    assert real[:, 0].tolist() == ["relu", "tanh"]
+    assert np.allclose(search_space.inverse(real), [[0, 0.4], [1, 1]])
+
+
+def test_mixed_categories_stay_numeric():
+    search_space = SearchSpace([SingleParam("batch_size", "discrete", [64, 128]),
+                                SingleParam("activation", "discrete", ["relu", "tanh"])])
+
+    real = search_space.transform(np.array([[0.1, 0.9], [0.9, 0.1]]))
+
+    assert search_space.to_dicts(real) == [{"batch_size": 64, "activation": "tanh"},
+                                           {"batch_size": 128, "activation": "relu"}]
+    assert np.allclose(search_space.inverse(real), [[0, 1], [1, 0]])
+
+
+def test_feasible():
+    search_space = SearchSpace(param_config + (SingleParam("activation", "discrete", ["relu", "tanh"]), ),
+                               constraints=[lambda p: p["hidden_size_l"] * p["batch_size"] <= 2 ** 17,
+                                            lambda p: p["activation"] == "relu"])
+
+    real = search_space.transform(np.random.random_sample((1000, 6)))
+    expected = (real[:, 2].astype(float) * real[:, 4].astype(float) <= 2 ** 17) & (real[:, 5] == "relu")
+
+    assert np.array_equal(search_space.feasible(real), expected)
+    assert search_space.rejection_rate == pytest.approx(1 - expected.mean())
+
+    # Screened candidates do not count towards the rejection rate
+    assert np.array_equal(search_space.feasible(real, count=False), expected)
+    assert search_space.n_checked == 1000
+
+
+def test_inverse_unknown_category():
+    search_space = SearchSpace([SingleParam("batch_size", "discrete", [64, 128]),
+                                SingleParam("activation", "discrete", ["relu", "tanh"])])
+
+    with pytest.raises(ValueError, match="activation"):
+        search_space.inverse(np.array([[64, "elu"]], dtype=object))
+    with pytest.raises(ValueError, match="batch_size"):
+        search_space.inverse(np.array([[100, "relu"]], dtype=object))
@@ -0,0 +1,80 @@
+import multiprocessing
+import pytest
+import numpy as np
+from src import Tuner, SingleParam
+from src.storage import SharedParamLog
+
+
+class Sam:
+
+    def run(self, name, x, y):
+        return float(x) + "abc".index(y) / 10
+
+
+param_config = (SingleParam("x", output_type="integer", value_range=(0, 9), scaling="incremental", increment=1),
+                SingleParam("y", output_type="discrete", value_range=["a", "b", "c"]))
+
+
+def tune_worker(db_path, save_path, n_trials):
+    param_log = SharedParamLog(db_path, 2, param_descriptions=["x", "y"])
+    tuner = Tuner("shared", Sam(), param_config, "RandomSearch", save_path, param_log=param_log,
+                  callback_provider="none")
+    tuner.tune(lambda trials: trials >= n_trials)
+    param_log.close()
+
+
+def test_shared_param_log(tmp_path):
+    path = str(tmp_path / "study.db")
+    first = SharedParamLog(path, 2)
+    second = SharedParamLog(path, 2)
+
+    assert first.log_param(np.array([1.0, 2.0]), np.array([0.1, 0.2]), 0, source=3)
+
+    # The pending entry of the first log is seen by the second and is not logged again
+    assert not second.log_param(np.array([1.0, 2.0]), np.array([0.1, 0.2]), 0)
+    assert second.log_param(np.array([3.0, 2.0]), np.array([0.3, 0.2]), 0)
+    assert list(second.get_status()) == [SharedParamLog.PENDING, SharedParamLog.PENDING]
+
+    second.log_score(5.0, idx=1, duration=2.5)
+    second.log_intermediate(0.5, 3, idx=2)
+    second.log_budget_score(2.0, 9, idx=2)
+
+    first.sync()
+    assert len(first) == 2
+    assert list(first.get_score()[:, 0]) == [5.0, 2.0]
+    assert list(first.get_source()) == [3, -1]
+    assert first.get_duration()[0] == 2.5 and np.isnan(first.get_duration()[1])
+    assert first.get_intermediate_at_step(3) == {2: 0.5}
+    assert first.get_budget_scores().tolist() == [[2, 9, 2.0]]
+
+    # A new log on the same database starts with all entries
+    assert np.array_equal(SharedParamLog(path, 2).get_actual_params(), first.get_actual_params())
+
+    with pytest.raises(ValueError):
+        SharedParamLog(path, 3)
+
+    # Only the first score would be stored
+    with pytest.raises(ValueError, match="objectives"):
+        SharedParamLog(path, 2, n_objectives=2)
+
+
+def test_shared_tuning_processes(tmp_path):
+    db_path = str(tmp_path / "study.db")
+    context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+
+    workers = [context.Process(target=tune_worker, args=(db_path, str(tmp_path), 6)) for _ in range(0, 4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+        assert worker.exitcode == 0
+
+    param_log = SharedParamLog(db_path, 2)
+    actual = param_log.get_actual_params()
+
+    # Every trial is unique, completed and has the score of its own parameters
+    assert len(param_log) == 24
+    assert len(set(map(tuple, actual.tolist()))) == 24
+    assert np.all(param_log.get_status() == SharedParamLog.COMPLETED)
+    expected = [float(x) + "abc".index(y) / 10 for x, y in actual]
+    assert np.allclose(param_log.get_score()[:, 0], expected)
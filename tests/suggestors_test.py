@@ -1,7 +1,9 @@
 import pytest
 import numpy as np
 from src.parameter_config.ParamConfig import ParamConfig, SingleParam
-from src.suggestors import RandomSearch, ZoomRandomSearch
+from src.suggestors import RandomSearch, ZoomRandomSearch, QuasiRandomSearch, BayesianSearch, TPESearch, \
+    ParEGOSearch, SuggestorPortfolio, SearchSpaceExhausted
+from src.parameter_config.SearchSpace import SearchSpace
 from src.suggestors.SuggestorBase import ParamLog
 
 
@@ -106,3 +108,320 @@ def score_param(parameter_suggestion):
         score += 1
 
     return score
+
+
+def test_batch_suggestions():
+    param_config = (
+        SingleParam("learning_rate", output_type="double", value_range=(0.0001, 0.01), scaling="log"),
+        SingleParam("hidden_size_l", "integer", (100, 1000), "incremental", 50),
+        SingleParam("batch_size", output_type="discrete", value_range=[64, 128, 256, 512, 1024])
+    )
+
+    p_configurer = ParamConfig()
+    functions, names = p_configurer.make_rescale_dict(param_config)
+
+    for make_suggestor in (lambda log: RandomSearch(functions, names, param_log=log),
+                           lambda log: ZoomRandomSearch(trials_per_zoom=30, rescale_functions=functions,
+                                                        param_names=names, param_log=log, n_eval_trials=5)):
+        param_log = ParamLog(len(functions), param_descriptions=names)
+        suggestor = make_suggestor(param_log)
+
+        dict_params, real_params = suggestor.suggest_parameters(100)
+
+        assert len(dict_params) == 100
+        assert real_params.shape == (100, 3)
+        assert param_log.get_actual_params().shape == (100, 3)
+        assert len(np.unique(real_params, axis=0)) == 100
+        assert all(type(dict_param["batch_size"]) is int for dict_param in dict_params)
+        assert all(dict_param["hidden_size_l"] == real[1] for dict_param, real in zip(dict_params, real_params))
+
+
+def test_bayesian_search():
+    param_config = (
+        SingleParam("x", output_type="double", value_range=(-5, 10), scaling="incremental", increment=0.001),
+        SingleParam("y", output_type="double", value_range=(0, 15), scaling="incremental", increment=0.001)
+    )
+
+    search_space = SearchSpace(param_config)
+    param_log = ParamLog(search_space.n_params, param_descriptions=search_space.param_names)
+    bayesian_search = BayesianSearch(search_space, search_space.param_names, param_log, n_initial=10)
+
+    for i in range(0, 40):
+        params = bayesian_search.suggest_parameters()[0]
+        param_log.log_score(-((params["x"] - 2) ** 2 + (params["y"] - 7) ** 2))
+
+    # The Cholesky factor is kept up to date with the completed trials
+    chol = bayesian_search._chol[:bayesian_search._n_obs, :bayesian_search._n_obs]
+    x = param_log.get_unscaled_params()
+    kernel = bayesian_search._kernel(x, x) + bayesian_search.noise * np.eye(len(x))
+    assert bayesian_search._n_obs == 39
+    assert np.allclose(chol @ chol.T, kernel[:39, :39])
+
+    assert param_log.get_score().max() > -0.5
+
+
+def test_bayesian_search_non_finite_scores():
+    param_config = (
+        SingleParam("x", output_type="double", value_range=(0, 1), scaling="incremental", increment=0.001),
+    )
+
+    search_space = SearchSpace(param_config)
+    param_log = ParamLog(search_space.n_params, param_descriptions=search_space.param_names)
+    bayesian_search = BayesianSearch(search_space, search_space.param_names, param_log, n_initial=5)
+
+    # Every third trial completes without a usable score
+    for i in range(0, 20):
+        params = bayesian_search.suggest_parameters()[0]
+        param_log.log_score(np.nan if i % 3 == 0 else -(params["x"] - 0.3) ** 2)
+
+    bayesian_search._update_observations()
+    assert bayesian_search._n_obs == 13
+    assert np.all(np.isfinite(bayesian_search._targets()))
+    assert np.all(np.isfinite(bayesian_search._chol[:13, :13]))
+    assert param_log.get_unscaled_params()[bayesian_search._obs_idx[:13]].shape == (13, 1)
+
+
+def test_bayesian_search_observations_follow_completed_rows():
+    param_config = (
+        SingleParam("x", output_type="double", value_range=(0, 1), scaling="incremental", increment=0.001),
+    )
+
+    search_space = SearchSpace(param_config)
+    param_log = ParamLog(search_space.n_params, param_descriptions=search_space.param_names)
+    bayesian_search = BayesianSearch(search_space, search_space.param_names, param_log, n_initial=5)
+
+    for i in range(0, 8):
+        params = bayesian_search.suggest_parameters()[0]
+        param_log.log_score(-(params["x"] - 0.3) ** 2)
+    bayesian_search._update_observations()
+
+    # A row leaves the completed set while a new one joins it, so the amount of completed rows stays the same
+    param_log.log_score(np.nan, idx=3, status=ParamLog.PRUNED)
+    bayesian_search.suggest_parameters()
+    param_log.log_score(0.0)
+    bayesian_search._update_observations()
+
+    observed = bayesian_search._obs_idx[:bayesian_search._n_obs]
+    assert sorted(observed) == list(param_log.get_completed_idx())
+    x = param_log.get_unscaled_params()[observed].astype(np.float64)
+    chol = bayesian_search._chol[:len(observed), :len(observed)]
+    assert np.allclose(chol @ chol.T, bayesian_search._kernel(x, x) + bayesian_search.noise * np.eye(len(x)))
+
+
+def test_cost_aware_bayesian_search():
+    param_config = (
+        SingleParam("x", output_type="double", value_range=(0, 1), scaling="incremental", increment=0.001),
+        SingleParam("y", output_type="double", value_range=(0, 1), scaling="incremental", increment=0.001)
+    )
+
+    search_space = SearchSpace(param_config)
+    param_log = ParamLog(search_space.n_params, param_descriptions=search_space.param_names)
+    bayesian_search = BayesianSearch(search_space, search_space.param_names, param_log, n_initial=10,
+                                     cost_aware=True)
+
+    # The score does not depend on y, but the duration grows a hundredfold with it
+    for i in range(0, 40):
+        params = bayesian_search.suggest_parameters()[0]
+        param_log.log_score(-(params["x"] - 0.5) ** 2, duration=np.exp(params["y"] * np.log(100)))
+
+    assert param_log.get_unscaled_params()[10:, 1].mean() < 0.35
+
+
+def test_parego_search():
+    param_config = (
+        SingleParam("x", output_type="double", value_range=(0, 1), scaling="incremental", increment=0.001),
+        SingleParam("y", output_type="double", value_range=(0, 1), scaling="incremental", increment=0.001)
+    )
+
+    search_space = SearchSpace(param_config)
+    param_log = ParamLog(search_space.n_params, param_descriptions=search_space.param_names, n_objectives=2)
+    front = param_log.track_pareto_front()
+    parego_search = ParEGOSearch(search_space, search_space.param_names, param_log, n_initial=10)
+
+    # The Pareto optimal parameters are y = 0 and x between 0.2 and 0.8
+    for i in range(0, 40):
+        params = parego_search.suggest_parameters()[0]
+        param_log.log_score([-(params["x"] - 0.2) ** 2 - params["y"], -(params["x"] - 0.8) ** 2 - params["y"]])
+
+    unscaled = param_log.get_unscaled_params()
+    assert unscaled[10:, 1].mean() < unscaled[:10, 1].mean()
+    assert len(front.get_idx()) >= 5
+    assert np.ptp(unscaled[front.get_idx(), 0]) > 0.3
+
+
+def test_tpe_search():
+    param_config = (
+        SingleParam("learning_rate", output_type="double", value_range=(0.0001, 0.01), scaling="log"),
+        SingleParam("dropout_l", output_type="double", value_range=(0, 0.7), scaling="incremental", increment=0.05),
+        SingleParam("hidden_size_l", "integer", (100, 1000), "incremental", 50),
+        SingleParam("batch_size", output_type="discrete", value_range=[64, 128, 256, 512, 1024])
+    )
+
+    search_space = SearchSpace(param_config)
+    param_log = ParamLog(search_space.n_params, param_descriptions=search_space.param_names)
+    tpe_search = TPESearch(search_space, search_space.param_names, param_log, n_initial=20)
+
+    for i in range(0, 200):
+        params = tpe_search.suggest_parameters()[1]
+        param_log.log_score(score_param(params))
+
+    # Later suggestions are concentrated on the good region
+    assert param_log.get_score()[-50:].mean() > param_log.get_score()[:20].mean() + 1
+
+
+def test_suggestion_source():
+    search_space = SearchSpace([SingleParam("x", output_type="double", value_range=(0, 1), scaling="incremental")])
+    param_log = ParamLog(1, param_descriptions=search_space.param_names)
+
+    first = RandomSearch(search_space, search_space.param_names, param_log)
+    second = TPESearch(search_space, search_space.param_names, param_log)
+    first.source_id = 0
+    second.source_id = 1
+
+    first.suggest_parameters()
+    second.suggest_parameters()
+    param_log.log_param(np.asarray([0.5]), np.asarray([0.5]), 0)
+
+    assert list(param_log.get_source()) == [0, 1, ParamLog.NO_SOURCE]
+
+
+def test_suggestor_portfolio():
+    portfolio = SuggestorPortfolio(2, exploration=0.1)
+
+    # Every suggestor is tried once before the bandit is used
+    assert portfolio.choose() == 0
+    portfolio.start(1, 0, 0.0)
+    portfolio.finish(1, 0.5)
+    assert portfolio.choose() == 1
+
+    # The second suggestor keeps improving the score and the first does not
+    idx = 2
+    for score in np.linspace(0.6, 0.9, 10):
+        portfolio.start(idx, 1, 0.0)
+        portfolio.finish(idx, score)
+        portfolio.start(idx + 1, 0, 0.0)
+        portfolio.finish(idx + 1, 0.0)
+        idx += 2
+
+    assert portfolio.choose() == 1
+    assert portfolio.summary()[0]["improvement"] == 0
+
+    # Pruned trials and trials that were not started through the portfolio do not count
+    portfolio.start(idx, 0, 0.0)
+    portfolio.finish(idx, 10.0, completed=False)
+    portfolio.finish(idx + 1, 10.0)
+    assert portfolio.best_score == pytest.approx(0.9)
+
+    # Failed trials with a NaN score do not count either
+    portfolio.start(idx + 2, 1, 0.0)
+    portfolio.finish(idx + 2, np.nan)
+    assert np.all(np.isfinite(portfolio.improvements))
+    assert portfolio.choose() == 1
+
+    # Exhausted suggestors are not picked again
+    portfolio.exhaust(1)
+    assert portfolio.choose() == 0
+    portfolio.exhaust(0)
+    assert portfolio.choose() is None
+
+
+@pytest.mark.parametrize("method", ["sobol", "halton", "lhs"])
+def test_quasi_random_search(method):
+    search_space = SearchSpace([
+        SingleParam("x", output_type="double", value_range=(0, 1), scaling="incremental", increment=0.001),
+        SingleParam("y", output_type="double", value_range=(0, 1), scaling="incremental", increment=0.001)
+    ])
+    param_log = ParamLog(2, param_descriptions=search_space.param_names)
+    quasi_search = QuasiRandomSearch(search_space, search_space.param_names, param_log, method=method,
+                                     batch_size=256)
+
+    dict_params, real = quasi_search.suggest_parameters(128)
+    dict_param, _ = quasi_search.suggest_parameters()
+    dict_params += [dict_param] + quasi_search.suggest_parameters(127)[0]
+    points = np.asarray([[params["x"], params["y"]] for params in dict_params])
+    assert len(param_log) == 256
+
+    # A 16 by 16 grid is covered far more evenly than by uniform samples, which occupy about 162 of the cells
+    cells = np.minimum((points * 16).astype(int), 15)
+    if method == "lhs":
+        strata = (param_log.get_unscaled_params() * 256).astype(int)
+        assert all(np.array_equal(np.sort(strata[:, i]), np.arange(0, 256)) for i in range(0, 2))
+    else:
+        assert len(set(map(tuple, cells.tolist()))) >= 180
+
+    # The batch continues with new points
+    quasi_search.suggest_parameters(10)
+    assert len(param_log) == 266
+
+
+def test_quasi_random_initial_design():
+    search_space = SearchSpace([SingleParam("x", output_type="double", value_range=(0, 1), scaling="incremental",
+                                            increment=0.001)])
+    param_log = ParamLog(1, param_descriptions=search_space.param_names)
+    tpe_search = TPESearch(search_space, search_space.param_names, param_log, n_initial=8)
+
+    assert isinstance(tpe_search._initial_design, QuasiRandomSearch)
+    for _ in range(0, 8):
+        tpe_search.suggest_parameters()
+    unscaled = np.sort(param_log.get_unscaled_params()[:, 0])
+
+    # The 8 initial points of a Sobol sequence are one in each eighth of the range
+    assert np.array_equal((unscaled * 8).astype(int), np.arange(0, 8))
+
+    with pytest.raises(ValueError):
+        QuasiRandomSearch(search_space, search_space.param_names, param_log, method="grid")
+
+
+def test_finite_space_exhaustion():
+    search_space = SearchSpace([
+        SingleParam("dropout_l", output_type="double", value_range=(0, 0.7), scaling="incremental", increment=0.05),
+        SingleParam("batch_size", output_type="discrete", value_range=[64, 128, 256, 512, 1024])
+    ])
+
+    # 15 dropout values and 5 batch sizes make 75 points, which are all suggested once before the space is exhausted
+    for make_suggestor in (lambda log: RandomSearch(search_space, search_space.param_names, log),
+                           lambda log: ZoomRandomSearch(10, search_space, search_space.param_names, log, 3),
+                           lambda log: QuasiRandomSearch(search_space, search_space.param_names, log)):
+        param_log = ParamLog(2, param_descriptions=search_space.param_names)
+        suggestor = make_suggestor(param_log)
+
+        suggestor.suggest_parameters(30)
+        for _ in range(0, 45):
+            dict_param, _ = suggestor.suggest_parameters()
+            param_log.log_score(dict_param["dropout_l"])
+
+        assert len(set(map(tuple, param_log.get_actual_params().tolist()))) == 75
+        with pytest.raises(SearchSpaceExhausted):
+            suggestor.suggest_parameters()
+
+
+def test_zoom_bounds_from_completed_trials():
+    search_space = SearchSpace([
+        SingleParam("x", output_type="double", value_range=(0, 1), scaling="incremental", increment=0.001),
+        SingleParam("hidden_size_l", "integer", (1, 1000), "incremental", 1)
+    ])
+    param_log = ParamLog(2, param_descriptions=search_space.param_names)
+    zoom_search = ZoomRandomSearch(20, search_space, search_space.param_names, param_log, n_eval_trials=3,
+                                   min_width=0.1, log_space=["hidden_size_l"])
+
+    # The scores are negative, so the zero score placeholders of pending trials would be the best
+    for i in range(0, 20):
+        dict_param, _ = zoom_search.suggest_parameters()
+        if i < 15:
+            param_log.log_score(-abs(dict_param["x"] - 0.5), idx=i + 1)
+
+    zoom_search.calc_zoom_bounds()
+    best = param_log.get_unscaled_params()[np.argsort(-param_log.get_score()[:15, 0])[:3]]
+    lower, upper = best.min(axis=0), best.max(axis=0)
+    if upper[0] - lower[0] >= 0.1:
+        assert zoom_search.lower_bounds[0] == lower[0] and zoom_search.upper_bounds[0] == upper[0]
+    else:
+        assert zoom_search.lower_bounds[0] + 0.05 == pytest.approx(np.clip((lower[0] + upper[0]) / 2, 0.05, 0.95))
+    assert np.all(zoom_search.upper_bounds - zoom_search.lower_bounds >= 0.1 - 1e-12)
+
+    # In log space, the zoomed range of the hidden size is sampled log-uniformly between its actual values
+    zoom_search.lower_bounds = np.array([0.0, 0.0])
+    zoom_search.upper_bounds = np.array([1.0, 1.0])
+    zoom_search.difference = np.ones(2)
+    _, real, _ = zoom_search._random_param_samples(10000)
+    assert 0.4 < np.mean(real[:, 1] < 32) < 0.6
@@ -0,0 +1,411 @@
+import pytest
+import numpy as np
+import os
+import time
+from src import Tuner, SingleParam
+from src.suggestors.SuggestorBase import ParamLog, SearchSpaceExhausted
+from src.callbacks import CallbackProviderBase
+from src.pruners import ThresholdPruner
+
+
+class sam_for_testing:
+
+    def __init__(self):
+        print("I'm sam")
+
+    def run(self, name, **params):
+        return np.random.rand()*100
+
+    def save(self, name):
+        print("wow")
+
+    def set_callbacks(self, callbacks):
+        print("cool")
+
+def test_tuner(tmp_path):
+
+    # Initializing param configuration
+    param_config = (
+        SingleParam("learning_rate", output_type="double", value_range=(0.0001, 0.01), scaling="log"),
+        SingleParam("dropout_l", output_type="double", value_range=(0, 0.7), scaling="incremental", increment=0.05),
+        SingleParam("hidden_size_l", "integer", (100, 1000), "incremental", 50),
+        SingleParam("batch_size", output_type="discrete", value_range=[64, 128, 256, 512, 1024])
+    )
+
+    sam = sam_for_testing()
+
+    suggestors = {"ZoomRandomSearch": {"trials_per_zoom": 20, "n_eval_trials": 3}}
+
+    test_tuner = Tuner("test", sam=sam, param_config=param_config, suggestors=suggestors, save_path=str(tmp_path),
+                       callback_provider="none")
+
+    def stopper(trials):
+        if trials > 10:
+            return True
+
+        return False
+
+    test_tuner.tune(stopper)
+
+    assert len(test_tuner.param_log) == 11
+    assert os.path.exists(os.path.join(str(tmp_path), "test_params_actual.npy"))
+
+
+class saving_sam(sam_for_testing):
+
+    def __init__(self):
+        super(saving_sam, self).__init__()
+        self.saved = []
+
+    def save(self, name):
+        self.saved.append(name)
+
+
+def test_tuner_save_model_path(tmp_path):
+    param_config = (SingleParam("hidden_size_l", "integer", (100, 1000), "incremental", 50), )
+
+    sam = saving_sam()
+    test_tuner = Tuner("test", sam=sam, param_config=param_config, suggestors="RandomSearch",
+                       save_path=str(tmp_path), callback_provider="none")
+    test_tuner.tune(lambda trials: trials >= 2, save_model=True)
+
+    # sam.save is given the absolute path of the model
+    assert sam.saved == [os.path.join(str(tmp_path), "test_param_{}".format(i)) for i in (1, 2)]
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_tuner_stops_on_exhausted_space(tmp_path, n_workers):
+    param_config = (SingleParam("hidden_size_l", "integer", (100, 200), "incremental", 50),
+                    SingleParam("batch_size", output_type="discrete", value_range=[64, 128]))
+
+    test_tuner = Tuner("test", sam=sam_for_testing(), param_config=param_config, suggestors="RandomSearch",
+                       save_path=str(tmp_path), callback_provider="none")
+    test_tuner.tune(lambda trials: trials >= 100, n_workers=n_workers, executor="thread")
+
+    assert test_tuner.exhausted
+    assert len(test_tuner.param_log) == 6
+    assert np.all(test_tuner.param_log.get_status() == 1)
+
+
+def test_tuner_portfolio_skips_exhausted_suggestor(tmp_path):
+    param_config = (SingleParam("hidden_size_l", "integer", (100, 200), "incremental", 50),
+                    SingleParam("batch_size", output_type="discrete", value_range=[64, 128]))
+
+    test_tuner = Tuner("test", sam=sam_for_testing(), param_config=param_config,
+                       suggestors=["RandomSearch", "TPESearch"], save_path=str(tmp_path), callback_provider="none",
+                       portfolio=True)
+
+    # The first suggestor the portfolio picks has run out of parameters
+    def exhausted():
+        raise SearchSpaceExhausted("exhausted")
+    test_tuner.suggestors[0].suggest_parameters = exhausted
+
+    test_tuner.tune(lambda trials: trials >= 100)
+
+    assert test_tuner.exhausted
+    assert len(test_tuner.param_log) == 6
+    assert np.all(test_tuner.param_log.get_source() == 1)
+
+
+@pytest.mark.parametrize("suggestors", ["RandomSearch", "ZoomRandomSearch", "BayesianSearch", "TPESearch"])
+def test_tuner_constraints(tmp_path, suggestors):
+    param_config = (SingleParam("hidden_size_l", "integer", (100, 1000), "incremental", 50),
+                    SingleParam("batch_size", output_type="discrete", value_range=[64, 128, 256, 512, 1024]))
+
+    test_tuner = Tuner("test", sam=sam_for_testing(), param_config=param_config, suggestors=suggestors,
+                       save_path=str(tmp_path), callback_provider="none",
+                       constraints=[lambda p: p["hidden_size_l"] * p["batch_size"] <= 2 ** 17])
+    test_tuner.tune(lambda trials: trials >= 30)
+
+    actual = test_tuner.param_log.get_actual_params().astype(float)
+    assert len(actual) == 30
+    assert np.all(actual[:, 0] * actual[:, 1] <= 2 ** 17)
+    assert test_tuner.rejection_rate > 0
+
+
+class hanging_sam(sam_for_testing):
+
+    def run(self, name, **params):
+        if params["hidden_size_l"] > 150:
+            time.sleep(60)
+
+        return float(params["hidden_size_l"])
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_tuner_trial_timeout(tmp_path, n_workers):
+    param_config = (SingleParam("hidden_size_l", "integer", (100, 250), "incremental", 50), )
+
+    test_tuner = Tuner("test", sam=hanging_sam(), param_config=param_config, suggestors="RandomSearch",
+                       save_path=str(tmp_path), callback_provider="none", trial_timeout=1.0, timeout_score=-1.0)
+
+    start_time = time.perf_counter()
+    test_tuner.tune(lambda trials: trials >= 4, n_workers=n_workers)
+
+    assert time.perf_counter() - start_time < 30
+    timed_out = test_tuner.param_log.get_actual_params()[:, 0].astype(float) > 150
+    assert np.all(test_tuner.param_log.get_status()[timed_out] == ParamLog.TIMED_OUT)
+    assert np.all(test_tuner.param_log.get_status()[~timed_out] == ParamLog.COMPLETED)
+    assert np.all(test_tuner.param_log.get_score()[timed_out] == -1.0)
+
+
+class crashing_sam(sam_for_testing):
+
+    def run(self, name, **params):
+        # The process dies without raising, as when it is killed for running out of memory
+        if params["hidden_size_l"] > 150:
+            os._exit(1)
+
+        return float(params["hidden_size_l"])
+
+
+def test_tuner_trial_process_dies(tmp_path):
+    param_config = (SingleParam("hidden_size_l", "integer", (100, 250), "incremental", 50), )
+
+    test_tuner = Tuner("test", sam=crashing_sam(), param_config=param_config, suggestors="RandomSearch",
+                       save_path=str(tmp_path), callback_provider="none", trial_timeout=10.0, timeout_score=-1.0)
+    test_tuner.tune(lambda trials: trials >= 4)
+
+    failed = test_tuner.param_log.get_actual_params()[:, 0].astype(float) > 150
+    assert len(test_tuner.param_log) == 4
+    assert np.all(test_tuner.param_log.get_status()[failed] == ParamLog.FAILED)
+    assert np.all(test_tuner.param_log.get_status()[~failed] == ParamLog.COMPLETED)
+    assert np.all(test_tuner.param_log.get_score()[failed] == -1.0)
+
+
+def _square(x):
+    return x * x
+
+
+class pool_sam(sam_for_testing):
+
+    def run(self, name, **params):
+        import multiprocessing
+
+        with multiprocessing.Pool(2) as pool:
+            return float(sum(pool.map(_square, [params["hidden_size_l"], 1])))
+
+
+def test_tuner_trial_process_starts_pool(tmp_path):
+    param_config = (SingleParam("hidden_size_l", "integer", (100, 250), "incremental", 50), )
+
+    test_tuner = Tuner("test", sam=pool_sam(), param_config=param_config, suggestors="RandomSearch",
+                       save_path=str(tmp_path), callback_provider="none", trial_timeout=20.0)
+    test_tuner.tune(lambda trials: trials >= 2)
+
+    actual = test_tuner.param_log.get_actual_params()[:, 0].astype(float)
+    assert np.all(test_tuner.param_log.get_status() == ParamLog.COMPLETED)
+    assert np.array_equal(test_tuner.param_log.get_score()[:, 0], actual ** 2 + 1)
+
+
+def test_tuner_trial_timeout_raises(tmp_path):
+
+    class failing_sam(sam_for_testing):
+
+        def run(self, name, **params):
+            raise KeyError("no data")
+
+    param_config = (SingleParam("hidden_size_l", "integer", (100, 250), "incremental", 50), )
+    test_tuner = Tuner("test", sam=failing_sam(), param_config=param_config, suggestors="RandomSearch",
+                       save_path=str(tmp_path), callback_provider="none", trial_timeout=10.0)
+
+    with pytest.raises(KeyError):
+        test_tuner._run_sam("test_param_1", {"hidden_size_l": 100}, 1)
+
+
+def test_tuner_time_budget(tmp_path):
+    param_config = (SingleParam("dropout_l", "double", (0, 0.7), "incremental", 0.0001), )
+
+    test_tuner = Tuner("test", sam=sam_for_testing(), param_config=param_config, suggestors="RandomSearch",
+                       save_path=str(tmp_path), callback_provider="none")
+
+    elapsed_times = []
+
+    def stopper(trials, elapsed):
+        elapsed_times.append(elapsed)
+        return False
+
+    test_tuner.tune(stopper, time_budget=0.5)
+
+    # stop_tuning is not called once the time budget is used up
+    assert len(test_tuner.param_log) == len(elapsed_times)
+    assert np.all(np.diff(elapsed_times) >= 0)
+    assert elapsed_times[-1] < 0.5
+
+
+class aborting_sam(sam_for_testing):
+
+    def __init__(self):
+        super(aborting_sam, self).__init__()
+        self.runs = 0
+
+    def run(self, name, **params):
+        self.runs += 1
+        if self.runs == 3:
+            raise KeyboardInterrupt
+
+        return float(params["hidden_size_l"])
+
+
+def test_tuner_resume_fails_running_trials(tmp_path):
+    param_config = (SingleParam("hidden_size_l", "integer", (100, 1000), "incremental", 50), )
+
+    test_tuner = Tuner("test", sam=aborting_sam(), param_config=param_config, suggestors="RandomSearch",
+                       save_path=str(tmp_path), callback_provider="none")
+    with pytest.raises(KeyboardInterrupt):
+        test_tuner.tune(lambda trials: trials >= 5)
+    assert list(test_tuner.param_log.get_status()) == [ParamLog.COMPLETED] * 2 + [ParamLog.PENDING]
+
+    resumed = Tuner.resume("test", sam_for_testing(), param_config, "RandomSearch", str(tmp_path),
+                           callback_provider="none")
+    assert list(resumed.param_log.get_status()) == [ParamLog.COMPLETED] * 2 + [ParamLog.FAILED]
+    assert np.isnan(resumed.param_log.get_score()[2, 0])
+
+
+class reporting_sam(sam_for_testing):
+
+    def run(self, name, report, **params):
+        for epoch in range(0, 3):
+            report(epoch, params["hidden_size_l"] / 1000 * (epoch + 1))
+
+        return float(params["hidden_size_l"])
+
+
+@pytest.mark.parametrize("pruned_score", [None, -1.0])
+def test_tuner_pruned_score(tmp_path, pruned_score):
+    param_config = (SingleParam("hidden_size_l", "integer", (100, 1000), "incremental", 50), )
+
+    test_tuner = Tuner("test", sam=reporting_sam(), param_config=param_config, suggestors="RandomSearch",
+                       save_path=str(tmp_path), callback_provider="none", pruner=ThresholdPruner(lower=0.5),
+                       pruned_score=pruned_score)
+    test_tuner.tune(lambda trials: trials >= 10)
+
+    # Pruned trials do not get their last reported value as their score, it is only in the intermediate log
+    actual = test_tuner.param_log.get_actual_params()[:, 0].astype(float)
+    status = test_tuner.param_log.get_status()
+    score = test_tuner.param_log.get_score()[:, 0]
+    pruned = status == ParamLog.PRUNED
+    assert np.any(pruned) and not np.all(pruned)
+    if pruned_score is None:
+        assert np.all(np.isnan(score[pruned]))
+    else:
+        assert np.all(score[pruned] == pruned_score)
+    assert np.array_equal(score[~pruned], actual[~pruned])
+    for idx in np.flatnonzero(pruned) + 1:
+        assert test_tuner.param_log.get_intermediate(idx)[-1, 2] < 0.5
+
+
+def test_tuner_logs_durations(tmp_path):
+
+    class sleeping_sam(sam_for_testing):
+
+        def run(self, name, **params):
+            time.sleep(params["hidden_size_l"] / 10000)
+            return 0.0
+
+    param_config = (SingleParam("hidden_size_l", "integer", (100, 1000), "incremental", 50), )
+    test_tuner = Tuner("test", sam=sleeping_sam(), param_config=param_config, suggestors="RandomSearch",
+                       save_path=str(tmp_path), callback_provider="none")
+    test_tuner.tune(lambda trials: trials >= 5)
+
+    duration = test_tuner.param_log.get_duration()
+    assert np.all(duration >= test_tuner.param_log.get_actual_params()[:, 0] / 10000)
+
+    # The durations are saved and read back, from the npy files and from the journal
+    resumed = Tuner.resume("test", sleeping_sam(), param_config, "RandomSearch", str(tmp_path),
+                           callback_provider="none")
+    assert np.array_equal(resumed.param_log.get_duration(), duration)
+    os.remove(os.path.join(str(tmp_path), "test_params_actual.npy"))
+    resumed = Tuner.resume("test", sleeping_sam(), param_config, "RandomSearch", str(tmp_path),
+                           callback_provider="none")
+    assert np.array_equal(resumed.param_log.get_duration(), duration)
+
+
+def test_tuner_multi_objective(tmp_path):
+
+    class two_objective_sam(sam_for_testing):
+
+        def run(self, name, **params):
+            return np.array([params["dropout_l"], -params["hidden_size_l"] / 1000])
+
+    param_config = (SingleParam("dropout_l", "double", (0, 0.7), "incremental", 0.05),
+                    SingleParam("hidden_size_l", "integer", (100, 1000), "incremental", 50))
+    test_tuner = Tuner("test", sam=two_objective_sam(), param_config=param_config,
+                       suggestors={"ParEGOSearch": {"n_initial": 5}}, save_path=str(tmp_path),
+                       callback_provider="none", n_objectives=2)
+    test_tuner.tune(lambda trials: trials >= 15)
+
+    score = test_tuner.param_log.get_score()
+    assert score.shape == (15, 2)
+    front = test_tuner.pareto_front.get_idx()
+    dominated = [np.any(np.all(score >= score[i], axis=1) & np.any(score > score[i], axis=1)) for i in range(15)]
+    assert list(front) == list(np.flatnonzero(~np.asarray(dominated)))
+
+    resumed = Tuner.resume("test", two_objective_sam(), param_config, "RandomSearch", str(tmp_path),
+                           callback_provider="none", n_objectives=2)
+    assert np.array_equal(resumed.param_log.get_score(), score)
+
+    with pytest.raises(ValueError):
+        Tuner("test", sam=two_objective_sam(), param_config=param_config, suggestors="RandomSearch",
+              save_path=str(tmp_path), callback_provider="none").tune(lambda trials: trials >= 1)
+
+
+class identity_sam(sam_for_testing):
+
+    def run(self, name, **params):
+        return float(params["dropout_l"])
+
+
+def test_tuner_scores_rows_of_run_suggestions(tmp_path):
+    param_config = (SingleParam("dropout_l", "double", (0, 0.7), "incremental", 0.001), )
+
+    test_tuner = Tuner("test", sam=identity_sam(), param_config=param_config,
+                       suggestors=["RandomSearch", "QuasiRandomSearch"], save_path=str(tmp_path),
+                       callback_provider="none")
+    test_tuner.tune(lambda trials: trials >= 10)
+
+    # Every logged suggestion was run and got its own score
+    assert len(test_tuner.param_log) == 10
+    assert np.all(test_tuner.param_log.get_status() == ParamLog.COMPLETED)
+    assert np.allclose(test_tuner.param_log.get_score()[:, 0],
+                       test_tuner.param_log.get_actual_params()[:, 0].astype(float))
+
+
+class NameCallbackProvider(CallbackProviderBase):
+
+    def make_callbacks(self, name, save_path):
+        return [name]
+
+
+class slow_sam(sam_for_testing):
+
+    def __init__(self):
+        self.callbacks = None
+
+    def set_callbacks(self, callbacks):
+        self.callbacks = callbacks
+
+    def run(self, name, **params):
+        # Later trials finish first
+        hidden_size = params["hidden_size_l"]
+        time.sleep((1000 - hidden_size) / 5000)
+
+        # A trial that ran with the callbacks of another trial is scored -1
+        if self.callbacks != [name]:
+            return -1.0
+
+        return float(hidden_size)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_tuner_parallel_out_of_order(tmp_path, executor):
+    param_config = (SingleParam("hidden_size_l", "integer", (100, 1000), "incremental", 50), )
+
+    test_tuner = Tuner("test", sam=slow_sam(), param_config=param_config, suggestors="RandomSearch",
+                       save_path=str(tmp_path), callback_provider=NameCallbackProvider())
+    test_tuner.tune(lambda trials: trials >= 8, n_workers=4, executor=executor)
+
+    assert len(test_tuner.param_log) == 8
+    assert np.all(test_tuner.param_log.get_status() == ParamLog.COMPLETED)
+    assert np.array_equal(test_tuner.param_log.get_score()[:, 0],
+                          test_tuner.param_log.get_actual_params()[:, 0].astype(float))